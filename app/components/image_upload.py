@@ -24,6 +24,11 @@ def image_upload_widget() -> Optional[Image.Image]:
             # Lê a imagem
             image = Image.open(io.BytesIO(uploaded_file.read()))
             
+            # Fotos de celular (12MP+) são decodificadas já reduzidas pelo JPEG;
+            # nem o preview nem o modelo (256x256) precisam da resolução total
+            if image.format == 'JPEG':
+                image.draft('RGB', (1024, 1024))
+            
             # Converte para RGB se necessário
             if image.mode != 'RGB':
                 image = image.convert('RGB')
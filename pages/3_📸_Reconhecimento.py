@@ -67,66 +67,85 @@ try:
                         value=5
                     )
                 
+                # Resultado guardado na sessão: abrir os detalhes de um Pokémon
+                # recarrega a página sem refazer a inferência
+                request_key = (uploaded_image.size, uploaded_image.resize((16, 16)).tobytes(),
+                               min_confidence, num_predictions)
+                
                 if st.button("🔍 Identificar Pokémon", type="primary"):
                     with st.spinner("Processando imagem..."):
                         try:
-                            # Mostra preview da imagem
-                            st.image(uploaded_image, caption="Imagem enviada", width=300)
+                            # Com INFERENCE_WORKERS > 0 a inferência roda fora do processo do Streamlit
+                            predictions = classifier.predict_async(
+                                uploaded_image, min_confidence=min_confidence
+                            ).result(timeout=30)
+                            # Ordena por confiança
+                            predictions = sorted(predictions, key=lambda x: x[1], reverse=True)[:num_predictions]
+                            st.session_state.recognition = {'key': request_key, 'predictions': predictions}
+                        except Exception as e:
+                            st.session_state.recognition = None
+                            st.error(f"Erro ao processar imagem: {e}")
+                            st.exception(e)
+                
+                recognition = st.session_state.get('recognition')
+                if recognition and recognition['key'] == request_key:
+                    predictions = recognition['predictions']
+                    
+                    # Mostra preview da imagem
+                    st.image(uploaded_image, caption="Imagem enviada", width=300)
+                    
+                    if predictions:
+                        best_id, best_confidence = predictions[0]
+                        
+                        # Mostra aviso se confiança é baixa
+                        if best_confidence < 0.1:
+                            st.warning("⚠️ **Atenção:** A confiança da predição é baixa. O modelo pode não estar certo.")
+                        elif best_confidence < 0.3:
+                            st.info("ℹ️ **Nota:** A confiança é moderada. Considere verificar outras opções abaixo.")
+                        else:
+                            st.success(f"✅ **Melhor correspondência:** {best_confidence:.1%} de confiança")
+                        
+                        st.divider()
+                        st.subheader("🎯 Resultados da Classificação")
+                        
+                        for idx, (pokemon_id, confidence) in enumerate(predictions):
+                            col_pred, col_conf = st.columns([3, 1])
+                            with col_pred:
+                                # Nome vem do mapa de rótulos do modelo; a PokéAPI só é
+                                # consultada se o checkpoint não tiver nomes
+                                pokemon_data = None
+                                pokemon_name = classifier.get_pokemon_name(pokemon_id)
+                                if pokemon_name is None:
+                                    pokemon_data = api_client.get_pokemon_by_id(pokemon_id)
+                                    pokemon_name = pokemon_data.get('name', 'Unknown') if pokemon_data else f"#{pokemon_id}"
+                                pokemon_name = pokemon_name.title()
+                                st.write(f"**{idx + 1}. {pokemon_name}** (#{pokemon_id:03d})")
+                            with col_conf:
+                                st.metric("Confiança", f"{confidence:.1%}")
                             
-                            predictions = classifier.predict(uploaded_image, min_confidence=min_confidence)
+                            # Barra de progresso visual
+                            st.progress(confidence, text=f"{confidence:.1%}")
                             
-                            if predictions:
-                                # Ordena por confiança
-                                predictions = sorted(predictions, key=lambda x: x[1], reverse=True)[:num_predictions]
-                                
-                                best_id, best_confidence = predictions[0]
-                                
-                                # Mostra aviso se confiança é baixa
-                                if best_confidence < 0.1:
-                                    st.warning("⚠️ **Atenção:** A confiança da predição é baixa. O modelo pode não estar certo.")
-                                elif best_confidence < 0.3:
-                                    st.info("ℹ️ **Nota:** A confiança é moderada. Considere verificar outras opções abaixo.")
+                            # Detalhes completos só quando pedidos (uma consulta à PokéAPI/cache)
+                            if st.checkbox(f"Ver detalhes completos de {pokemon_name}", key=f"details_{idx}_{pokemon_id}"):
+                                if pokemon_data is None:
+                                    pokemon_data = api_client.get_pokemon_by_id(pokemon_id)
+                                if pokemon_data:
+                                    display_pokemon_card(pokemon_data, show_details=True)
                                 else:
-                                    st.success(f"✅ **Melhor correspondência:** {best_confidence:.1%} de confiança")
-                                
+                                    st.warning("Não foi possível carregar os detalhes deste Pokémon.")
+                            
+                            if idx < len(predictions) - 1:
                                 st.divider()
-                                st.subheader("🎯 Resultados da Classificação")
-                                
-                                for idx, (pokemon_id, confidence) in enumerate(predictions):
-                                    # Barra de progresso para visualizar confiança
-                                    progress_color = "green" if confidence > 0.3 else "orange" if confidence > 0.1 else "red"
-                                    
-                                    col_pred, col_conf = st.columns([3, 1])
-                                    with col_pred:
-                                        pokemon_data = api_client.get_pokemon_by_id(pokemon_id)
-                                        if pokemon_data:
-                                            pokemon_name = pokemon_data.get('name', 'Unknown').title()
-                                            st.write(f"**{idx + 1}. {pokemon_name}** (#{pokemon_id:03d})")
-                                    with col_conf:
-                                        st.metric("Confiança", f"{confidence:.1%}")
-                                    
-                                    # Barra de progresso visual
-                                    st.progress(confidence, text=f"{confidence:.1%}")
-                                    
-                                    # Mostra detalhes expandidos
-                                    if pokemon_data:
-                                        with st.expander(f"Ver detalhes completos de {pokemon_name}"):
-                                            display_pokemon_card(pokemon_data, show_details=True)
-                                    
-                                    if idx < len(predictions) - 1:
-                                        st.divider()
-                            else:
-                                st.error("❌ Não foi possível identificar o Pokémon na imagem.")
-                                st.info("""
-                                **Dicas para melhorar a identificação:**
-                                - Use imagens claras e bem iluminadas
-                                - O Pokémon deve estar centralizado na imagem
-                                - Evite imagens muito pequenas ou borradas
-                                - Tente reduzir o threshold de confiança mínima
-                                """)
-                        except Exception as e:
-                            st.error(f"Erro ao processar imagem: {e}")
-                            st.exception(e)
+                    else:
+                        st.error("❌ Não foi possível identificar o Pokémon na imagem.")
+                        st.info("""
+                        **Dicas para melhorar a identificação:**
+                        - Use imagens claras e bem iluminadas
+                        - O Pokémon deve estar centralizado na imagem
+                        - Evite imagens muito pequenas ou borradas
+                        - Tente reduzir o threshold de confiança mínima
+                        """)
             else:
                 st.warning("⚠️ Modelo não está pronto.")
     else:
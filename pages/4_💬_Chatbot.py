@@ -1,5 +1,6 @@
 """Página do chatbot interativo."""
 
+import uuid
 import streamlit as st
 
 st.title("💬 Chatbot de Pokémon")
@@ -11,6 +12,9 @@ Faça perguntas sobre Pokémon! Você pode perguntar sobre:
 - **Evoluções** (ex: "Quem evolui do Eevee?")
 - **Habilidades** (ex: "Quais são as habilidades do Bulbasaur?")
 - **Informações gerais** (ex: "Me fale sobre o Mewtwo")
+- **Comparações** (ex: "Compare Charizard e Blastoise")
+
+Perguntas de continuação usam o último Pokémon citado (ex: "E as habilidades dele?").
 """)
 
 try:
@@ -25,6 +29,9 @@ try:
     
     if 'messages' not in st.session_state:
         st.session_state.messages = []
+    # Identifica a conversa para o chatbot lembrar o último Pokémon citado
+    if 'chat_session_id' not in st.session_state:
+        st.session_state.chat_session_id = uuid.uuid4().hex
     
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
@@ -36,13 +43,13 @@ try:
             st.write(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("Pensando..."):
-                response = chatbot.get_response(prompt)
-                st.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
+            # Resposta em cache sai de imediato; as demais aparecem conforme chegam
+            response = st.write_stream(chatbot.stream_response(prompt, session_id=st.session_state.chat_session_id))
+            st.session_state.messages.append({"role": "assistant", "content": response})
     
     if st.button("🗑️ Limpar Conversa"):
         st.session_state.messages = []
+        chatbot.sessions.clear(st.session_state.chat_session_id)
         st.rerun()
         
 except Exception as e:
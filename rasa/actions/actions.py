@@ -1,10 +1,15 @@
 """Ações customizadas do Rasa para interagir com PokéAPI."""
 
-from typing import Any, Text, Dict, List
+from typing import Any, Text, Dict, List, Optional
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
 import sys
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path
@@ -12,32 +17,165 @@ root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
 from src.api.pokeapi_client import PokeAPIClient
+from src.database.db_manager import CACHE_TTL
 
 
-class ActionGetPokemonType(Action):
+class SharedPokemonClient:
+    """
+    Cliente único do servidor de ações, compartilhado por todas as ações.
+    
+    Mantém uma só sessão HTTP (conexões reaproveitadas) e um só
+    DatabaseManager, além de um cache em memória com limite de tamanho.
+    Pedidos simultâneos do mesmo Pokémon esperam a mesma busca.
+    """
+    
+    def __init__(self, max_size: int = 512, ttl: int = CACHE_TTL, max_workers: int = 8):
+        """
+        Cria o cliente.
+        
+        Args:
+            max_size: Pokémon mantidos em memória
+            ttl: Validade de cada entrada em segundos
+            max_workers: Buscas bloqueantes simultâneas (threads)
+        """
+        self.api_client = PokeAPIClient()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pokeapi')
+    
+    def _get_cached(self, name: str) -> Optional[Dict[Any, Any]]:
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[name]
+                return None
+            self._cache.move_to_end(name)
+            return data
+    
+    def _fetch(self, name: str) -> Optional[Dict[Any, Any]]:
+        try:
+            data = self.api_client.get_pokemon_by_name(name)
+            if data:
+                with self._lock:
+                    self._cache[name] = (data, time.monotonic() + self.ttl)
+                    self._cache.move_to_end(name)
+                    while len(self._cache) > self.max_size:
+                        self._cache.popitem(last=False)
+            return data
+        finally:
+            with self._lock:
+                self._in_flight.pop(name, None)
+    
+    def _submit(self, name: str) -> Future:
+        with self._lock:
+            future = self._in_flight.get(name)
+            if future is None:
+                future = self._executor.submit(self._fetch, name)
+                self._in_flight[name] = future
+            return future
+    
+    def get_pokemon(self, name: str) -> Optional[Dict[Any, Any]]:
+        """Busca um Pokémon (memória, SQLite e por fim PokéAPI), bloqueando."""
+        name = name.lower()
+        cached = self._get_cached(name)
+        if cached is not None:
+            return cached
+        return self._submit(name).result()
+    
+    async def aget_pokemon(self, name: str) -> Optional[Dict[Any, Any]]:
+        """Busca um Pokémon sem bloquear o laço de eventos do servidor de ações."""
+        name = name.lower()
+        cached = self._get_cached(name)
+        if cached is not None:
+            return cached
+        return await asyncio.wrap_future(self._submit(name))
+
+
+# Um único cliente por processo do servidor de ações
+POKEMON_CLIENT = SharedPokemonClient()
+
+# Últimas latências (ms) de cada ação
+ACTION_LATENCIES: Dict[str, deque] = {}
+
+
+def record_latency(action_name: str, elapsed_ms: float):
+    """Guarda a latência de uma execução de ação."""
+    ACTION_LATENCIES.setdefault(action_name, deque(maxlen=1000)).append(elapsed_ms)
+
+
+def latency_summary() -> Dict[str, Dict[str, float]]:
+    """
+    Resume as latências registradas.
+    
+    Returns:
+        Dicionário {ação: {count, p50_ms, p95_ms}}
+    """
+    summary = {}
+    for action_name, values in ACTION_LATENCIES.items():
+        ordered = sorted(values)
+        summary[action_name] = {
+            'count': len(ordered),
+            'p50_ms': ordered[len(ordered) // 2],
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        }
+    return summary
+
+
+class PokemonAction(Action):
+    """
+    Base das ações que respondem sobre o Pokémon do slot ``pokemon_name``.
+    
+    ``run`` é assíncrono: a busca roda no pool do cliente compartilhado e o
+    servidor continua atendendo outras conversas enquanto isso.
+    """
+    
+    def respond(self, dispatcher: CollectingDispatcher, pokemon_name: Text,
+                pokemon_data: Dict[Any, Any]) -> List[Dict[Text, Any]]:
+        """Envia a resposta a partir dos dados do Pokémon (implementado por cada ação)."""
+        raise NotImplementedError
+    
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        
+        start = time.perf_counter()
+        try:
+            pokemon_name = tracker.get_slot("pokemon_name")
+            
+            if not pokemon_name:
+                dispatcher.utter_message("Não consegui identificar o nome do Pokémon.")
+                return []
+            
+            pokemon_data = await POKEMON_CLIENT.aget_pokemon(pokemon_name)
+            
+            if not pokemon_data:
+                dispatcher.utter_message(
+                    f"Não encontrei informações sobre {pokemon_name}."
+                )
+                return []
+            
+            return self.respond(dispatcher, pokemon_name, pokemon_data)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            # Sem print por chamada: a saída do servidor de ações é síncrona e
+            # entraria no tempo medido; consulte latency_summary()
+            record_latency(self.name(), elapsed_ms)
+
+
+class ActionGetPokemonType(PokemonAction):
     """Ação para buscar tipo de Pokémon."""
     
     def name(self) -> Text:
         return "action_get_pokemon_type"
     
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        
-        pokemon_name = tracker.get_slot("pokemon_name")
-        
-        if not pokemon_name:
-            dispatcher.utter_message("Não consegui identificar o nome do Pokémon.")
-            return []
-        
-        api_client = PokeAPIClient()
-        pokemon_data = api_client.get_pokemon_by_name(pokemon_name.lower())
-        
-        if not pokemon_data:
-            dispatcher.utter_message(
-                f"Não encontrei informações sobre {pokemon_name}."
-            )
-            return []
+    def respond(self, dispatcher: CollectingDispatcher, pokemon_name: Text,
+                pokemon_data: Dict[Any, Any]) -> List[Dict[Text, Any]]:
         
         types = [t['type']['name'].title() for t in pokemon_data.get('types', [])]
         type_str = " e ".join(types) if len(types) == 1 else " / ".join(types)
@@ -51,30 +189,14 @@ class ActionGetPokemonType(Action):
         return []
 
 
-class ActionGetPokemonStats(Action):
+class ActionGetPokemonStats(PokemonAction):
     """Ação para buscar stats de Pokémon."""
     
     def name(self) -> Text:
         return "action_get_pokemon_stats"
     
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        
-        pokemon_name = tracker.get_slot("pokemon_name")
-        
-        if not pokemon_name:
-            dispatcher.utter_message("Não consegui identificar o nome do Pokémon.")
-            return []
-        
-        api_client = PokeAPIClient()
-        pokemon_data = api_client.get_pokemon_by_name(pokemon_name.lower())
-        
-        if not pokemon_data:
-            dispatcher.utter_message(
-                f"Não encontrei informações sobre {pokemon_name}."
-            )
-            return []
+    def respond(self, dispatcher: CollectingDispatcher, pokemon_name: Text,
+                pokemon_data: Dict[Any, Any]) -> List[Dict[Text, Any]]:
         
         stats = pokemon_data.get('stats', [])
         stats_list = []
@@ -94,30 +216,14 @@ class ActionGetPokemonStats(Action):
         return []
 
 
-class ActionGetPokemonEvolution(Action):
+class ActionGetPokemonEvolution(PokemonAction):
     """Ação para buscar evolução de Pokémon."""
     
     def name(self) -> Text:
         return "action_get_pokemon_evolution"
     
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        
-        pokemon_name = tracker.get_slot("pokemon_name")
-        
-        if not pokemon_name:
-            dispatcher.utter_message("Não consegui identificar o nome do Pokémon.")
-            return []
-        
-        api_client = PokeAPIClient()
-        pokemon_data = api_client.get_pokemon_by_name(pokemon_name.lower())
-        
-        if not pokemon_data:
-            dispatcher.utter_message(
-                f"Não encontrei informações sobre {pokemon_name}."
-            )
-            return []
+    def respond(self, dispatcher: CollectingDispatcher, pokemon_name: Text,
+                pokemon_data: Dict[Any, Any]) -> List[Dict[Text, Any]]:
         
         # Busca informações da espécie para obter cadeia de evolução
         species_url = pokemon_data.get('species', {}).get('url', '')
@@ -139,30 +245,14 @@ class ActionGetPokemonEvolution(Action):
         return []
 
 
-class ActionGetPokemonAbility(Action):
+class ActionGetPokemonAbility(PokemonAction):
     """Ação para buscar habilidades de Pokémon."""
     
     def name(self) -> Text:
         return "action_get_pokemon_ability"
     
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        
-        pokemon_name = tracker.get_slot("pokemon_name")
-        
-        if not pokemon_name:
-            dispatcher.utter_message("Não consegui identificar o nome do Pokémon.")
-            return []
-        
-        api_client = PokeAPIClient()
-        pokemon_data = api_client.get_pokemon_by_name(pokemon_name.lower())
-        
-        if not pokemon_data:
-            dispatcher.utter_message(
-                f"Não encontrei informações sobre {pokemon_name}."
-            )
-            return []
+    def respond(self, dispatcher: CollectingDispatcher, pokemon_name: Text,
+                pokemon_data: Dict[Any, Any]) -> List[Dict[Text, Any]]:
         
         abilities = [
             a['ability']['name'].replace('-', ' ').title() 
@@ -179,30 +269,14 @@ class ActionGetPokemonAbility(Action):
         return []
 
 
-class ActionSearchPokemon(Action):
+class ActionSearchPokemon(PokemonAction):
     """Ação para buscar informações gerais de Pokémon."""
     
     def name(self) -> Text:
         return "action_search_pokemon"
     
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        
-        pokemon_name = tracker.get_slot("pokemon_name")
-        
-        if not pokemon_name:
-            dispatcher.utter_message("Não consegui identificar o nome do Pokémon.")
-            return []
-        
-        api_client = PokeAPIClient()
-        pokemon_data = api_client.get_pokemon_by_name(pokemon_name.lower())
-        
-        if not pokemon_data:
-            dispatcher.utter_message(
-                f"Não encontrei informações sobre {pokemon_name}."
-            )
-            return []
+    def respond(self, dispatcher: CollectingDispatcher, pokemon_name: Text,
+                pokemon_data: Dict[Any, Any]) -> List[Dict[Text, Any]]:
         
         # Formata informações básicas
         pokemon_id = pokemon_data.get('id', 'N/A')
@@ -0,0 +1,110 @@
+"""Compara a detecção de intenção padrão a padrão (original) com a expressão única pré-compilada."""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.chatbot.simple_chatbot import INTENT_PATTERNS, INTENT_MATCHER
+
+# Perguntas realistas (com variações de caixa, acento e pontuação)
+CORPUS = [
+    "Qual é o tipo do Pikachu?",
+    "qual tipo do charizard",
+    "Que tipo é o Gengar?",
+    "Bulbasaur é de que tipo?",
+    "mewtwo tipo",
+    "Quais são as estatísticas do Charizard?",
+    "quais sao as stats do snorlax",
+    "me mostra os atributos do Dragonite",
+    "qual o poder do Machamp?",
+    "Qual a defesa do Onix?",
+    "ataque do Gyarados",
+    "Quais são as habilidades do Bulbasaur?",
+    "habilidade do gengar",
+    "quais os poderes do Alakazam",
+    "skills do lucario",
+    "Me fale sobre o Mewtwo",
+    "fale sobre eevee",
+    "Quero saber sobre o Lapras",
+    "informações sobre o Psyduck",
+    "dados do Jigglypuff",
+    "pokemon ditto",
+    "Quem evolui do Eevee?",
+    "evolução do Charmander",
+    "Para quem o Squirtle evolui?",
+    "cadeia de evolução do Magikarp",
+    "evoluções de Abra",
+    "Oi, tudo bem?",
+    "Pikachu",
+    "Me conta algo legal sobre pokémon lendários, por favor!",
+    "Qual é o melhor Pokémon para começar o jogo?",
+]
+
+
+def legacy_match(message: str):
+    """Detecção original: até 26 re.search com os padrões em texto, e de novo para o nome."""
+    message_lower = message.lower()
+    
+    intent = 'info'
+    for candidate, patterns in INTENT_PATTERNS.items():
+        if any(re.search(pattern, message_lower) for pattern in patterns):
+            intent = candidate
+            break
+    
+    for pattern in INTENT_PATTERNS.get(intent, []):
+        match = re.search(pattern, message_lower)
+        if match:
+            return intent, match.group(1).strip()
+    return intent, None
+
+
+def compiled_match(message: str):
+    """Detecção em uma única busca com a expressão pré-compilada."""
+    intent, pokemon_name = INTENT_MATCHER.match(message.lower())
+    return intent or 'info', pokemon_name
+
+
+def benchmark(fn, messages, rounds: int) -> float:
+    """Retorna mensagens por segundo."""
+    for message in messages:
+        fn(message)  # aquecimento
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            fn(message)
+    return rounds * len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de intenção do chatbot")
+    parser.add_argument("--rounds", type=int, default=2000, help="Passadas pelo corpus (padrão: 2000)")
+    
+    args = parser.parse_args()
+    
+    mismatches = [m for m in CORPUS if legacy_match(m) != compiled_match(m)]
+    if mismatches:
+        print("[ERRO] Resultados diferentes entre as implementações:")
+        for message in mismatches:
+            print(f"  {message!r}: {legacy_match(message)} != {compiled_match(message)}")
+        sys.exit(1)
+    
+    # Descarta o cache interno do módulo re para medir o custo real do caminho original
+    re.purge()
+    legacy = benchmark(legacy_match, CORPUS, args.rounds)
+    compiled = benchmark(compiled_match, CORPUS, args.rounds)
+    
+    print(f"Corpus: {len(CORPUS)} mensagens x {args.rounds} passadas (resultados idênticos)")
+    print(f"  Padrão a padrão:   {legacy:10.0f} mensagens/s")
+    print(f"  Expressão única:   {compiled:10.0f} mensagens/s ({compiled / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
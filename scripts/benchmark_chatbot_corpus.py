@@ -0,0 +1,366 @@
+"""Benchmark de ponta a ponta do chatbot com o corpus do nlu.yml, sem internet.
+
+Repete os exemplos do ``rasa/data/nlu.yml`` (e variações geradas a partir
+deles) no SimpleChatbot contra a PokéAPI falsa de ``stub_pokeapi_server.py``,
+com um banco SQLite temporário. Mede acurácia de intenção e de Pokémon,
+mensagens por segundo com uma e com N threads e a fração de mensagens que
+precisou da rede, e salva tudo em JSON para comparar versões.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from scripts.stub_pokeapi_server import STUB_POKEMON, start_server
+from src.chatbot.intent_classifier import ENTITY_PATTERN, NLU_PATH, load_nlu_examples
+
+# Perguntas com dois Pokémon (o nlu.yml não tem exemplos de comparação)
+COMPARISON_TEMPLATES = [
+    "compare {} e {}",
+    "{} vs {}",
+    "quais as diferenças entre {} e {}?",
+]
+
+# Perguntas de continuação: (mensagem anterior, pergunta, intenção esperada, IDs esperados)
+CONVERSATION_CASES = [
+    ("qual o tipo do Pikachu", "e do Charizard?", 'tipo', [6]),
+    ("stats do Pichu", "e as habilidades dele?", 'habilidade', [172]),
+    # Nome desconhecido não herda o Pokémon anterior
+    ("stats do Pichu", "qual o tipo do mew", 'tipo', []),
+    ("compare Charizard e Blastoise", "compare com o Gengar", 'comparar', [6, 94]),
+    ("compare Charizard e Blastoise", "e contra o Gengar?", 'comparar', [6, 94]),
+    # Depois de uma comparação, uma pergunta sobre um Pokémon não vira outra comparação
+    ("compare Charizard e Blastoise", "raio x do Pikachu", 'info', [25]),
+    ("Charizard vs Blastoise", "e do Pikachu?", 'info', [25]),
+]
+
+POKEMON_IDS = {name: pokemon_id for pokemon_id, (name, *_) in STUB_POKEMON.items()}
+
+
+def display_name(name: str) -> str:
+    """Nome como um usuário escreveria (ex.: 'mr-mime' -> 'Mr Mime')."""
+    return name.replace('-', ' ').title()
+
+
+def strip_accents(text: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def vary(text: str, name: str, rng: random.Random) -> str:
+    """
+    Variação de digitação de uma mensagem: caixa, acentos, pontuação ou erro no nome.
+    
+    O erro de digitação troca duas letras vizinhas no meio de nomes longos,
+    dentro do que o reconhecimento por aproximação deve aceitar.
+    """
+    kind = rng.choice(['lower', 'accents', 'punctuation', 'typo'])
+    if kind == 'lower':
+        return text.lower()
+    if kind == 'accents':
+        return strip_accents(text)
+    if kind == 'punctuation':
+        return text.rstrip('?!. ')
+    if len(name) >= 6 and name.isalpha():
+        i = rng.randrange(1, len(name) - 2)
+        typo = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+        return text.replace(name, typo)
+    return text.lower()
+
+
+def build_corpus(nlu_path: str, variants: int, seed: int):
+    """
+    Monta o corpus com a resposta esperada de cada mensagem.
+    
+    Args:
+        nlu_path: Caminho do nlu.yml
+        variants: Variações geradas por exemplo com Pokémon (e por modelo de comparação)
+        seed: Semente das variações
+    
+    Returns:
+        Lista de dicts {'text', 'intent', 'pokemon' (IDs), 'source'}
+    """
+    from src.chatbot.simple_chatbot import CLASSIFIER_INTENTS
+    
+    rng = random.Random(seed)
+    corpus = []
+    
+    for annotated, nlu_intent in load_nlu_examples(nlu_path, annotated=True):
+        intent = CLASSIFIER_INTENTS.get(nlu_intent)
+        if intent is None:
+            # affirm/deny não têm resposta própria no chatbot
+            continue
+        
+        names = [match.group(1) for match in ENTITY_PATTERN.finditer(annotated)]
+        text = ENTITY_PATTERN.sub(r'\1', annotated)
+        corpus.append({
+            'text': text, 'intent': intent, 'source': 'nlu',
+            'pokemon': sorted(POKEMON_IDS[name.lower()] for name in names),
+        })
+        
+        # Mesma pergunta com outros Pokémon e erros de digitação
+        if len(names) == 1:
+            template = ENTITY_PATTERN.sub('{}', annotated)
+            for _ in range(variants):
+                name = rng.choice(list(POKEMON_IDS))
+                shown = display_name(name)
+                corpus.append({
+                    'text': vary(template.format(shown), shown, rng), 'intent': intent,
+                    'source': 'variant', 'pokemon': [POKEMON_IDS[name]],
+                })
+    
+    for template in COMPARISON_TEMPLATES:
+        for _ in range(variants):
+            first, second = rng.sample(list(POKEMON_IDS), 2)
+            corpus.append({
+                'text': template.format(display_name(first), display_name(second)), 'intent': 'comparar',
+                'source': 'variant', 'pokemon': sorted([POKEMON_IDS[first], POKEMON_IDS[second]]),
+            })
+    
+    rng.shuffle(corpus)
+    return corpus
+
+
+def make_chatbot(classifier, db_path: str):
+    """Chatbot novo com banco próprio (cache frio)."""
+    from src.api.pokeapi_client import PokeAPIClient
+    from src.database.db_manager import DatabaseManager
+    from src.chatbot.simple_chatbot import SimpleChatbot
+    
+    chatbot = SimpleChatbot(intent_classifier=classifier)
+    chatbot.api_client = PokeAPIClient(DatabaseManager(db_path))
+    return chatbot
+
+
+def evaluate_accuracy(chatbot, corpus):
+    """
+    Compara intenção e Pokémon reconhecidos com os esperados.
+    
+    Usa a interpretação do chatbot (``_parse``), que não consulta a PokéAPI.
+    Os exemplos do nlu.yml são também o treino do classificador: a acurácia
+    nas variações geradas (``by_source``) é a mais informativa.
+    
+    Returns:
+        Tupla (métricas, lista de erros)
+    """
+    intent_hits = entity_hits = with_pokemon = false_positives = 0
+    by_source = {}
+    errors = []
+    
+    for item in corpus:
+        intent, entities, pokemon = chatbot._parse(item['text'])
+        predicted = [pokemon] if isinstance(pokemon, int) else sorted({pokemon_id for pokemon_id, _ in entities})
+        
+        intent_ok = intent == item['intent']
+        entity_ok = predicted == item['pokemon']
+        intent_hits += intent_ok
+        hits, total = by_source.get(item['source'], (0, 0))
+        by_source[item['source']] = (hits + (intent_ok and entity_ok), total + 1)
+        if item['pokemon']:
+            with_pokemon += 1
+            entity_hits += entity_ok
+        elif predicted:
+            false_positives += 1
+        
+        if not (intent_ok and entity_ok):
+            errors.append({
+                'text': item['text'],
+                'expected': {'intent': item['intent'], 'pokemon': item['pokemon']},
+                'predicted': {'intent': intent, 'pokemon': predicted},
+            })
+    
+    metrics = {
+        'intent_accuracy': intent_hits / len(corpus),
+        'entity_accuracy': entity_hits / with_pokemon if with_pokemon else None,
+        'entity_false_positives': false_positives,
+        'by_source': {source: hits / total for source, (hits, total) in by_source.items()},
+    }
+    return metrics, errors
+
+
+def evaluate_conversations(chatbot, cases=CONVERSATION_CASES):
+    """
+    Confere as perguntas de continuação com o contexto da mensagem anterior.
+    
+    O contexto é montado pela interpretação da mensagem anterior, sem
+    consultar a PokéAPI.
+    
+    Returns:
+        Tupla (fração de perguntas corretas, lista de erros)
+    """
+    from src.chatbot.conversation_state import ConversationState
+    
+    names = {pokemon_id: name for name, pokemon_id in POKEMON_IDS.items()}
+    errors = []
+    for previous, message, expected_intent, expected_pokemon in cases:
+        intent, entities, pokemon = chatbot._parse(previous)
+        state = ConversationState(intent, entities or [(pokemon, names[pokemon])])
+        
+        intent, entities, pokemon = chatbot._parse(message, state)
+        predicted = [pokemon] if isinstance(pokemon, int) else sorted({pokemon_id for pokemon_id, _ in entities})
+        if intent != expected_intent or predicted != expected_pokemon:
+            errors.append({
+                'text': f"{previous} -> {message}",
+                'expected': {'intent': expected_intent, 'pokemon': expected_pokemon},
+                'predicted': {'intent': intent, 'pokemon': predicted},
+            })
+    return 1 - len(errors) / len(cases), errors
+
+
+def replay(chatbot, messages, threads: int, server) -> dict:
+    """
+    Envia as mensagens a get_response e mede vazão, latência e acessos à rede.
+    
+    Com uma thread, conta quantas mensagens geraram ao menos uma requisição à
+    PokéAPI; com várias, só o total de requisições (não dá para atribuí-las).
+    """
+    def total_requests():
+        return sum(server.requests.values())
+    
+    def timed(message):
+        start = time.perf_counter()
+        chatbot.get_response(message)
+        return time.perf_counter() - start
+    
+    requests_before = total_requests()
+    fetched = 0
+    start = time.perf_counter()
+    
+    if threads == 1:
+        latencies = []
+        for message in messages:
+            before = total_requests()
+            latencies.append(timed(message))
+            fetched += total_requests() > before
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(timed, messages))
+    
+    elapsed = time.perf_counter() - start
+    latencies_ms = np.array(latencies) * 1000
+    result = {
+        'messages': len(messages),
+        'messages_per_second': len(messages) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'network_requests': total_requests() - requests_before,
+    }
+    if threads == 1:
+        result['network_fetch_share'] = fetched / len(messages)
+    return result
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark do chatbot com o corpus do nlu.yml e uma PokéAPI falsa")
+    parser.add_argument("--nlu-path", type=str, default=NLU_PATH, help="Exemplos (padrão: rasa/data/nlu.yml)")
+    parser.add_argument("--variants", type=int, default=3,
+                        help="Variações geradas por exemplo e por modelo de comparação (padrão: 3)")
+    parser.add_argument("--threads", type=int, nargs='+', default=[4, 16],
+                        help="Threads simultâneas no teste de carga (padrão: 4 16)")
+    parser.add_argument("--delay", type=float, default=0.05,
+                        help="Latência simulada da PokéAPI em segundos (padrão: 0.05)")
+    parser.add_argument("--warm-rounds", type=int, default=5,
+                        help="Passadas pelo corpus com cache quente (padrão: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente das variações (padrão: 0)")
+    parser.add_argument("--output", type=str, default="chatbot_benchmark.json",
+                        help="Arquivo JSON de saída (padrão: chatbot_benchmark.json)")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="JSON de uma execução anterior para mostrar a diferença")
+    
+    args = parser.parse_args()
+    
+    server = start_server(delay=args.delay)
+    workdir = tempfile.TemporaryDirectory(prefix='chatbot_benchmark_')
+    # Antes de importar o chatbot: o cliente e o banco leem estas variáveis na importação
+    os.environ['POKEAPI_BASE_URL'] = server.base_url
+    os.environ['DB_PATH'] = os.path.join(workdir.name, 'default.sqlite')
+    
+    from src.chatbot.intent_classifier import load_intent_classifier
+    from src.chatbot.simple_chatbot import USE_INTENT_CLASSIFIER
+    
+    classifier = load_intent_classifier() if USE_INTENT_CLASSIFIER else None
+    corpus = build_corpus(args.nlu_path, args.variants, args.seed)
+    messages = [item['text'] for item in corpus]
+    print(f"Corpus: {len(corpus)} mensagens "
+          f"({sum(item['source'] == 'nlu' for item in corpus)} do nlu.yml, "
+          f"{sum(item['source'] == 'variant' for item in corpus)} geradas); "
+          f"PokéAPI falsa com {args.delay * 1000:.0f} ms de latência")
+    
+    accuracy_chatbot = make_chatbot(classifier, os.path.join(workdir.name, 'accuracy.sqlite'))
+    accuracy, errors = evaluate_accuracy(accuracy_chatbot, corpus)
+    accuracy['conversation_accuracy'], conversation_errors = evaluate_conversations(accuracy_chatbot)
+    errors += conversation_errors
+    print(f"  Intenção:  {100 * accuracy['intent_accuracy']:6.2f}%")
+    print(f"  Pokémon:   {100 * accuracy['entity_accuracy']:6.2f}% "
+          f"({accuracy['entity_false_positives']} falsos positivos em mensagens sem Pokémon)")
+    for source, share in accuracy['by_source'].items():
+        print(f"  Totalmente corretas ({source}): {100 * share:6.2f}%")
+    print(f"  Continuações: {100 * accuracy['conversation_accuracy']:6.2f}% ({len(CONVERSATION_CASES)} perguntas)")
+    for error in conversation_errors:
+        print(f"    {error['text']!r}: esperado {error['expected']}, obtido {error['predicted']}")
+    for error in errors[:10]:
+        print(f"    {error['text']!r}: esperado {error['expected']}, obtido {error['predicted']}")
+    
+    throughput = {}
+    for threads in [1] + [n for n in args.threads if n > 1]:
+        chatbot = make_chatbot(classifier, os.path.join(workdir.name, f'threads_{threads}.sqlite'))
+        cold = replay(chatbot, messages, threads, server)
+        warm = replay(chatbot, messages * args.warm_rounds, threads, server)
+        throughput[str(threads)] = {'cold': cold, 'warm': warm}
+        
+        fetch_share = f" rede em {100 * cold['network_fetch_share']:.1f}% das mensagens" if threads == 1 else ""
+        print(f"  {threads:>2} thread(s): frio {cold['messages_per_second']:9.1f} msg/s "
+              f"(p95 {cold['p95_ms']:7.2f} ms, {cold['network_requests']} requisições{fetch_share})")
+        print(f"                quente {warm['messages_per_second']:9.1f} msg/s "
+              f"(p95 {warm['p95_ms']:7.2f} ms, {warm['network_requests']} requisições)")
+    
+    server.shutdown()
+    workdir.cleanup()
+    
+    result = {
+        'nlu_path': args.nlu_path,
+        'num_messages': len(corpus),
+        'variants': args.variants,
+        'seed': args.seed,
+        'pokeapi_delay_s': args.delay,
+        'intent_classifier': classifier is not None,
+        **accuracy,
+        'throughput': throughput,
+        'errors': errors,
+    }
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\n[OK] Resultado salvo em {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nDiferença em relação a {args.baseline}:")
+        print(f"  Intenção: {100 * (result['intent_accuracy'] - baseline['intent_accuracy']):+.2f} pontos")
+        if result['entity_accuracy'] is not None and baseline.get('entity_accuracy') is not None:
+            print(f"  Pokémon:  {100 * (result['entity_accuracy'] - baseline['entity_accuracy']):+.2f} pontos")
+        for threads, runs in throughput.items():
+            for phase, stats in runs.items():
+                before = baseline.get('throughput', {}).get(threads, {}).get(phase)
+                if before:
+                    label = 'frio' if phase == 'cold' else 'quente'
+                    print(f"  {threads:>2} thread(s) {label:<6}: {before['messages_per_second']:.1f} -> "
+                          f"{stats['messages_per_second']:.1f} msg/s "
+                          f"({100 * (stats['messages_per_second'] / before['messages_per_second'] - 1):+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Varre configurações de inferência (threads intra/inter-op, channels_last, inference_mode) e indica a melhor para a máquina."""
+
+import os
+import sys
+import time
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import torch
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.vision.model_loader import ModelLoader
+from src.vision.inference_runtime import InferenceConfig, InferenceRuntime
+
+
+def thread_candidates(max_threads: int):
+    """Potências de 2 até max_threads, incluindo o próprio max_threads."""
+    candidates = []
+    threads = 1
+    while threads < max_threads:
+        candidates.append(threads)
+        threads *= 2
+    candidates.append(max_threads)
+    return candidates
+
+
+def measure(model: torch.nn.Module, runtime: InferenceRuntime, batch_size: int, repeats: int):
+    """
+    Mede latência de um forward pass.
+    
+    Returns:
+        Tupla (p50 em ms, p95 em ms, imagens por segundo)
+    """
+    runtime.configure_threads()
+    model = runtime.prepare_model(model)
+    runtime.warmup(model, torch.device('cpu'), batch_size)
+    batch = runtime.prepare_input(torch.randn(batch_size, 3, 224, 224))
+    
+    times = []
+    with runtime.context():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(batch)
+            times.append(time.perf_counter() - start)
+    
+    times_ms = np.array(times) * 1000
+    p50 = float(np.percentile(times_ms, 50))
+    p95 = float(np.percentile(times_ms, 95))
+    return p50, p95, batch_size * 1000 / p50
+
+
+def sweep(interop_threads: int, max_threads: int, batch_sizes, repeats: int, warmup_runs: int):
+    """
+    Mede todas as combinações de threads intra-op, channels_last e inference_mode.
+    
+    As threads inter-op só podem ser definidas uma vez por processo, por isso
+    cada valor roda em um processo novo (ver main).
+    
+    Returns:
+        Lista de tuplas (config, batch_size, p50, p95, imagens por segundo)
+    """
+    model = ModelLoader().load_model().cpu().eval()
+    
+    results = []
+    for threads, channels_last, inference_mode in itertools.product(
+            thread_candidates(max_threads), [False, True], [False, True]):
+        config = InferenceConfig(
+            intra_op_threads=threads,
+            inter_op_threads=interop_threads,
+            channels_last=channels_last,
+            inference_mode=inference_mode,
+            warmup_runs=warmup_runs
+        )
+        runtime = InferenceRuntime(config)
+        for batch_size in batch_sizes:
+            p50, p95, throughput = measure(model, runtime, batch_size, repeats)
+            results.append((config, batch_size, p50, p95, throughput))
+            print(f"  interop={interop_threads:<2} threads={threads:<3} channels_last={channels_last!s:<5} "
+                  f"inference_mode={inference_mode!s:<5} batch={batch_size:<3} "
+                  f"p50={p50:8.2f}ms p95={p95:8.2f}ms {throughput:8.1f} img/s", flush=True)
+        # Volta o modelo para o formato padrão antes da próxima configuração
+        model = model.to(memory_format=torch.contiguous_format)
+    return results
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark de configurações de inferência em CPU")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Processos do servidor dividindo a máquina (padrão: 1)")
+    parser.add_argument("--batch-sizes", type=int, nargs='+', default=[1, 8],
+                        help="Tamanhos de lote a medir (padrão: 1 8)")
+    parser.add_argument("--repeats", type=int, default=20, help="Forward passes por configuração (padrão: 20)")
+    parser.add_argument("--warmup-runs", type=int, default=3, help="Passes de aquecimento (padrão: 3)")
+    parser.add_argument("--interop-threads", type=int, nargs='+', default=None,
+                        help="Threads inter-op a medir (padrão: 1 2 4, até o limite por processo)")
+    
+    args = parser.parse_args()
+    
+    cores = os.cpu_count() or 1
+    max_threads = max(1, cores // args.processes)
+    print(f"Núcleos: {cores}, processos: {args.processes} -> até {max_threads} threads por processo")
+    
+    interop_candidates = args.interop_threads or sorted({min(n, max_threads) for n in (1, 2, 4)})
+    
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for interop_threads in interop_candidates:
+        # Processo novo por valor: set_num_interop_threads não pode ser repetido
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.extend(executor.submit(
+                sweep, interop_threads, max_threads, args.batch_sizes, args.repeats, args.warmup_runs
+            ).result())
+    
+    print()
+    for batch_size in args.batch_sizes:
+        subset = [r for r in results if r[1] == batch_size]
+        best_latency = min(subset, key=lambda r: r[2])
+        best_throughput = max(subset, key=lambda r: r[4])
+        print(f"Batch {batch_size}:")
+        print(f"  Menor latência:  {best_latency[2]:.2f}ms com {best_latency[0]}")
+        print(f"  Maior vazão:     {best_throughput[4]:.1f} img/s com {best_throughput[0]}")
+    
+    best = min((r for r in results if r[1] == min(args.batch_sizes)), key=lambda r: r[2])[0]
+    print("\nConfiguração sugerida (.env):")
+    print(f"INFERENCE_THREADS={best.intra_op_threads}")
+    print(f"INFERENCE_INTEROP_THREADS={best.inter_op_threads}")
+    print(f"INFERENCE_CHANNELS_LAST={str(best.channels_last).lower()}")
+    print(f"INFERENCE_MODE={str(best.inference_mode).lower()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compara o pré-processamento original (PIL/torchvision) com o pré-processamento em lote."""
+
+import io
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from PIL import Image
+import torch
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.vision.preprocessing import PARITY_TOLERANCE, BatchPreprocessor, load_image
+
+
+def make_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    """Gera uma foto sintética em JPEG (gradiente com ruído) do tamanho pedido."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                     (x + y) / 2], axis=-1)
+    noisy = np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.uint8)
+    
+    buffer = io.BytesIO()
+    Image.fromarray(noisy).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def pil_pipeline(data: bytes, transform) -> torch.Tensor:
+    """Caminho original: decodifica em resolução total e aplica cada transformação."""
+    return pil_transform(Image.open(io.BytesIO(data)), transform)
+
+
+def pil_transform(image: Image.Image, transform) -> torch.Tensor:
+    """Transformações PIL/torchvision (as de PokemonClassifier.preprocess_image_pil) sobre uma imagem."""
+    from PIL import ImageEnhance
+    
+    image = ImageEnhance.Contrast(image.convert('RGB')).enhance(1.1)
+    return transform(image).unsqueeze(0)
+
+
+def fused_pipeline(data: bytes, preprocessor: BatchPreprocessor) -> torch.Tensor:
+    """Caminho em lote: decodifica JPEG reduzido e normaliza no buffer pré-alocado."""
+    return preprocessor([load_image(io.BytesIO(data))])
+
+
+def benchmark(fn, repeats: int) -> float:
+    """Retorna a mediana do tempo de execução em milissegundos."""
+    fn()  # aquecimento
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    import argparse
+    from torchvision import transforms
+    
+    parser = argparse.ArgumentParser(description="Benchmark do pré-processamento de imagens")
+    parser.add_argument("--image", type=str, default=None, help="Imagem a usar (padrão: JPEG sintético)")
+    parser.add_argument("--width", type=int, default=4000, help="Largura da imagem sintética (padrão: 4000)")
+    parser.add_argument("--height", type=int, default=3000, help="Altura da imagem sintética (padrão: 3000)")
+    parser.add_argument("--repeats", type=int, default=10, help="Repetições por caminho (padrão: 10)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Tamanho do lote para o caminho em lote (padrão: 8)")
+    
+    args = parser.parse_args()
+    
+    if args.image:
+        data = Path(args.image).read_bytes()
+        with Image.open(io.BytesIO(data)) as img:
+            size = img.size
+    else:
+        data = make_jpeg(args.width, args.height)
+        size = (args.width, args.height)
+    
+    transform = transforms.Compose([
+        transforms.Resize((256, 256), antialias=True),
+        transforms.CenterCrop(224),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+    preprocessor = BatchPreprocessor()
+    
+    print(f"Imagem: {size[0]}x{size[1]} ({len(data) / 1024:.0f} KB)")
+    
+    pil_ms = benchmark(lambda: pil_pipeline(data, transform), args.repeats)
+    fused_ms = benchmark(lambda: fused_pipeline(data, preprocessor), args.repeats)
+    
+    images = [load_image(io.BytesIO(data)) for _ in range(args.batch_size)]
+    for image in images:
+        image.load()
+    batch_ms = benchmark(lambda: preprocessor(images), args.repeats) / args.batch_size
+    
+    # Paridade: as duas cadeias sobre a mesma imagem decodificada
+    parity_diff = (pil_transform(images[0], transform) - preprocessor(images[:1])).abs().max().item()
+    # Efeito do modo draft (JPEG reduzido na decodificação) sobre o caminho completo
+    draft_diff = (pil_pipeline(data, transform) - fused_pipeline(data, preprocessor)).abs().max().item()
+    
+    print(f"  PIL/torchvision: {pil_ms:8.2f} ms/imagem")
+    print(f"  Em lote:         {fused_ms:8.2f} ms/imagem ({pil_ms / fused_ms:.1f}x)")
+    print(f"  Em lote (N={args.batch_size}, já decodificado): {batch_ms:8.2f} ms/imagem")
+    print(f"  Diferença máxima, mesma imagem: {parity_diff:.2e} (tolerância {PARITY_TOLERANCE:.0e})")
+    print(f"  Diferença máxima com o draft do JPEG: {draft_diff:.4f}")
+    
+    if parity_diff > PARITY_TOLERANCE:
+        print("[ERRO] Pré-processamento em lote diverge da cadeia PIL/torchvision")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Avalia um modelo salvo (acurácia, confusão por classe, latência e memória) e grava o resultado em JSON."""
+
+import sys
+import json
+import time
+import platform
+from collections import Counter, defaultdict
+from pathlib import Path
+import numpy as np
+import torch
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.vision.pokemon_classifier import PokemonClassifier
+from src.vision.embedding_index import list_reference_images
+from src.vision.preprocessing import load_image
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo em MB (None onde ``resource`` não existe, ex.: Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def list_samples(images_dir: str, val_split: bool = True):
+    """
+    Lista as imagens a avaliar.
+    
+    Args:
+        images_dir: Diretório com subpastas por ID de Pokémon
+        val_split: Usa só as imagens de validação do split.json do diretório
+            (False = todas as imagens, para uma pasta de teste separada)
+    
+    Returns:
+        Lista de tuplas (caminho, pokemon_id)
+    
+    Raises:
+        FileNotFoundError: Se ``val_split`` e o diretório não tiver split.json
+    """
+    if not val_split:
+        return list_reference_images(images_dir)
+    
+    with open(Path(images_dir) / 'split.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return [
+        (str(Path(images_dir) / sample['path']), sample['pokemon_id'])
+        for sample in manifest['samples'] if sample['split'] == 'val'
+    ]
+
+
+def evaluate_accuracy(classifier: PokemonClassifier, samples, batch_size: int = 32):
+    """
+    Classifica todas as imagens pelo mesmo caminho de pré-processamento do app.
+    
+    Returns:
+        Tupla (lista de pokemon_id reais, matriz (N, 5) com os IDs previstos em ordem)
+    """
+    true_ids = []
+    top5_ids = []
+    class_ids = np.array(classifier.model_loader.class_ids)
+    
+    for start in range(0, len(samples), batch_size):
+        chunk = samples[start:start + batch_size]
+        images = [load_image(path) for path, _ in chunk]
+        batch = classifier.preprocess_batch(images)
+        
+        with classifier.runtime.context():
+            logits = classifier.model(batch)
+        
+        k = min(5, logits.shape[1])
+        top_indices = logits.topk(k, dim=1).indices.cpu().numpy()
+        # Índice da classe -> número da Pokédex pelo mapa de rótulos do checkpoint
+        top5_ids.extend(class_ids[top_indices].tolist())
+        true_ids.extend(pokemon_id for _, pokemon_id in chunk)
+    
+    return true_ids, top5_ids
+
+
+def confusion_summary(true_ids, top5_ids, worst: int = 10):
+    """
+    Resume os erros por classe.
+    
+    Returns:
+        Dicionário {pokemon_id: {total, correct, accuracy, most_confused_with}}
+        e a lista das ``worst`` classes com menor acurácia
+    """
+    totals = Counter(true_ids)
+    correct = Counter()
+    mistakes = defaultdict(Counter)
+    
+    for true_id, predicted in zip(true_ids, top5_ids):
+        if predicted[0] == true_id:
+            correct[true_id] += 1
+        else:
+            mistakes[true_id][predicted[0]] += 1
+    
+    per_class = {}
+    for pokemon_id in sorted(totals):
+        confused = mistakes[pokemon_id].most_common(1)
+        per_class[pokemon_id] = {
+            'total': totals[pokemon_id],
+            'correct': correct[pokemon_id],
+            'accuracy': correct[pokemon_id] / totals[pokemon_id],
+            'most_confused_with': confused[0][0] if confused else None
+        }
+    
+    worst_classes = sorted(per_class, key=lambda pid: (per_class[pid]['accuracy'], -per_class[pid]['total']))
+    return per_class, worst_classes[:worst]
+
+
+def measure_latency(classifier: PokemonClassifier, batch_size: int, repeats: int):
+    """
+    Mede a latência do forward pass em um lote do tamanho pedido.
+    
+    Returns:
+        Dicionário com p50/p95/p99 em ms e imagens por segundo
+    """
+    size = classifier.input_shape[0]
+    batch = classifier.runtime.prepare_input(torch.randn(batch_size, 3, size, size, device=classifier.device))
+    classifier.runtime.warmup(classifier.model, classifier.device, batch_size, input_size=size)
+    
+    times = []
+    with classifier.runtime.context():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            classifier.model(batch)
+            times.append((time.perf_counter() - start) * 1000)
+    
+    p50, p95, p99 = np.percentile(times, [50, 95, 99])
+    return {
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'images_per_second': batch_size * 1000 / float(p50)
+    }
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Avaliação e benchmark do modelo de visão")
+    parser.add_argument("--model-path", type=str, default=None,
+                        help="Diretório do modelo (padrão: MODEL_PATH; aceita alunos destilados)")
+    parser.add_argument("--images-dir", type=str, default="data/pokemon_images",
+                        help="Imagens de teste em subpastas por ID (padrão: data/pokemon_images)")
+    parser.add_argument("--all-images", action="store_true",
+                        help="Avalia todas as imagens de --images-dir (só para uma pasta de teste separada; "
+                             "o padrão é usar só a validação do split.json)")
+    parser.add_argument("--batch-sizes", type=int, nargs='+', default=[1, 8, 32],
+                        help="Tamanhos de lote para a latência (padrão: 1 8 32)")
+    parser.add_argument("--repeats", type=int, default=50, help="Forward passes por tamanho de lote (padrão: 50)")
+    parser.add_argument("--worst", type=int, default=10, help="Classes com menor acurácia a listar (padrão: 10)")
+    parser.add_argument("--output", type=str, default="evaluation.json",
+                        help="Arquivo JSON de saída (padrão: evaluation.json)")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="JSON de uma avaliação anterior para mostrar a diferença")
+    
+    args = parser.parse_args()
+    
+    # Sem cache nem processos auxiliares: mede só o modelo
+    classifier = PokemonClassifier(args.model_path, use_cache=False, mode='softmax', num_workers=0)
+    if not classifier.is_model_ready():
+        print("[ERRO] Modelo não carregado")
+        sys.exit(1)
+    
+    val_split = not args.all_images
+    try:
+        samples = list_samples(args.images_dir, val_split)
+    except FileNotFoundError:
+        # Sem divisão, avaliar --images-dir mediria as imagens do próprio treino
+        print(f"[ERRO] {args.images_dir}/split.json não encontrado: não há como separar as imagens de validação. "
+              "Treine com scripts/train_model.py ou use --all-images com uma pasta de teste separada")
+        sys.exit(1)
+    if not samples:
+        print(f"[ERRO] Nenhuma imagem encontrada em {args.images_dir}")
+        sys.exit(1)
+    
+    print(f"Modelo: {classifier.model_loader.model_path} "
+          f"(entrada {classifier.input_shape[0]}x{classifier.input_shape[1]})")
+    print(f"Avaliando {len(samples)} imagens...")
+    
+    true_ids, top5_ids = evaluate_accuracy(classifier, samples)
+    top1 = float(np.mean([pred[0] == true_id for true_id, pred in zip(true_ids, top5_ids)]))
+    top5 = float(np.mean([true_id in pred for true_id, pred in zip(true_ids, top5_ids)]))
+    per_class, worst_classes = confusion_summary(true_ids, top5_ids, args.worst)
+    
+    print(f"  Top-1: {100 * top1:.2f}%")
+    print(f"  Top-5: {100 * top5:.2f}%")
+    print("  Classes com menor acurácia:")
+    for pokemon_id in worst_classes:
+        stats = per_class[pokemon_id]
+        confused = f" - confundido com #{stats['most_confused_with']}" if stats['most_confused_with'] else ""
+        print(f"    #{pokemon_id:<4} {100 * stats['accuracy']:6.2f}% ({stats['correct']}/{stats['total']}){confused}")
+    
+    latency = {}
+    for batch_size in args.batch_sizes:
+        latency[batch_size] = measure_latency(classifier, batch_size, args.repeats)
+        stats = latency[batch_size]
+        print(f"  Batch {batch_size:<3} p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms "
+              f"p99={stats['p99_ms']:8.2f}ms {stats['images_per_second']:8.1f} img/s")
+    
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"  Pico de memória (RSS): {rss:.0f} MB")
+    
+    model_file = Path(classifier.model_loader.model_path) / 'model.pth'
+    result = {
+        'model_path': str(classifier.model_loader.model_path),
+        'model_mtime': model_file.stat().st_mtime if model_file.exists() else None,
+        'input_size': classifier.input_shape[0],
+        'images_dir': args.images_dir,
+        'val_split': val_split,
+        'num_images': len(samples),
+        'top1_accuracy': top1,
+        'top5_accuracy': top5,
+        'worst_classes': worst_classes,
+        'per_class': {str(pokemon_id): stats for pokemon_id, stats in per_class.items()},
+        'latency': {str(batch_size): stats for batch_size, stats in latency.items()},
+        'peak_rss_mb': rss,
+        'torch_threads': torch.get_num_threads(),
+        'device': str(classifier.device)
+    }
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n[OK] Resultado salvo em {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nDiferença em relação a {args.baseline}:")
+        print(f"  Top-1: {100 * (top1 - baseline['top1_accuracy']):+.2f} pontos")
+        print(f"  Top-5: {100 * (top5 - baseline['top5_accuracy']):+.2f} pontos")
+        for batch_size, stats in result['latency'].items():
+            if batch_size in baseline['latency']:
+                before = baseline['latency'][batch_size]['p50_ms']
+                print(f"  Batch {batch_size:<3} p50: {before:.2f}ms -> {stats['p50_ms']:.2f}ms "
+                      f"({100 * (stats['p50_ms'] / before - 1):+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
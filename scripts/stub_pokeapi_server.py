@@ -0,0 +1,151 @@
+"""PokéAPI falsa para testes e benchmarks do chatbot sem acesso à internet.
+
+Responde /api/v2/pokemon-species (lista de espécies) e /api/v2/pokemon/<id ou
+nome> com um conjunto fixo de Pokémon, com atraso configurável para simular a
+latência da rede. O servidor conta as requisições recebidas.
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+STAT_NAMES = ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed']
+
+# ID -> (nome, tipos, stats base na ordem de STAT_NAMES, habilidades, altura, peso)
+STUB_POKEMON = {
+    1: ('bulbasaur', ['grass', 'poison'], [45, 49, 49, 65, 65, 45], ['overgrow', 'chlorophyll'], 7, 69),
+    2: ('ivysaur', ['grass', 'poison'], [60, 62, 63, 80, 80, 60], ['overgrow', 'chlorophyll'], 10, 130),
+    3: ('venusaur', ['grass', 'poison'], [80, 82, 83, 100, 100, 80], ['overgrow', 'chlorophyll'], 20, 1000),
+    4: ('charmander', ['fire'], [39, 52, 43, 60, 50, 65], ['blaze', 'solar-power'], 6, 85),
+    5: ('charmeleon', ['fire'], [58, 64, 58, 80, 65, 80], ['blaze', 'solar-power'], 11, 190),
+    6: ('charizard', ['fire', 'flying'], [78, 84, 78, 109, 85, 100], ['blaze', 'solar-power'], 17, 905),
+    7: ('squirtle', ['water'], [44, 48, 65, 50, 64, 43], ['torrent', 'rain-dish'], 5, 90),
+    8: ('wartortle', ['water'], [59, 63, 80, 65, 80, 58], ['torrent', 'rain-dish'], 10, 225),
+    9: ('blastoise', ['water'], [79, 83, 100, 85, 105, 78], ['torrent', 'rain-dish'], 16, 855),
+    25: ('pikachu', ['electric'], [35, 55, 40, 50, 50, 90], ['static', 'lightning-rod'], 4, 60),
+    26: ('raichu', ['electric'], [60, 90, 55, 90, 80, 110], ['static', 'lightning-rod'], 8, 300),
+    29: ('nidoran-f', ['poison'], [55, 47, 52, 40, 40, 41], ['poison-point', 'rivalry'], 4, 70),
+    83: ('farfetchd', ['normal', 'flying'], [52, 90, 55, 58, 62, 60], ['keen-eye', 'inner-focus'], 8, 150),
+    94: ('gengar', ['ghost', 'poison'], [60, 65, 60, 130, 75, 110], ['cursed-body'], 15, 405),
+    122: ('mr-mime', ['psychic', 'fairy'], [40, 45, 65, 100, 120, 90], ['soundproof', 'filter'], 13, 545),
+    129: ('magikarp', ['water'], [20, 10, 55, 15, 20, 80], ['swift-swim', 'rattled'], 9, 100),
+    130: ('gyarados', ['water', 'flying'], [95, 125, 79, 60, 100, 81], ['intimidate', 'moxie'], 65, 2350),
+    133: ('eevee', ['normal'], [55, 55, 50, 45, 65, 55], ['run-away', 'adaptability'], 3, 65),
+    143: ('snorlax', ['normal'], [160, 110, 65, 65, 110, 30], ['immunity', 'thick-fat'], 21, 4600),
+    150: ('mewtwo', ['psychic'], [106, 110, 90, 154, 90, 130], ['pressure', 'unnerve'], 20, 1220),
+    172: ('pichu', ['electric'], [20, 40, 15, 35, 35, 60], ['static', 'lightning-rod'], 3, 20),
+}
+
+
+def pokemon_payload(pokemon_id: int) -> dict:
+    """Resposta de /pokemon/<id> no formato da PokéAPI (só os campos usados pelo projeto)."""
+    name, types, stats, abilities, height, weight = STUB_POKEMON[pokemon_id]
+    return {
+        'id': pokemon_id,
+        'name': name,
+        'height': height,
+        'weight': weight,
+        'types': [{'slot': i + 1, 'type': {'name': t}} for i, t in enumerate(types)],
+        'stats': [{'base_stat': value, 'stat': {'name': stat}} for stat, value in zip(STAT_NAMES, stats)],
+        'abilities': [{'ability': {'name': ability}} for ability in abilities],
+    }
+
+
+def make_handler(delay: float, counter: dict):
+    """
+    Cria a classe que atende as requisições.
+    
+    Args:
+        delay: Atraso de cada resposta de /pokemon em segundos
+        counter: Dicionário compartilhado com o total de requisições por rota
+    """
+    lock = threading.Lock()
+    by_name = {name: pokemon_id for pokemon_id, (name, *_) in STUB_POKEMON.items()}
+    
+    class StubPokeAPIHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+        
+        def _reply(self, status: int, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except BrokenPipeError:
+                pass
+        
+        def do_GET(self):
+            parts = urlparse(self.path).path.strip('/').split('/')
+            route = parts[2] if len(parts) > 2 else ''
+            with lock:
+                counter[route] = counter.get(route, 0) + 1
+            
+            if route == 'pokemon-species' and len(parts) == 3:
+                self._reply(200, {
+                    'count': len(STUB_POKEMON),
+                    'results': [
+                        {'name': name, 'url': f'http://127.0.0.1/api/v2/pokemon-species/{pokemon_id}/'}
+                        for pokemon_id, (name, *_) in STUB_POKEMON.items()
+                    ]
+                })
+            elif route == 'pokemon' and len(parts) == 4:
+                time.sleep(delay)
+                key = parts[3].lower()
+                pokemon_id = int(key) if key.isdigit() else by_name.get(key)
+                if pokemon_id in STUB_POKEMON:
+                    self._reply(200, pokemon_payload(pokemon_id))
+                else:
+                    self._reply(404, {'detail': 'Not found.'})
+            else:
+                self._reply(404, {'detail': 'Not found.'})
+    
+    return StubPokeAPIHandler
+
+
+def start_server(port: int = 0, delay: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Inicia o servidor em uma thread (útil em testes e benchmarks).
+    
+    Args:
+        port: Porta (0 escolhe uma livre)
+        delay: Atraso de cada resposta de /pokemon em segundos
+    
+    Returns:
+        Servidor em execução, com ``base_url`` e ``requests`` (contagem por
+        rota); pare com ``shutdown()``
+    """
+    counter = {}
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(delay, counter))
+    server.daemon_threads = True
+    server.requests = counter
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}/api/v2'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="PokéAPI falsa para testes locais")
+    parser.add_argument("--port", type=int, default=8000, help="Porta (padrão: 8000)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Atraso de cada resposta de /pokemon em segundos")
+    
+    args = parser.parse_args()
+    
+    server = start_server(args.port, args.delay)
+    print(f"PokéAPI falsa em {server.base_url} ({len(STUB_POKEMON)} Pokémon; Ctrl+C para parar)")
+    print(f"Use: POKEAPI_BASE_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Servidor Rasa falso para testar RasaIntegration sem instalar o Rasa.
+
+Responde /status, /model/parse (com o classificador leve do chatbot) e o
+canal REST /webhooks/rest/webhook, com atraso e falhas configuráveis.
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.chatbot.intent_classifier import IntentClassifier
+
+
+def make_handler(classifier: IntentClassifier, delay: float, error_rate: float, down: bool):
+    """
+    Cria a classe que atende as requisições.
+    
+    Args:
+        classifier: Classificador usado em /model/parse
+        delay: Atraso de cada resposta em segundos
+        error_rate: Fração das requisições respondidas com 503
+        down: Responde 503 em tudo (servidor "fora do ar")
+    """
+    class StubRasaHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+        
+        def _reply(self, status: int, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except BrokenPipeError:
+                # O cliente desistiu (timeout) antes da resposta
+                pass
+        
+        def _unavailable(self) -> bool:
+            time.sleep(delay)
+            if down or random.random() < error_rate:
+                self._reply(503, {'error': 'indisponível'})
+                return True
+            return False
+        
+        def do_GET(self):
+            if self._unavailable():
+                return
+            if self.path == '/status':
+                self._reply(200, {'model_file': 'stub', 'num_active_training_jobs': 0})
+            else:
+                self._reply(404, {'error': 'não encontrado'})
+        
+        def do_POST(self):
+            if self._unavailable():
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            
+            if self.path == '/model/parse':
+                intent, confidence = classifier.predict(payload.get('text', ''))
+                self._reply(200, {
+                    'text': payload.get('text', ''),
+                    'intent': {'name': intent, 'confidence': confidence},
+                    'entities': []
+                })
+            elif self.path == '/webhooks/rest/webhook':
+                intent, _ = classifier.predict(payload.get('message', ''))
+                self._reply(200, [{'recipient_id': payload.get('sender'), 'text': f"[rasa stub] {intent}"}])
+            else:
+                self._reply(404, {'error': 'não encontrado'})
+    
+    return StubRasaHandler
+
+
+def start_server(port: int = 5005, delay: float = 0.0, error_rate: float = 0.0,
+                 down: bool = False) -> ThreadingHTTPServer:
+    """
+    Inicia o servidor em uma thread (útil em testes e benchmarks).
+    
+    Returns:
+        Servidor em execução (pare com ``shutdown()``)
+    """
+    handler = make_handler(IntentClassifier.from_nlu(), delay, error_rate, down)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Servidor Rasa falso para testes locais")
+    parser.add_argument("--port", type=int, default=5005, help="Porta (padrão: 5005)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Atraso de cada resposta em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 503 (0 a 1)")
+    parser.add_argument("--down", action="store_true", help="Responde 503 em tudo")
+    
+    args = parser.parse_args()
+    
+    server = start_server(args.port, args.delay, args.error_rate, args.down)
+    print(f"Rasa falso em http://127.0.0.1:{args.port} (Ctrl+C para parar)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,21 @@
 
 import os
 import sys
+import time
+import random
 from pathlib import Path
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset, DataLoader, Subset
 from torchvision import transforms
 from tqdm import tqdm
 import json
@@ -21,34 +29,183 @@ from src.vision.model_loader import PokemonClassifierModel, ModelLoader
 from src.api.pokeapi_client import PokeAPIClient
 
 
+CACHE_IMAGE_SIZE = 256
+# Cache de imagens pré-decodificadas, usado no treino sempre que existir
+DEFAULT_CACHE_DIR = "data/pokemon_cache"
+# Estado completo do treino (modelo, otimizador, scheduler, época), ao lado do model.pth
+CHECKPOINT_FILE = 'checkpoint.pth'
+# Lista de imagens, rótulos e divisão treino/validação, em images_dir
+SPLIT_FILE = 'split.json'
+# Nomes dos Pokémon baixados (número da Pokédex -> nome), gravado pelo download
+NAMES_FILE = 'names.json'
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def _class_dirs(images_dir: Path):
+    """Subpastas numéricas (uma por ID de Pokémon)."""
+    dirs = [d for d in images_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+    return sorted(dirs, key=lambda d: int(d.name))
+
+
+def _dirs_signature(images_dir: Path) -> dict:
+    """mtime de cada pasta de classe; muda quando imagens são adicionadas ou removidas."""
+    return {d.name: d.stat().st_mtime_ns for d in _class_dirs(images_dir)}
+
+
+def build_split_manifest(images_dir: str = "data/pokemon_images",
+                         val_fraction: float = 0.2, seed: int = 0) -> dict:
+    """
+    Varre o diretório uma vez e sorteia a divisão treino/validação por classe.
+    
+    Cada classe com pelo menos 2 imagens tem ao menos uma na validação, então
+    classes raras não somem da avaliação. Com a mesma semente e as mesmas
+    imagens, a divisão é sempre a mesma.
+    
+    Args:
+        images_dir: Diretório com subpastas por ID de Pokémon
+        val_fraction: Fração de cada classe reservada para validação
+        seed: Semente do sorteio
+    
+    Returns:
+        Manifesto (também salvo em images_dir/split.json)
+    """
+    images_path = Path(images_dir)
+    rng = random.Random(seed)
+    samples = []
+    class_ids = []
+    
+    for pokemon_dir in _class_dirs(images_path):
+        files = sorted(f.name for f in pokemon_dir.iterdir() if f.suffix.lower() in IMAGE_EXTENSIONS)
+        if not files:
+            continue
+        # Classes contíguas mesmo com números da Pokédex faltando
+        pokemon_id = int(pokemon_dir.name)
+        label = len(class_ids)
+        class_ids.append(pokemon_id)
+        rng.shuffle(files)
+        val_count = max(1, round(len(files) * val_fraction)) if len(files) >= 2 else 0
+        for i, name in enumerate(files):
+            samples.append({
+                'path': f"{pokemon_dir.name}/{name}",
+                'label': label,
+                'pokemon_id': pokemon_id,
+                'split': 'val' if i < val_count else 'train'
+            })
+    
+    manifest = {
+        'seed': seed,
+        'val_fraction': val_fraction,
+        'dirs': _dirs_signature(images_path),
+        'class_ids': class_ids,
+        'samples': samples
+    }
+    with open(images_path / SPLIT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def load_split_manifest(images_dir: str = "data/pokemon_images", val_fraction: float = 0.2,
+                        seed: int = 0, rebuild: bool = False) -> dict:
+    """
+    Lê o manifesto de divisão, criando-o se não existir.
+    
+    É recriado se a semente/fração mudarem ou se alguma pasta de classe mudou
+    desde a criação (imagens novas), o que altera o conjunto de validação.
+    """
+    split_file = Path(images_dir) / SPLIT_FILE
+    
+    if split_file.exists() and not rebuild:
+        with open(split_file, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if 'class_ids' in manifest and manifest['seed'] == seed and manifest['val_fraction'] == val_fraction:
+            if manifest['dirs'] == _dirs_signature(Path(images_dir)):
+                return manifest
+            print("[AVISO] Imagens mudaram desde a última divisão; recriando split.json "
+                  "(o conjunto de validação será diferente)")
+    
+    return build_split_manifest(images_dir, val_fraction, seed)
+
+
+def load_pokemon_names(images_dir: str = "data/pokemon_images") -> dict:
+    """Nomes gravados pelo download ({número da Pokédex: nome}); vazio se não houver."""
+    names_file = Path(images_dir) / NAMES_FILE
+    if not names_file.exists():
+        return {}
+    with open(names_file, encoding='utf-8') as f:
+        return {int(pokemon_id): name for pokemon_id, name in json.load(f).items()}
+
+
 class PokemonDataset(Dataset):
     """Dataset de imagens de Pokémon."""
     
-    def __init__(self, images_dir: str, transform=None):
+    def __init__(self, images_dir: str, transform=None, cache_dir: str = None,
+                 val_fraction: float = 0.2, seed: int = 0, rebuild_split: bool = False):
         """
         Args:
             images_dir: Diretório com subpastas por ID de Pokémon (1/, 2/, etc.)
             transform: Transformações a aplicar
+            cache_dir: Diretório com imagens pré-decodificadas (ver prepare_dataset_cache).
+                Se informado, lê as imagens do array mapeado em memória em vez dos PNGs.
+            val_fraction: Fração de validação por classe (ver build_split_manifest)
+            seed: Semente da divisão treino/validação
+            rebuild_split: Recria o split.json mesmo que exista
         """
         self.images_dir = Path(images_dir)
         self.transform = transform
-        self.samples = []
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._images = None
         
-        # Encontra todas as imagens
-        for pokemon_dir in sorted(self.images_dir.iterdir()):
-            if pokemon_dir.is_dir() and pokemon_dir.name.isdigit():
-                pokemon_id = int(pokemon_dir.name)
-                # Busca imagens com diferentes extensões
-                for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
-                    for img_file in pokemon_dir.glob(ext):
-                        self.samples.append((str(img_file), pokemon_id - 1))  # ID começa em 0 para PyTorch
+        # Lista de imagens vem do split.json, sem varrer o diretório a cada execução
+        manifest = load_split_manifest(images_dir, val_fraction, seed, rebuild_split)
+        self.samples = [(str(self.images_dir / s['path']), s['label']) for s in manifest['samples']]
+        self.splits = [s['split'] for s in manifest['samples']]
+        # Índice da classe -> número da Pokédex (vai para o model_config.json)
+        self.class_ids = manifest['class_ids']
+        
+        if self.cache_dir:
+            # O cache tem a própria ordem; rótulo e divisão são procurados pelo caminho
+            by_path = {s['path']: s for s in manifest['samples']}
+            with open(self.cache_dir / 'samples.json', encoding='utf-8') as f:
+                paths = json.load(f)
+            try:
+                entries = [by_path[Path(path).relative_to(self.images_dir).as_posix()] for path in paths]
+                self.samples = [(path, entry['label']) for path, entry in zip(paths, entries)]
+                self.splits = [entry['split'] for entry in entries]
+            except (KeyError, ValueError):
+                raise ValueError(f"Cache em {cache_dir} não corresponde a {images_dir}; "
+                                 "recrie-o com --prepare-cache")
+            if len(paths) < len(manifest['samples']):
+                print(f"[AVISO] Cache em {cache_dir} tem {len(paths)} de {len(manifest['samples'])} imagens; "
+                      "recrie-o com --prepare-cache para treinar com as novas")
+    
+    def split_indices(self, split: str):
+        """Índices das amostras de uma divisão ('train' ou 'val')."""
+        return [i for i, name in enumerate(self.splits) if name == split]
     
     def __len__(self):
         return len(self.samples)
     
+    def __getstate__(self):
+        # O mmap é reaberto em cada processo do DataLoader em vez de ser serializado
+        state = self.__dict__.copy()
+        state['_images'] = None
+        return state
+    
+    def _cached_images(self) -> np.ndarray:
+        """Array (N, 256, 256, 3) uint8 mapeado em memória, aberto sob demanda."""
+        if self._images is None:
+            self._images = np.load(str(self.cache_dir / 'images.npy'), mmap_mode='r')
+        return self._images
+    
     def __getitem__(self, idx):
         img_path, label = self.samples[idx]
-        image = Image.open(img_path).convert('RGB')
+        if self.cache_dir:
+            # O cache poupa a decodificação do PNG, mas as transformações continuam
+            # no PIL: a cópia do fromarray custa ~0,05 ms, e o augmentation em tensor
+            # (rotação/affine com grid_sample) mediu ~2,5x mais lento que no PIL
+            image = Image.fromarray(self._cached_images()[idx])
+        else:
+            image = Image.open(img_path).convert('RGB')
         
         if self.transform:
             image = self.transform(image)
@@ -56,65 +213,324 @@ class PokemonDataset(Dataset):
         return image, label
 
 
-def download_pokemon_images(num_pokemon: int = 151, output_dir: str = "data/pokemon_images"):
-    """Baixa imagens de Pokémon da PokéAPI."""
+def _decode_resized(img_path: str, size: int = CACHE_IMAGE_SIZE) -> np.ndarray:
+    """Decodifica imagem e redimensiona para (size, size) RGB uint8."""
+    with Image.open(img_path) as image:
+        return np.asarray(image.convert('RGB').resize((size, size), Image.BILINEAR))
+
+
+def prepare_dataset_cache(images_dir: str = "data/pokemon_images",
+                          cache_dir: str = DEFAULT_CACHE_DIR,
+                          num_workers: int = 8) -> Path:
+    """
+    Decodifica todas as imagens uma única vez para um array uint8 em disco.
+    
+    Gera ``images.npy`` (N, 256, 256, 3), ``labels.npy`` (N,) e
+    ``samples.json`` (caminhos de origem) em ``cache_dir``.
+    
+    Args:
+        images_dir: Diretório com subpastas por ID de Pokémon
+        cache_dir: Diretório de saída
+        num_workers: Threads de decodificação (o PIL libera o GIL ao decodificar)
+    
+    Returns:
+        Caminho do diretório do cache
+    """
+    samples = PokemonDataset(images_dir).samples
+    if not samples:
+        raise ValueError(f"Nenhuma imagem encontrada em {images_dir}")
+    
+    cache_path = Path(cache_dir)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    
+    # Escreve em arquivo temporário para não deixar um cache incompleto
+    tmp_file = cache_path / 'images.npy.part'
+    images = np.lib.format.open_memmap(
+        str(tmp_file), mode='w+', dtype=np.uint8,
+        shape=(len(samples), CACHE_IMAGE_SIZE, CACHE_IMAGE_SIZE, 3)
+    )
+    
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        decoded = executor.map(_decode_resized, [path for path, _ in samples])
+        for i, array in enumerate(tqdm(decoded, total=len(samples), desc="Pré-processando")):
+            images[i] = array
+    
+    images.flush()
+    del images
+    os.replace(tmp_file, cache_path / 'images.npy')
+    np.save(str(cache_path / 'labels.npy'), np.array([label for _, label in samples], dtype=np.int64))
+    with open(cache_path / 'samples.json', 'w', encoding='utf-8') as f:
+        json.dump([path for path, _ in samples], f)
+    
+    print(f"[OK] {len(samples)} imagens pré-processadas em {cache_dir}")
+    return cache_path
+
+
+# Sprites baixados por padrão: (nome do arquivo, caminho no dicionário 'sprites')
+DEFAULT_SPRITES = [
+    ('official.png', ('other', 'official-artwork', 'front_default')),
+    ('default.png', ('front_default',)),
+    ('shiny.png', ('other', 'official-artwork', 'front_shiny')),
+]
+MANIFEST_FILE = 'manifest.json'
+
+
+def _sprite_urls(sprites: dict, all_variants: bool = False) -> list:
+    """
+    Lista os sprites de um Pokémon para download.
+    
+    Args:
+        sprites: Dicionário 'sprites' da PokéAPI
+        all_variants: Inclui todas as variantes PNG (costas, shiny, gerações)
+    
+    Returns:
+        Lista de tuplas (nome do arquivo, URL)
+    """
+    urls = []
+    seen = set()
+    
+    for filename, path in DEFAULT_SPRITES:
+        node = sprites
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if node:
+            urls.append((filename, node))
+            seen.add(node)
+    
+    if all_variants:
+        # Percorre o dicionário inteiro: versions/generation-i/red-blue/back_default etc.
+        stack = [((), sprites)]
+        while stack:
+            path, node = stack.pop()
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    stack.append((path + (key,), value))
+            elif isinstance(node, str) and node.endswith('.png') and node not in seen:
+                urls.append(('-'.join(path) + '.png', node))
+                seen.add(node)
+    
+    return urls
+
+
+def _load_manifest(manifest_path: Path) -> dict:
+    """Carrega o manifesto de downloads (arquivo -> URL, tamanho e SHA-256)."""
+    if not manifest_path.exists():
+        return {}
+    try:
+        return json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (ValueError, OSError) as e:
+        print(f"[AVISO] Manifesto inválido, recomeçando: {e}")
+        return {}
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Grava em arquivo temporário e renomeia, para nunca deixar arquivo pela metade."""
+    tmp_path = path.with_name(path.name + '.part')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _is_complete(img_path: Path, entry: dict, verify: bool) -> bool:
+    """Verifica se o arquivo baixado corresponde ao registrado no manifesto."""
+    if not entry or not img_path.exists() or img_path.stat().st_size != entry.get('size'):
+        return False
+    if verify:
+        return hashlib.sha256(img_path.read_bytes()).hexdigest() == entry.get('sha256')
+    return True
+
+
+def download_pokemon_images(
+    num_pokemon: int = 151,
+    output_dir: str = "data/pokemon_images",
+    max_workers: int = 16,
+    all_variants: bool = False,
+    verify: bool = False
+):
+    """
+    Baixa imagens de Pokémon da PokéAPI em paralelo.
+    
+    Downloads são atômicos (arquivo temporário + rename) e registrados em um
+    manifesto com SHA-256, então uma execução interrompida pode ser retomada.
+    
+    Args:
+        num_pokemon: Número de Pokémon (IDs 1..num_pokemon)
+        output_dir: Diretório de saída (subpastas por ID)
+        max_workers: Número de downloads simultâneos
+        all_variants: Baixa todas as variantes de sprite, não só oficial/padrão/shiny
+        verify: Confere o SHA-256 dos arquivos já baixados (mais lento)
+    """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_path / MANIFEST_FILE
+    manifest = _load_manifest(manifest_path)
+    manifest_lock = threading.Lock()
+    
+    # Restos de uma execução interrompida
+    for part_file in output_path.glob('*/*.part'):
+        part_file.unlink()
     
     api_client = PokeAPIClient()
     
-    print(f"Baixando imagens de {num_pokemon} Pokémon...")
+    # Sessão única com pool de conexões do tamanho do pool de threads
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=max_workers,
+        pool_maxsize=max_workers,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    api_client.session = session
+    
+    print(f"Baixando imagens de {num_pokemon} Pokémon ({max_workers} downloads simultâneos)...")
     
-    for pokemon_id in tqdm(range(1, num_pokemon + 1), desc="Baixando"):
+    names = load_pokemon_names(output_dir)
+    
+    def fetch_sprite_list(pokemon_id: int) -> list:
+        pokemon_data = api_client.get_pokemon_by_id(pokemon_id)
+        if not pokemon_data:
+            return []
+        with manifest_lock:
+            names[pokemon_id] = pokemon_data.get('name')
+        sprites = _sprite_urls(pokemon_data.get('sprites', {}), all_variants)
+        return [(pokemon_id, filename, url) for filename, url in sprites]
+    
+    def download(pokemon_id: int, filename: str, url: str) -> bool:
+        pokemon_dir = output_path / str(pokemon_id)
+        pokemon_dir.mkdir(exist_ok=True)
+        img_path = pokemon_dir / filename
+        key = f"{pokemon_id}/{filename}"
+        
+        with manifest_lock:
+            entry = manifest.get(key)
+        if entry and entry.get('url') == url and _is_complete(img_path, entry, verify):
+            return False
+        
+        response = session.get(url, timeout=10)
+        response.raise_for_status()
+        _write_atomic(img_path, response.content)
+        
+        with manifest_lock:
+            manifest[key] = {
+                'url': url,
+                'size': len(response.content),
+                'sha256': hashlib.sha256(response.content).hexdigest()
+            }
+        return True
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {}
+    try:
+        # 1. Metadados (usa o cache SQLite do PokeAPIClient)
+        tasks = []
+        futures = {executor.submit(fetch_sprite_list, pid): pid for pid in range(1, num_pokemon + 1)}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Metadados"):
+            try:
+                tasks.extend(future.result())
+            except Exception as e:
+                print(f"Erro ao buscar Pokémon {futures[future]}: {e}")
+        
+        # Nomes vão com o modelo treinado, para exibir predições sem consultar a PokéAPI
+        _write_atomic(output_path / NAMES_FILE,
+                      json.dumps({str(pid): name for pid, name in sorted(names.items())}).encode('utf-8'))
+        
+        # 2. Imagens
+        downloaded = 0
+        futures = {executor.submit(download, *task): task for task in tasks}
         try:
-            pokemon_data = api_client.get_pokemon_by_id(pokemon_id)
-            if not pokemon_data:
-                continue
-            
-            # Obtém URL da imagem oficial
-            sprite_url = pokemon_data.get('sprites', {}).get('other', {}).get('official-artwork', {}).get('front_default')
-            if not sprite_url:
-                sprite_url = pokemon_data.get('sprites', {}).get('front_default')
-            
-            pokemon_dir = output_path / str(pokemon_id)
-            pokemon_dir.mkdir(exist_ok=True)
-            
-            # Baixa múltiplas versões de sprites para aumentar o dataset
-            sprites = pokemon_data.get('sprites', {})
-            
-            # Lista de sprites para baixar
-            sprite_urls = []
-            
-            # Sprite oficial (melhor qualidade)
-            official = sprites.get('other', {}).get('official-artwork', {}).get('front_default')
-            if official:
-                sprite_urls.append(('official.png', official))
-            
-            # Sprite padrão
-            front_default = sprites.get('front_default')
-            if front_default:
-                sprite_urls.append(('default.png', front_default))
-            
-            # Sprite shiny
-            shiny = sprites.get('other', {}).get('official-artwork', {}).get('front_shiny')
-            if shiny:
-                sprite_urls.append(('shiny.png', shiny))
-            
-            # Baixa cada sprite
-            for filename, url in sprite_urls:
-                img_path = pokemon_dir / filename
-                if not img_path.exists() and url:
-                    try:
-                        response = requests.get(url, timeout=10)
-                        if response.status_code == 200:
-                            with open(img_path, 'wb') as f:
-                                f.write(response.content)
-                    except Exception as e:
-                        print(f"  [AVISO] Erro ao baixar {filename} para Pokemon {pokemon_id}: {e}")
-        except Exception as e:
-            print(f"Erro ao baixar Pokémon {pokemon_id}: {e}")
-    
-    print(f"Imagens baixadas em {output_dir}")
+            for i, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Baixando"), 1):
+                try:
+                    downloaded += future.result()
+                except Exception as e:
+                    pokemon_id, filename, _ = futures[future]
+                    print(f"  [AVISO] Erro ao baixar {filename} para Pokemon {pokemon_id}: {e}")
+                
+                # Salva o manifesto periodicamente para retomar após interrupção
+                if i % 200 == 0:
+                    with manifest_lock:
+                        _write_atomic(manifest_path, json.dumps(manifest).encode('utf-8'))
+        finally:
+            with manifest_lock:
+                _write_atomic(manifest_path, json.dumps(manifest, indent=1).encode('utf-8'))
+    except KeyboardInterrupt:
+        # Ctrl+C: descarta os downloads ainda na fila em vez de esperar por todos
+        # (cancel_futures do shutdown só existe a partir do Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+        raise
+    executor.shutdown()
+    
+    print(f"{downloaded} imagens novas ({len(tasks) - downloaded} já existentes) em {output_dir}")
+
+
+def build_train_transform(input_size: int = 224):
+    """Transformações de treino com data augmentation agressivo."""
+    resize_size = round(input_size * 256 / 224)
+    return transforms.Compose([
+        transforms.Resize((resize_size, resize_size)),
+        transforms.RandomCrop(input_size),
+        transforms.RandomHorizontalFlip(p=0.5),
+        transforms.RandomRotation(degrees=15),
+        transforms.ColorJitter(brightness=0.3, contrast=0.3, saturation=0.3, hue=0.1),
+        transforms.RandomAffine(degrees=0, translate=(0.1, 0.1)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+
+
+def build_eval_transform(input_size: int = 224):
+    """Transformações determinísticas (mesmas da inferência, sem contraste)."""
+    resize_size = round(input_size * 256 / 224)
+    return transforms.Compose([
+        transforms.Resize((resize_size, resize_size)),
+        transforms.CenterCrop(input_size),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    ])
+
+
+def save_checkpoint(checkpoint_file: Path, state: dict):
+    """Salva o checkpoint de treino sem deixar arquivo corrompido se o processo cair no meio."""
+    checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = checkpoint_file.with_suffix('.part')
+    torch.save(state, str(tmp_file))
+    os.replace(tmp_file, checkpoint_file)
+
+
+def make_loader(dataset, batch_size: int, shuffle: bool, num_workers: int = 0,
+                prefetch_factor: int = 2, persistent_workers: bool = True,
+                pin_memory: bool = False) -> DataLoader:
+    """
+    Cria DataLoader com processos de carregamento opcionais.
+    
+    Args:
+        dataset: Dataset PyTorch
+        batch_size: Tamanho do batch
+        shuffle: Embaralha a cada época
+        num_workers: Processos de carregamento/augmentation (0 = no processo principal)
+        prefetch_factor: Batches preparados antecipadamente por processo
+        persistent_workers: Mantém os processos vivos entre épocas
+        pin_memory: Usa memória fixada (acelera a cópia para GPU)
+    
+    Returns:
+        DataLoader configurado
+    """
+    options = {}
+    # prefetch_factor e persistent_workers só existem com processos de carregamento
+    if num_workers > 0:
+        options['prefetch_factor'] = prefetch_factor
+        options['persistent_workers'] = persistent_workers
+    
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        **options
+    )
 
 
 def train_model(
@@ -123,43 +539,81 @@ def train_model(
     num_epochs: int = 10,
     batch_size: int = 32,
     learning_rate: float = 0.001,
-    num_pokemon: int = 151
-):
-    """Treina o modelo MobileNetV2."""
+    cache_dir: str = None,
+    num_workers: int = 0,
+    prefetch_factor: int = 2,
+    persistent_workers: bool = True,
+    pin_memory: bool = None,
+    bf16: bool = False,
+    channels_last: bool = False,
+    compile_model: bool = False,
+    accumulation_steps: int = 1,
+    resume: bool = False,
+    patience: int = 0,
+    val_every: int = 1,
+    split_seed: int = 0,
+    rebuild_split: bool = False
+) -> float:
+    """
+    Treina o modelo MobileNetV2.
+    
+    Args:
+        cache_dir: Usa (e cria, se não existir) o cache de imagens pré-decodificadas
+        num_workers: Processos do DataLoader para leitura e augmentation
+        prefetch_factor: Batches preparados antecipadamente por processo
+        persistent_workers: Mantém os processos do DataLoader entre épocas
+        pin_memory: Memória fixada para cópia à GPU (padrão: só com CUDA)
+        bf16: Forward/backward do treino em autocast bfloat16 (a validação segue em FP32)
+        channels_last: Usa o formato de memória channels_last no modelo e nas imagens
+        compile_model: Compila o modelo com torch.compile, se disponível
+        accumulation_steps: Batches acumulados por passo do otimizador
+            (batch efetivo = batch_size * accumulation_steps)
+        resume: Continua do checkpoint salvo em model_save_path, se existir
+        patience: Validações seguidas sem melhora antes de parar (0 = desativado)
+        val_every: Valida a cada N épocas (a última época é sempre validada)
+        split_seed: Semente da divisão treino/validação (split.json)
+        rebuild_split: Recria o split.json
+    
+    Returns:
+        Melhor acurácia de validação (%)
+    """
     
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     print(f"Usando dispositivo: {device}")
     
     # Transformações para treinamento com data augmentation agressivo
-    train_transform = transforms.Compose([
-        transforms.Resize((256, 256)),
-        transforms.RandomCrop(224),
-        transforms.RandomHorizontalFlip(p=0.5),
-        transforms.RandomRotation(degrees=15),
-        transforms.ColorJitter(brightness=0.3, contrast=0.3, saturation=0.3, hue=0.1),
-        transforms.RandomAffine(degrees=0, translate=(0.1, 0.1)),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-    ])
+    train_transform = build_train_transform()
     
     # Cria dataset
-    dataset = PokemonDataset(images_dir, transform=train_transform)
+    if cache_dir and not (Path(cache_dir) / 'images.npy').exists():
+        prepare_dataset_cache(images_dir, cache_dir)
+    dataset = PokemonDataset(images_dir, transform=train_transform, cache_dir=cache_dir,
+                             seed=split_seed, rebuild_split=rebuild_split)
     
     if len(dataset) == 0:
         print("[ERRO] Nenhuma imagem encontrada! Execute primeiro download_pokemon_images()")
-        return
+        return 0.0
     
-    # Divide em treino e validação (80/20)
-    train_size = int(0.8 * len(dataset))
-    val_size = len(dataset) - train_size
-    train_dataset, val_dataset = torch.utils.data.random_split(dataset, [train_size, val_size])
+    # Divisão estratificada (80/20) do split.json, a mesma em todas as execuções
+    train_dataset = Subset(dataset, dataset.split_indices('train'))
+    val_dataset = Subset(dataset, dataset.split_indices('val'))
     
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
+    if pin_memory is None:
+        pin_memory = device.type == 'cuda'
+    loader_options = dict(
+        num_workers=num_workers,
+        prefetch_factor=prefetch_factor,
+        persistent_workers=persistent_workers,
+        pin_memory=pin_memory
+    )
+    train_loader = make_loader(train_dataset, batch_size, shuffle=True, **loader_options)
+    val_loader = make_loader(val_dataset, batch_size, shuffle=False, **loader_options)
     
     # Cria modelo
-    model = PokemonClassifierModel(num_classes=num_pokemon)
+    # Uma classe por pasta com imagens; o mapa índice -> Pokédex é salvo com o modelo
+    model = PokemonClassifierModel(num_classes=len(dataset.class_ids))
     model.to(device)
+    class_names = load_pokemon_names(images_dir)
     
     # Descongela mais camadas para fine-tuning (melhor para poucos dados)
     # Descongela as últimas 10 camadas
@@ -169,69 +623,529 @@ def train_model(
     for param in model.model.classifier.parameters():
         param.requires_grad = True
     
+    memory_format = torch.channels_last if channels_last else torch.contiguous_format
+    model = model.to(memory_format=memory_format)
+    
+    # O modelo compilado compartilha os parâmetros; o original é o que é salvo
+    forward = model
+    if compile_model:
+        if hasattr(torch, 'compile'):
+            forward = torch.compile(model)
+        else:
+            print("[AVISO] torch.compile indisponível nesta versão do PyTorch; seguindo sem compilar")
+    
     criterion = nn.CrossEntropyLoss()
     optimizer = optim.Adam(model.parameters(), lr=learning_rate)
     scheduler = optim.lr_scheduler.StepLR(optimizer, step_size=3, gamma=0.1)
+    accumulation_steps = max(1, accumulation_steps)
     
     print(f"\nTreinando modelo por {num_epochs} épocas...")
     print(f"Imagens de treino: {len(train_dataset)}")
     print(f"Imagens de validação: {len(val_dataset)}")
+    print(f"Precisão: {'bfloat16 (autocast)' if bf16 else 'FP32'}, channels_last: {channels_last}, "
+          f"torch.compile: {forward is not model}, batch efetivo: {batch_size * accumulation_steps}")
     
+    model_loader = ModelLoader(model_save_path)
+    checkpoint_file = Path(model_save_path) / CHECKPOINT_FILE
     best_val_acc = 0.0
+    validations_without_improvement = 0
+    start_epoch = 0
     
-    for epoch in range(num_epochs):
+    if resume and checkpoint_file.exists():
+        checkpoint = torch.load(str(checkpoint_file), map_location=device)
+        model.load_state_dict(checkpoint['model'])
+        optimizer.load_state_dict(checkpoint['optimizer'])
+        scheduler.load_state_dict(checkpoint['scheduler'])
+        start_epoch = checkpoint['epoch'] + 1
+        best_val_acc = checkpoint['best_val_acc']
+        validations_without_improvement = checkpoint['validations_without_improvement']
+        print(f"[INFO] Retomando da época {start_epoch + 1} (melhor acurácia até agora: {best_val_acc:.2f}%)")
+    elif resume:
+        print(f"[AVISO] Checkpoint não encontrado em {checkpoint_file}; começando do zero")
+    
+    for epoch in range(start_epoch, num_epochs):
         # Treino
         model.train()
         train_loss = 0.0
         train_correct = 0
         train_total = 0
+        # Tempo esperando o próximo batch vs. tempo de forward/backward
+        data_time = 0.0
+        compute_time = 0.0
+        batch_end = time.perf_counter()
+        optimizer.zero_grad()
+        
+        for step, (images, labels) in enumerate(tqdm(train_loader, desc=f"Época {epoch+1}/{num_epochs} [Treino]")):
+            batch_start = time.perf_counter()
+            data_time += batch_start - batch_end
+            
+            images = images.to(device, non_blocking=pin_memory, memory_format=memory_format)
+            labels = labels.to(device, non_blocking=pin_memory)
+            
+            with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=bf16):
+                outputs = forward(images)
+                loss = criterion(outputs, labels)
+            (loss / accumulation_steps).backward()
+            
+            if (step + 1) % accumulation_steps == 0 or step + 1 == len(train_loader):
+                optimizer.step()
+                optimizer.zero_grad()
+            
+            # loss.item() sincroniza com a GPU, então o tempo medido é o real
+            train_loss += loss.item()
+            _, predicted = torch.max(outputs.data, 1)
+            train_total += labels.size(0)
+            train_correct += (predicted == labels).sum().item()
+            
+            batch_end = time.perf_counter()
+            compute_time += batch_end - batch_start
         
-        for images, labels in tqdm(train_loader, desc=f"Época {epoch+1}/{num_epochs} [Treino]"):
+        train_acc = 100 * train_correct / train_total
+        epoch_time = data_time + compute_time
+        
+        print(f"\nÉpoca {epoch+1}/{num_epochs}:")
+        print(f"  Treino - Loss: {train_loss/len(train_loader):.4f}, Acc: {train_acc:.2f}%")
+        print(f"  Tempo de treino: {epoch_time:.1f}s - espera por dados: {data_time:.1f}s "
+              f"({100 * data_time / max(epoch_time, 1e-9):.0f}%), computação: {compute_time:.1f}s, "
+              f"{train_total / max(epoch_time, 1e-9):.1f} imagens/s")
+        
+        scheduler.step()
+        
+        # Validação
+        if (epoch + 1) % max(1, val_every) == 0 or epoch + 1 == num_epochs:
+            model.eval()
+            val_loss = 0.0
+            val_correct = 0
+            val_total = 0
+            
+            with torch.no_grad():
+                for images, labels in tqdm(val_loader, desc=f"Época {epoch+1}/{num_epochs} [Validação]"):
+                    images = images.to(device, memory_format=memory_format)
+                    labels = labels.to(device)
+                    outputs = forward(images)
+                    loss = criterion(outputs, labels)
+                    
+                    val_loss += loss.item()
+                    _, predicted = torch.max(outputs.data, 1)
+                    val_total += labels.size(0)
+                    val_correct += (predicted == labels).sum().item()
+            
+            val_acc = 100 * val_correct / val_total
+            print(f"  Validação - Loss: {val_loss/len(val_loader):.4f}, Acc: {val_acc:.2f}%")
+            
+            # Salva melhor modelo
+            if val_acc > best_val_acc:
+                best_val_acc = val_acc
+                validations_without_improvement = 0
+                model_loader.save_model(model, dataset.class_ids, class_names)
+                print(f"  [OK] Melhor modelo salvo! (Acc: {val_acc:.2f}%)")
+            else:
+                validations_without_improvement += 1
+        
+        save_checkpoint(checkpoint_file, {
+            'epoch': epoch,
+            'model': model.state_dict(),
+            'optimizer': optimizer.state_dict(),
+            'scheduler': scheduler.state_dict(),
+            'best_val_acc': best_val_acc,
+            'validations_without_improvement': validations_without_improvement
+        })
+        
+        if patience and validations_without_improvement >= patience:
+            print(f"\n[INFO] Parada antecipada: {patience} validações seguidas sem melhora")
+            break
+    
+    print(f"\n[OK] Treinamento concluido! Melhor acuracia: {best_val_acc:.2f}%")
+    return best_val_acc
+
+
+def parse_student_spec(spec: str):
+    """Converte '0.5x160' em (width_mult=0.5, input_size=160)."""
+    width, size = spec.lower().split('x')
+    return float(width), int(size)
+
+
+def measure_latency(model: nn.Module, input_size: int, repeats: int = 30) -> float:
+    """Mediana da latência (ms) de uma imagem em CPU, como no servidor."""
+    model = model.cpu().eval()
+    dummy = torch.zeros(1, 3, input_size, input_size)
+    times = []
+    with torch.inference_mode():
+        model(dummy)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(dummy)
+            times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def evaluate_split(model: nn.Module, images_dir: str = "data/pokemon_images", input_size: int = 224,
+                   batch_size: int = 32, cache_dir: str = None) -> float:
+    """Acurácia (%) do modelo nas imagens de validação do split.json."""
+    device = next(model.parameters()).device
+    dataset = PokemonDataset(images_dir, transform=build_eval_transform(input_size), cache_dir=cache_dir)
+    loader = make_loader(Subset(dataset, dataset.split_indices('val')), batch_size, shuffle=False)
+    
+    model.eval()
+    correct = 0
+    total = 0
+    with torch.no_grad():
+        for images, labels in loader:
+            images, labels = images.to(device), labels.to(device)
+            total += labels.size(0)
+            correct += (model(images).argmax(1) == labels).sum().item()
+    return 100 * correct / max(total, 1)
+
+
+def distill_model(
+    teacher_path: str = "models/mobilenet_pokemon",
+    images_dir: str = "data/pokemon_images",
+    model_save_path: str = "models/mobilenet_pokemon_student",
+    width_mult: float = 0.5,
+    input_size: int = 160,
+    num_epochs: int = 20,
+    batch_size: int = 32,
+    learning_rate: float = 0.001,
+    temperature: float = 4.0,
+    alpha: float = 0.7,
+    cache_dir: str = None,
+    num_workers: int = 0
+) -> dict:
+    """
+    Treina um modelo menor (aluno) imitando as probabilidades do modelo treinado (professor).
+    
+    A perda combina a divergência KL entre as distribuições suavizadas por
+    ``temperature`` (peso ``alpha``) com a entropia cruzada dos rótulos.
+    O professor recebe as mesmas imagens ampliadas para o tamanho de entrada dele.
+    
+    Args:
+        teacher_path: Diretório do modelo professor (carregado pelo ModelLoader)
+        model_save_path: Onde salvar o aluno (carregável pelo ModelLoader)
+        width_mult: Multiplicador de largura do MobileNetV2 do aluno
+        input_size: Lado da imagem de entrada do aluno
+        temperature: Temperatura da destilação
+        alpha: Peso da perda de destilação (1 - alpha para os rótulos)
+    
+    Returns:
+        Dicionário com acurácia de validação (%) e latência (ms) do melhor aluno
+    """
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    
+    teacher_loader = ModelLoader(teacher_path)
+    if not (Path(teacher_path) / 'model.pth').exists():
+        raise FileNotFoundError(f"Modelo professor não encontrado em {teacher_path}; treine-o primeiro")
+    teacher = teacher_loader.load_model().to(device).eval()
+    teacher_size = teacher_loader.input_size
+    
+    if cache_dir and not (Path(cache_dir) / 'images.npy').exists():
+        prepare_dataset_cache(images_dir, cache_dir)
+    dataset = PokemonDataset(images_dir, transform=build_train_transform(input_size), cache_dir=cache_dir)
+    if dataset.class_ids != teacher_loader.class_ids:
+        raise ValueError("As classes das imagens não correspondem às do professor; retreine o professor")
+    
+    # Só a largura 1.0 tem pesos do ImageNet; alunos mais estreitos treinam do zero
+    student = PokemonClassifierModel(teacher_loader.num_classes, width_mult=width_mult, input_size=input_size)
+    for param in student.parameters():
+        param.requires_grad = True
+    student.to(device)
+    train_loader = make_loader(Subset(dataset, dataset.split_indices('train')), batch_size,
+                               shuffle=True, num_workers=num_workers)
+    
+    criterion = nn.CrossEntropyLoss()
+    kl_div = nn.KLDivLoss(reduction='batchmean')
+    optimizer = optim.Adam(student.parameters(), lr=learning_rate)
+    scheduler = optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=num_epochs)
+    model_loader = ModelLoader(model_save_path)
+    
+    print(f"\nDestilando aluno MobileNetV2 {width_mult}x, entrada {input_size}x{input_size}, "
+          f"por {num_epochs} épocas...")
+    
+    best_val_acc = 0.0
+    
+    for epoch in range(num_epochs):
+        student.train()
+        for images, labels in tqdm(train_loader, desc=f"Época {epoch+1}/{num_epochs} [Destilação]"):
             images, labels = images.to(device), labels.to(device)
             
+            with torch.no_grad():
+                teacher_input = images
+                if teacher_size != input_size:
+                    teacher_input = nn.functional.interpolate(
+                        images, size=(teacher_size, teacher_size), mode='bilinear', align_corners=False
+                    )
+                teacher_logits = teacher(teacher_input)
+            
             optimizer.zero_grad()
-            outputs = model(images)
+            student_logits = student(images)
+            soft_loss = kl_div(
+                nn.functional.log_softmax(student_logits / temperature, dim=1),
+                nn.functional.softmax(teacher_logits / temperature, dim=1)
+            ) * temperature ** 2
+            loss = alpha * soft_loss + (1 - alpha) * criterion(student_logits, labels)
+            loss.backward()
+            optimizer.step()
+        
+        scheduler.step()
+        
+        val_acc = evaluate_split(student, images_dir, input_size, batch_size, cache_dir)
+        print(f"  Época {epoch+1}/{num_epochs}: Validação Acc: {val_acc:.2f}%")
+        
+        if val_acc > best_val_acc:
+            best_val_acc = val_acc
+            model_loader.save_model(student, teacher_loader.class_ids, teacher_loader.class_names)
+            print(f"  [OK] Melhor aluno salvo! (Acc: {val_acc:.2f}%)")
+    
+    best_student = ModelLoader(model_save_path).load_model()
+    return {
+        'width_mult': width_mult,
+        'input_size': input_size,
+        'val_acc': best_val_acc,
+        'latency_ms': measure_latency(best_student, input_size),
+        'parameters': sum(p.numel() for p in best_student.parameters()),
+        'path': model_save_path
+    }
+
+
+class CachedFeatureDataset(Dataset):
+    """Ativações pré-calculadas da parte congelada do MobileNetV2."""
+    
+    def __init__(self, features_dir: str, indices, copies):
+        """
+        Args:
+            features_dir: Diretório gerado por cache_backbone_features
+            indices: Índices das imagens incluídas
+            copies: Cópias (0 = sem augmentation, 1.. = augmentations fixas) incluídas
+        """
+        self.features_dir = Path(features_dir)
+        self.indices = list(indices)
+        self.copies = list(copies)
+        self.labels = np.load(str(self.features_dir / 'labels.npy'))
+        self._features = None
+    
+    def __len__(self):
+        return len(self.indices) * len(self.copies)
+    
+    def __getstate__(self):
+        # O mmap é reaberto em cada processo do DataLoader em vez de ser serializado
+        state = self.__dict__.copy()
+        state['_features'] = None
+        return state
+    
+    def __getitem__(self, idx):
+        if self._features is None:
+            self._features = np.load(str(self.features_dir / 'features.npy'), mmap_mode='r')
+        copy = self.copies[idx // len(self.indices)]
+        sample = self.indices[idx % len(self.indices)]
+        features = torch.from_numpy(self._features[copy, sample].astype(np.float32))
+        return features, int(self.labels[sample])
+
+
+def _split_backbone(model: PokemonClassifierModel, trainable_blocks: int):
+    """
+    Divide o MobileNetV2 em parte congelada e parte treinável.
+    
+    Returns:
+        Tupla (módulo congelado, módulo treinável). Com trainable_blocks=0 a parte
+        congelada inclui o pooling e só o classificador é treinado.
+    """
+    features = model.model.features
+    split = len(features) - trainable_blocks
+    
+    if trainable_blocks == 0:
+        frozen = nn.Sequential(*features, nn.AdaptiveAvgPool2d(1), nn.Flatten())
+        return frozen, model.model.classifier
+    
+    frozen = features[:split]
+    tail = nn.Sequential(*features[split:], nn.AdaptiveAvgPool2d(1), nn.Flatten(), model.model.classifier)
+    return frozen, tail
+
+
+def cache_backbone_features(
+    images_dir: str = "data/pokemon_images",
+    features_dir: str = "data/pokemon_features",
+    trainable_blocks: int = 10,
+    augmentations: int = 0,
+    batch_size: int = 64,
+    cache_dir: str = None,
+    num_workers: int = 0,
+    seed: int = 0,
+    split_seed: int = 0
+) -> Path:
+    """
+    Calcula uma única vez as ativações da parte congelada do MobileNetV2.
+    
+    A cópia 0 usa as transformações determinísticas; as cópias 1..augmentations
+    usam augmentation aleatório (sorteado uma vez, com semente fixa).
+    
+    Args:
+        images_dir: Diretório com subpastas por ID de Pokémon
+        features_dir: Diretório de saída (features.npy em float16, labels.npy, meta.json)
+        trainable_blocks: Blocos finais de ``features`` que continuarão treináveis
+        augmentations: Número de cópias com augmentation além da cópia limpa
+        batch_size: Tamanho do batch do forward
+        cache_dir: Cache de imagens pré-decodificadas (opcional)
+        num_workers: Processos do DataLoader
+        seed: Semente das augmentations
+        split_seed: Semente da divisão treino/validação (gravada em val_mask.npy)
+    
+    Returns:
+        Caminho do diretório com as ativações
+    """
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    torch.manual_seed(seed)
+    
+    model = PokemonClassifierModel(num_classes=1)
+    frozen, _ = _split_backbone(model, trainable_blocks)
+    frozen.to(device).eval()
+    
+    dataset = PokemonDataset(images_dir, cache_dir=cache_dir, seed=split_seed)
+    if len(dataset) == 0:
+        raise ValueError(f"Nenhuma imagem encontrada em {images_dir}")
+    
+    with torch.no_grad():
+        feature_shape = tuple(frozen(torch.zeros(1, 3, 224, 224, device=device)).shape[1:])
+    
+    output_path = Path(features_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    tmp_file = output_path / 'features.npy.part'
+    copies = 1 + augmentations
+    features = np.lib.format.open_memmap(
+        str(tmp_file), mode='w+', dtype=np.float16,
+        shape=(copies, len(dataset)) + feature_shape
+    )
+    
+    for copy in range(copies):
+        dataset.transform = build_eval_transform() if copy == 0 else build_train_transform()
+        loader = make_loader(dataset, batch_size, shuffle=False, num_workers=num_workers,
+                             persistent_workers=False)
+        start = 0
+        with torch.no_grad():
+            for images, _ in tqdm(loader, desc=f"Ativações [cópia {copy + 1}/{copies}]"):
+                output = frozen(images.to(device)).cpu().numpy()
+                features[copy, start:start + len(output)] = output
+                start += len(output)
+    
+    features.flush()
+    del features
+    os.replace(tmp_file, output_path / 'features.npy')
+    np.save(str(output_path / 'labels.npy'), np.array([label for _, label in dataset.samples], dtype=np.int64))
+    np.save(str(output_path / 'val_mask.npy'), np.array([split == 'val' for split in dataset.splits]))
+    with open(output_path / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'trainable_blocks': trainable_blocks, 'augmentations': augmentations,
+                   'split_seed': split_seed, 'num_samples': len(dataset), 'feature_shape': list(feature_shape),
+                   'class_ids': dataset.class_ids,
+                   'class_names': {str(pid): name for pid, name in load_pokemon_names(images_dir).items()}}, f)
+    
+    print(f"[OK] Ativações de {len(dataset)} imagens x {copies} cópias salvas em {features_dir}")
+    return output_path
+
+
+def features_are_current(features_dir: str, trainable_blocks: int, augmentations: int,
+                         split_seed: int, num_samples: int) -> bool:
+    """
+    Indica se as ativações em ``features_dir`` servem para o treino pedido.
+    
+    Precisam ter os mesmos blocos treináveis, augmentations, semente da
+    divisão e número de imagens, e o val_mask.npy correspondente.
+    """
+    features_path = Path(features_dir)
+    meta_file = features_path / 'meta.json'
+    if not meta_file.exists() or not (features_path / 'val_mask.npy').exists():
+        return False
+    meta = json.loads(meta_file.read_text(encoding='utf-8'))
+    return (meta.get('trainable_blocks') == trainable_blocks
+            and meta.get('augmentations') == augmentations
+            and meta.get('split_seed') == split_seed
+            and meta.get('num_samples') == num_samples)
+
+
+def train_on_cached_features(
+    features_dir: str = "data/pokemon_features",
+    model_save_path: str = "models/mobilenet_pokemon",
+    num_epochs: int = 30,
+    batch_size: int = 64,
+    learning_rate: float = 0.001
+):
+    """
+    Treina apenas a parte treinável do modelo sobre ativações pré-calculadas.
+    
+    Cada época custa só o forward/backward dos blocos finais e do classificador,
+    o que torna varreduras de hiperparâmetros baratas.
+    
+    Args:
+        features_dir: Diretório gerado por cache_backbone_features
+        model_save_path: Onde salvar o melhor modelo (completo, carregável pelo ModelLoader)
+        num_epochs: Número de épocas
+        batch_size: Tamanho do batch
+        learning_rate: Taxa de aprendizado
+    """
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    with open(Path(features_dir) / 'meta.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    
+    model = PokemonClassifierModel(num_classes=len(meta['class_ids']))
+    _, trainable = _split_backbone(model, meta['trainable_blocks'])
+    model_loader = ModelLoader(model_save_path)
+    class_names = {int(pid): name for pid, name in meta['class_names'].items()}
+    for param in trainable.parameters():
+        param.requires_grad = True
+    trainable.to(device)
+    
+    # Mesma divisão do split.json; a validação usa só a cópia sem augmentation
+    val_mask = np.load(str(Path(features_dir) / 'val_mask.npy'))
+    train_dataset = CachedFeatureDataset(features_dir, np.flatnonzero(~val_mask).tolist(),
+                                         range(1 + meta['augmentations']))
+    val_dataset = CachedFeatureDataset(features_dir, np.flatnonzero(val_mask).tolist(), [0])
+    
+    train_loader = make_loader(train_dataset, batch_size, shuffle=True)
+    val_loader = make_loader(val_dataset, batch_size, shuffle=False)
+    
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(trainable.parameters(), lr=learning_rate)
+    
+    print(f"\nTreinando sobre ativações em cache por {num_epochs} épocas "
+          f"({meta['trainable_blocks']} blocos treináveis)...")
+    print(f"Amostras de treino: {len(train_dataset)}")
+    print(f"Imagens de validação: {len(val_dataset)}")
+    
+    best_val_acc = 0.0
+    
+    for epoch in range(num_epochs):
+        epoch_start = time.perf_counter()
+        trainable.train()
+        train_correct = 0
+        train_total = 0
+        
+        for features, labels in train_loader:
+            features, labels = features.to(device), labels.to(device)
+            
+            optimizer.zero_grad()
+            outputs = trainable(features)
             loss = criterion(outputs, labels)
             loss.backward()
             optimizer.step()
             
-            train_loss += loss.item()
-            _, predicted = torch.max(outputs.data, 1)
             train_total += labels.size(0)
-            train_correct += (predicted == labels).sum().item()
+            train_correct += (outputs.argmax(1) == labels).sum().item()
         
-        # Validação
-        model.eval()
-        val_loss = 0.0
+        trainable.eval()
         val_correct = 0
         val_total = 0
-        
         with torch.no_grad():
-            for images, labels in tqdm(val_loader, desc=f"Época {epoch+1}/{num_epochs} [Validação]"):
-                images, labels = images.to(device), labels.to(device)
-                outputs = model(images)
-                loss = criterion(outputs, labels)
-                
-                val_loss += loss.item()
-                _, predicted = torch.max(outputs.data, 1)
+            for features, labels in val_loader:
+                features, labels = features.to(device), labels.to(device)
                 val_total += labels.size(0)
-                val_correct += (predicted == labels).sum().item()
+                val_correct += (trainable(features).argmax(1) == labels).sum().item()
         
         train_acc = 100 * train_correct / train_total
-        val_acc = 100 * val_correct / val_total
+        val_acc = 100 * val_correct / max(val_total, 1)
+        print(f"Época {epoch+1}/{num_epochs}: Treino Acc: {train_acc:.2f}%, "
+              f"Validação Acc: {val_acc:.2f}% ({time.perf_counter() - epoch_start:.1f}s)")
         
-        print(f"\nÉpoca {epoch+1}/{num_epochs}:")
-        print(f"  Treino - Loss: {train_loss/len(train_loader):.4f}, Acc: {train_acc:.2f}%")
-        print(f"  Validação - Loss: {val_loss/len(val_loader):.4f}, Acc: {val_acc:.2f}%")
-        
-        # Salva melhor modelo
         if val_acc > best_val_acc:
             best_val_acc = val_acc
-            model_loader = ModelLoader(model_save_path)
-            model_loader.save_model(model)
+            model_loader.save_model(model, meta['class_ids'], class_names)
             print(f"  [OK] Melhor modelo salvo! (Acc: {val_acc:.2f}%)")
-        
-        scheduler.step()
     
     print(f"\n[OK] Treinamento concluido! Melhor acuracia: {best_val_acc:.2f}%")
 
@@ -242,26 +1156,166 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Treina modelo MobileNetV2 para classificação de Pokémon")
     parser.add_argument("--download", action="store_true", help="Baixa imagens da PokéAPI primeiro")
     parser.add_argument("--train", action="store_true", help="Treina o modelo (padrão: True se não for --download)")
-    parser.add_argument("--num-pokemon", type=int, default=151, help="Número de Pokémon (padrão: 151)")
+    parser.add_argument("--num-pokemon", type=int, default=151,
+                        help="Número de Pokémon a baixar (padrão: 151; o treino cria uma classe por pasta de imagens)")
+    parser.add_argument("--download-workers", type=int, default=16, help="Downloads simultâneos (padrão: 16)")
+    parser.add_argument("--all-sprites", action="store_true",
+                        help="Baixa todas as variantes de sprite (costas, shiny, gerações)")
+    parser.add_argument("--verify", action="store_true", help="Confere o SHA-256 das imagens já baixadas")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Treina a partir de imagens pré-decodificadas neste diretório (criado se não existir; "
+                             "padrão: data/pokemon_cache, se existir)")
+    parser.add_argument("--prepare-cache", action="store_true",
+                        help="(Re)cria o cache de imagens pré-decodificadas em --cache-dir")
+    parser.add_argument("--cached-features", action="store_true",
+                        help="Treina só os blocos finais sobre ativações pré-calculadas do backbone congelado")
+    parser.add_argument("--features-dir", type=str, default="data/pokemon_features",
+                        help="Diretório das ativações pré-calculadas (padrão: data/pokemon_features)")
+    parser.add_argument("--feature-augmentations", type=int, default=0,
+                        help="Cópias com augmentation fixa nas ativações (padrão: 0)")
+    parser.add_argument("--trainable-blocks", type=int, default=10,
+                        help="Blocos finais treináveis com --cached-features (padrão: 10; 0 = só o classificador)")
+    parser.add_argument("--num-workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Processos do DataLoader (padrão: min(4, núcleos); 0 = sem processos)")
+    parser.add_argument("--prefetch-factor", type=int, default=2,
+                        help="Batches preparados antecipadamente por processo (padrão: 2)")
+    parser.add_argument("--no-persistent-workers", action="store_true",
+                        help="Recria os processos do DataLoader a cada época")
+    parser.add_argument("--pin-memory", action="store_true", default=None,
+                        help="Usa memória fixada nos batches (padrão: ativado só com CUDA)")
+    parser.add_argument("--bf16", action="store_true",
+                        help="Treina com autocast bfloat16 (CPUs com AVX512-BF16/AMX ou GPU)")
+    parser.add_argument("--channels-last", action="store_true", help="Usa o formato de memória channels_last")
+    parser.add_argument("--compile", action="store_true", help="Compila o modelo com torch.compile")
+    parser.add_argument("--accumulation-steps", type=int, default=1,
+                        help="Batches acumulados por passo do otimizador (padrão: 1)")
+    parser.add_argument("--fp32-baseline", type=float, default=None,
+                        help="Acurácia de validação (%%) de um treino FP32 de referência para comparação")
+    parser.add_argument("--acc-tolerance", type=float, default=1.0,
+                        help="Diferença máxima aceita em relação a --fp32-baseline, em pontos percentuais (padrão: 1.0)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma o treino do último checkpoint (models/mobilenet_pokemon/checkpoint.pth)")
+    parser.add_argument("--patience", type=int, default=0,
+                        help="Para após N validações seguidas sem melhora (padrão: 0 = desativado)")
+    parser.add_argument("--val-every", type=int, default=1, help="Valida a cada N épocas (padrão: 1)")
+    parser.add_argument("--split-seed", type=int, default=0,
+                        help="Semente da divisão treino/validação estratificada (padrão: 0)")
+    parser.add_argument("--rebuild-split", action="store_true",
+                        help="Recria data/pokemon_images/split.json (lista de imagens e divisão)")
+    parser.add_argument("--distill", action="store_true",
+                        help="Destila o modelo treinado em alunos menores (ver --students)")
+    parser.add_argument("--students", type=str, nargs='+', default=["0.5x224", "1.0x160", "0.5x160"],
+                        help="Alunos como LARGURAxENTRADA (padrão: 0.5x224 1.0x160 0.5x160)")
     parser.add_argument("--epochs", type=int, default=10, help="Número de épocas (padrão: 10)")
     parser.add_argument("--batch-size", type=int, default=32, help="Tamanho do batch (padrão: 32)")
+    parser.add_argument("--build-index", action="store_true",
+                        help="Monta o índice de embeddings (modo RECOGNITION_MODE=embedding) com as imagens baixadas")
     
     args = parser.parse_args()
     
+    # O cache padrão é o mesmo para --prepare-cache e para o treino
+    if args.cache_dir is None and (args.prepare_cache or (Path(DEFAULT_CACHE_DIR) / 'images.npy').exists()):
+        args.cache_dir = DEFAULT_CACHE_DIR
+    
     if args.download:
         print("[INFO] Baixando imagens...")
-        download_pokemon_images(num_pokemon=args.num_pokemon)
+        download_pokemon_images(
+            num_pokemon=args.num_pokemon,
+            max_workers=args.download_workers,
+            all_variants=args.all_sprites,
+            verify=args.verify
+        )
         print("[OK] Download concluido!")
     
+    if args.prepare_cache:
+        prepare_dataset_cache(cache_dir=args.cache_dir)
+    
     # Se não foi especificado --download apenas, ou se foi especificado --train, treina
-    if args.train or not args.download:
+    if args.distill:
+        # Professor: o modelo treinado em models/mobilenet_pokemon
+        teacher = ModelLoader().load_model()
+        results = [{
+            'width_mult': 1.0, 'input_size': 224,
+            'val_acc': evaluate_split(teacher, batch_size=args.batch_size, cache_dir=args.cache_dir),
+            'latency_ms': measure_latency(teacher, 224),
+            'parameters': sum(p.numel() for p in teacher.parameters()),
+            'path': 'models/mobilenet_pokemon'
+        }]
+        for spec in args.students:
+            width_mult, input_size = parse_student_spec(spec)
+            results.append(distill_model(
+                model_save_path=f"models/mobilenet_pokemon_student_{width_mult}x{input_size}",
+                width_mult=width_mult,
+                input_size=input_size,
+                num_epochs=args.epochs,
+                batch_size=args.batch_size,
+                cache_dir=args.cache_dir,
+                num_workers=args.num_workers
+            ))
+        
+        print("\nAcurácia x latência (CPU, 1 imagem):")
+        for result in results:
+            print(f"  {result['width_mult']}x{result['input_size']:<4} {result['val_acc']:6.2f}% "
+                  f"{result['latency_ms']:8.2f} ms {result['parameters'] / 1e6:6.2f}M parâmetros  {result['path']}")
+        print("\nPara servir um aluno, defina MODEL_PATH com o diretório dele.")
+    elif args.cached_features:
+        # Mesmo conjunto de imagens e divisão que o cálculo das ativações usaria
+        num_samples = len(PokemonDataset("data/pokemon_images", cache_dir=args.cache_dir,
+                                         seed=args.split_seed, rebuild_split=args.rebuild_split))
+        if not features_are_current(args.features_dir, args.trainable_blocks, args.feature_augmentations,
+                                    args.split_seed, num_samples):
+            print("\n[INFO] Calculando ativações do backbone congelado...")
+            cache_backbone_features(
+                features_dir=args.features_dir,
+                trainable_blocks=args.trainable_blocks,
+                augmentations=args.feature_augmentations,
+                cache_dir=args.cache_dir,
+                num_workers=args.num_workers,
+                split_seed=args.split_seed
+            )
+        train_on_cached_features(
+            features_dir=args.features_dir,
+            num_epochs=args.epochs,
+            batch_size=args.batch_size
+        )
+    elif args.train or not (args.download or args.build_index or args.prepare_cache):
         print("\n[INFO] Iniciando treinamento...")
-        train_model(
+        best_acc = train_model(
             num_epochs=args.epochs,
             batch_size=args.batch_size,
-            num_pokemon=args.num_pokemon
+            cache_dir=args.cache_dir,
+            num_workers=args.num_workers,
+            prefetch_factor=args.prefetch_factor,
+            persistent_workers=not args.no_persistent_workers,
+            pin_memory=args.pin_memory,
+            bf16=args.bf16,
+            channels_last=args.channels_last,
+            compile_model=args.compile,
+            accumulation_steps=args.accumulation_steps,
+            resume=args.resume,
+            patience=args.patience,
+            val_every=args.val_every,
+            split_seed=args.split_seed,
+            rebuild_split=args.rebuild_split
         )
+        
+        if args.fp32_baseline is not None:
+            difference = best_acc - args.fp32_baseline
+            if difference >= -args.acc_tolerance:
+                print(f"[OK] Acurácia dentro da tolerância do FP32 ({difference:+.2f} pontos)")
+            else:
+                print(f"[ERRO] Acurácia fora da tolerância do FP32: {best_acc:.2f}% vs "
+                      f"{args.fp32_baseline:.2f}% ({difference:+.2f} pontos, tolerância {args.acc_tolerance})")
+                sys.exit(1)
     elif args.download and not args.train:
         print("\n[INFO] Para treinar o modelo, execute:")
         print(f"   python scripts/train_model.py --train --epochs {args.epochs} --batch-size {args.batch_size}")
-
+    
+    # O índice usa o modelo salvo, então é montado depois do treino
+    if args.build_index:
+        from src.vision.pokemon_classifier import PokemonClassifier
+        
+        print("\n[INFO] Montando índice de embeddings...")
+        classifier = PokemonClassifier(use_cache=False, mode='embedding', load_index=False)
+        index = classifier.build_index()
+        print(f"[OK] Índice salvo: {len(index)} imagens de {index.num_species} Pokémon")
@@ -2,7 +2,9 @@
 
 import requests
 import os
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from dotenv import load_dotenv
 from src.database.db_manager import DatabaseManager
 
@@ -13,6 +15,8 @@ except Exception:
     pass
 
 POKEAPI_BASE_URL = os.getenv('POKEAPI_BASE_URL', 'https://pokeapi.co/api/v2')
+# Requisições simultâneas ao buscar vários Pokémon de uma vez
+POKEAPI_MAX_CONCURRENCY = int(os.getenv('POKEAPI_MAX_CONCURRENCY', 8))
 
 
 class PokeAPIClient:
@@ -63,10 +67,33 @@ class PokeAPIClient:
         Returns:
             Dados do Pokémon ou None
         """
+        entry = self.get_pokemon_entry(pokemon_id)
+        return entry[0] if entry else None
+    
+    def _save_entry(self, data: Dict[Any, Any]) -> str:
+        """Salva os dados no cache (se disponível) e retorna o created_at da entrada."""
+        created_at = None
+        if self.db_manager:
+            try:
+                created_at = self.db_manager.save_cache(data)
+            except Exception as e:
+                print(f"[AVISO API] Erro ao salvar cache: {e}")
+        return created_at or datetime.now().isoformat()
+    
+    def get_pokemon_entry(self, pokemon_id: int) -> Optional[Tuple[Dict[Any, Any], str]]:
+        """
+        Busca Pokémon por ID junto com a data da entrada no cache.
+        
+        Args:
+            pokemon_id: ID numérico do Pokémon
+            
+        Returns:
+            Tupla (dados, created_at em ISO) ou None
+        """
         # Verifica cache primeiro (se disponível)
         if self.db_manager:
             try:
-                cached = self.db_manager.get_cached(str(pokemon_id))
+                cached = self.db_manager.get_cached_entry(str(pokemon_id))
                 if cached:
                     return cached
             except Exception as e:
@@ -74,15 +101,9 @@ class PokeAPIClient:
         
         # Busca na API
         data = self._make_request(f'pokemon/{pokemon_id}')
-        
-        if data and self.db_manager:
-            try:
-                # Salva no cache (se disponível)
-                self.db_manager.save_cache(data)
-            except Exception as e:
-                print(f"[AVISO API] Erro ao salvar cache: {e}")
-        
-        return data
+        if not data:
+            return None
+        return data, self._save_entry(data)
     
     def get_pokemon_by_name(self, name: str) -> Optional[Dict[Any, Any]]:
         """
@@ -115,6 +136,40 @@ class PokeAPIClient:
         
         return data
     
+    def iter_pokemon_entries(self, pokemon_ids: List[int]) -> Iterator[Tuple[int, Optional[Tuple[Dict[Any, Any], str]]]]:
+        """
+        Busca vários Pokémon por ID, entregando cada um assim que fica disponível.
+        
+        Primeiro os que já estão no cache (uma única consulta), depois os
+        buscados na API em paralelo, na ordem em que as respostas chegam: a
+        latência total fica próxima à de uma única busca.
+        
+        Args:
+            pokemon_ids: IDs numéricos dos Pokémon
+            
+        Yields:
+            Tuplas (id, (dados, created_at) ou None)
+        """
+        pokemon_ids = list(dict.fromkeys(int(pokemon_id) for pokemon_id in pokemon_ids))
+        
+        found: Dict[int, Tuple[Dict[Any, Any], str]] = {}
+        if self.db_manager:
+            try:
+                found.update(self.db_manager.get_cached_entries(pokemon_ids))
+            except Exception as e:
+                print(f"[AVISO API] Erro ao buscar cache: {e}")
+        yield from found.items()
+        
+        missing = [pokemon_id for pokemon_id in pokemon_ids if pokemon_id not in found]
+        if missing:
+            workers = min(len(missing), POKEAPI_MAX_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._make_request, f'pokemon/{pokemon_id}'): pokemon_id
+                           for pokemon_id in missing}
+                for future in as_completed(futures):
+                    data = future.result()
+                    yield futures[future], ((data, self._save_entry(data)) if data else None)
+    
     def get_pokemon_list(self, limit: int = 151, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Lista Pokémon com paginação.
@@ -133,6 +188,36 @@ class PokeAPIClient:
         
         return data.get('results', [])
     
+    def get_species_list(self) -> List[Dict[str, Any]]:
+        """
+        Lista todas as espécies (ID e nome), com cache no SQLite.
+        
+        Sem conexão, usa a lista salva mesmo expirada ou, na falta dela, os
+        nomes dos Pokémon já consultados.
+        
+        Returns:
+            Lista de {'id', 'name'}
+        """
+        if self.db_manager:
+            cached = self.db_manager.get_species_list()
+            if cached:
+                return cached
+        
+        data = self._make_request('pokemon-species?limit=100000')
+        if data:
+            # O ID só vem na URL: .../pokemon-species/25/
+            species = [
+                {'id': int(item['url'].rstrip('/').rsplit('/', 1)[-1]), 'name': item['name']}
+                for item in data.get('results', [])
+            ]
+            if self.db_manager:
+                self.db_manager.save_species_list(species)
+            return species
+        
+        if not self.db_manager:
+            return []
+        return self.db_manager.get_species_list(max_age=None) or self.db_manager.get_cached_names()
+    
     def get_pokemon_type_info(self, type_name: str) -> Optional[Dict[Any, Any]]:
         """
         Busca informações sobre um tipo de Pokémon.
@@ -0,0 +1,138 @@
+"""Respostas de comparação entre vários Pokémon (stats e vantagem de tipo)."""
+
+from typing import Dict, List, Optional
+
+# Multiplicador de dano do tipo do ataque (chave) contra o tipo do defensor; ausente = 1x
+TYPE_EFFECTIVENESS: Dict[str, Dict[str, float]] = {
+    'normal': {'rock': 0.5, 'ghost': 0, 'steel': 0.5},
+    'fire': {'fire': 0.5, 'water': 0.5, 'grass': 2, 'ice': 2, 'bug': 2, 'rock': 0.5, 'dragon': 0.5, 'steel': 2},
+    'water': {'fire': 2, 'water': 0.5, 'grass': 0.5, 'ground': 2, 'rock': 2, 'dragon': 0.5},
+    'electric': {'water': 2, 'electric': 0.5, 'grass': 0.5, 'ground': 0, 'flying': 2, 'dragon': 0.5},
+    'grass': {'fire': 0.5, 'water': 2, 'grass': 0.5, 'poison': 0.5, 'ground': 2, 'flying': 0.5,
+              'bug': 0.5, 'rock': 2, 'dragon': 0.5, 'steel': 0.5},
+    'ice': {'fire': 0.5, 'water': 0.5, 'grass': 2, 'ice': 0.5, 'ground': 2, 'flying': 2, 'dragon': 2, 'steel': 0.5},
+    'fighting': {'normal': 2, 'ice': 2, 'poison': 0.5, 'flying': 0.5, 'psychic': 0.5, 'bug': 0.5,
+                 'rock': 2, 'ghost': 0, 'dark': 2, 'steel': 2, 'fairy': 0.5},
+    'poison': {'grass': 2, 'poison': 0.5, 'ground': 0.5, 'rock': 0.5, 'ghost': 0.5, 'steel': 0, 'fairy': 2},
+    'ground': {'fire': 2, 'electric': 2, 'grass': 0.5, 'poison': 2, 'flying': 0, 'bug': 0.5, 'rock': 2, 'steel': 2},
+    'flying': {'electric': 0.5, 'grass': 2, 'fighting': 2, 'bug': 2, 'rock': 0.5, 'steel': 0.5},
+    'psychic': {'fighting': 2, 'poison': 2, 'psychic': 0.5, 'dark': 0, 'steel': 0.5},
+    'bug': {'fire': 0.5, 'grass': 2, 'fighting': 0.5, 'poison': 0.5, 'flying': 0.5, 'psychic': 2,
+            'ghost': 0.5, 'dark': 2, 'steel': 0.5, 'fairy': 0.5},
+    'rock': {'fire': 2, 'ice': 2, 'fighting': 0.5, 'ground': 0.5, 'flying': 2, 'bug': 2, 'steel': 0.5},
+    'ghost': {'normal': 0, 'psychic': 2, 'ghost': 2, 'dark': 0.5},
+    'dragon': {'dragon': 2, 'steel': 0.5, 'fairy': 0},
+    'dark': {'fighting': 0.5, 'psychic': 2, 'ghost': 2, 'dark': 0.5, 'fairy': 0.5},
+    'steel': {'fire': 0.5, 'water': 0.5, 'electric': 0.5, 'ice': 2, 'rock': 2, 'steel': 0.5, 'fairy': 2},
+    'fairy': {'fire': 0.5, 'fighting': 2, 'poison': 0.5, 'dragon': 2, 'dark': 2, 'steel': 0.5},
+}
+
+
+def _types(pokemon_data: dict) -> List[str]:
+    return [t['type']['name'] for t in pokemon_data.get('types', [])]
+
+
+def _stats(pokemon_data: dict) -> Dict[str, int]:
+    return {s['stat']['name']: s['base_stat'] for s in pokemon_data.get('stats', [])}
+
+
+def _format_multiplier(value: float) -> str:
+    return f"{value:g}x"
+
+
+def type_multiplier(attack_type: str, defender_types: List[str]) -> float:
+    """
+    Multiplicador de dano de um ataque contra um Pokémon (produto sobre os tipos do defensor).
+    
+    Args:
+        attack_type: Tipo do ataque (ex.: 'water')
+        defender_types: Tipos do Pokémon que recebe o ataque
+    
+    Returns:
+        Multiplicador (0, 0.25, 0.5, 1, 2 ou 4)
+    """
+    multiplier = 1.0
+    for defender_type in defender_types:
+        multiplier *= TYPE_EFFECTIVENESS.get(attack_type, {}).get(defender_type, 1)
+    return multiplier
+
+
+def best_attack(attacker_data: dict, defender_data: dict):
+    """
+    Melhor ataque do mesmo tipo (STAB) do atacante contra o defensor.
+    
+    Returns:
+        Tupla (tipo do ataque, multiplicador) ou (None, 1.0) se o atacante não tiver tipos
+    """
+    defender_types = _types(defender_data)
+    options = [(attack_type, type_multiplier(attack_type, defender_types)) for attack_type in _types(attacker_data)]
+    return max(options, key=lambda option: option[1]) if options else (None, 1.0)
+
+
+def comparison_header(names: List[str]) -> str:
+    """Título e início da seção de tipos; só depende dos nomes (sai antes das buscas)."""
+    return f"**{' vs '.join(names)}**\n\n**Tipos:**"
+
+
+def comparison_type_line(name: str, pokemon_data: dict) -> str:
+    """Linha de tipos de um Pokémon (sai assim que os dados dele chegam)."""
+    return f"\n- {name}: {' / '.join(t.title() for t in _types(pokemon_data))}"
+
+
+def comparison_details(names: List[str], pokemon_list: List[dict]) -> str:
+    """Tabela de stats, confrontos de tipo e maior total; precisa de todos os Pokémon."""
+    stats = [_stats(p) for p in pokemon_list]
+    stat_names = list(stats[0]) or ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed']
+    pair = len(pokemon_list) == 2
+    
+    header = "| Stat | " + " | ".join(names) + (" | Diferença |" if pair else " |")
+    separator = "|---" * (len(names) + 1 + pair) + "|"
+    rows = [header, separator]
+    for stat_name in stat_names + ['total']:
+        if stat_name == 'total':
+            values = [sum(s.values()) for s in stats]
+            label = "**Total**"
+        else:
+            values = [s.get(stat_name, 0) for s in stats]
+            label = stat_name.replace('-', ' ').title()
+        row = f"| {label} | " + " | ".join(str(v) for v in values)
+        if pair:
+            row += f" | {values[0] - values[1]:+d}"
+        rows.append(row + " |")
+    
+    lines = ["", "", *rows, "", "**Vantagem de tipo (melhor ataque do próprio tipo):**"]
+    for attacker_name, attacker in zip(names, pokemon_list):
+        for defender_name, defender in zip(names, pokemon_list):
+            if attacker is defender:
+                continue
+            attack_type, multiplier = best_attack(attacker, defender)
+            if attack_type:
+                lines.append(
+                    f"- {attacker_name} → {defender_name}: {attack_type.title()} causa {_format_multiplier(multiplier)}"
+                )
+    
+    totals = [sum(s.values()) for s in stats]
+    best = max(range(len(names)), key=lambda i: totals[i])
+    lines += ["", f"Maior total de stats: **{names[best]}** ({totals[best]})."]
+    return "\n".join(lines)
+
+
+def format_comparison_response(pokemon_list: List[dict], names: Optional[List[str]] = None) -> str:
+    """
+    Compara stats e vantagem de tipo entre dois ou mais Pokémon.
+    
+    É a concatenação de comparison_header, uma comparison_type_line por
+    Pokémon e comparison_details, para que a versão incremental do chatbot
+    monte exatamente o mesmo texto.
+    
+    Args:
+        pokemon_list: Dados dos Pokémon da PokéAPI, na ordem em que foram citados
+        names: Nomes a exibir (padrão: os nomes dos dados)
+    
+    Returns:
+        Resposta em Markdown (tipos, tabela de stats, diferença quando são dois e confrontos de tipo)
+    """
+    names = names or [p.get('name', '').title() for p in pokemon_list]
+    return (comparison_header(names)
+            + "".join(comparison_type_line(name, data) for name, data in zip(names, pokemon_list))
+            + comparison_details(names, pokemon_list))
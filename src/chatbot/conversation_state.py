@@ -0,0 +1,117 @@
+"""Estado das conversas do chatbot (contexto para perguntas de continuação)."""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from src.database.db_manager import DatabaseManager, CACHE_TTL
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+# Sessões mantidas em memória (as inativas há mais tempo saem primeiro)
+CHATBOT_MAX_SESSIONS = int(os.getenv('CHATBOT_MAX_SESSIONS', 1000))
+# Tempo (s) sem mensagens até a sessão ser descartada
+CHATBOT_SESSION_TTL = float(os.getenv('CHATBOT_SESSION_TTL', 1800))
+# Pokémon lembrados por sessão (os citados na última pergunta)
+MAX_REMEMBERED_POKEMON = 6
+
+
+@dataclass
+class ConversationState:
+    """Contexto de uma sessão: última intenção e Pokémon da última resposta, com os dados já buscados."""
+    intent: Optional[str] = None
+    entities: List[Tuple[int, str]] = field(default_factory=list)
+    # id -> (dados da PokéAPI, created_at da entrada do cache)
+    entries: Dict[int, Tuple[Dict[Any, Any], str]] = field(default_factory=dict)
+    # Geração do cache SQLite quando os dados foram lidos
+    generation: int = field(default_factory=lambda: DatabaseManager.cache_generation)
+    
+    def fresh_entries(self) -> Dict[int, Tuple[Dict[Any, Any], str]]:
+        """
+        Dados ainda válidos: dentro do CACHE_TTL e sem limpeza do cache desde a leitura.
+        
+        Returns:
+            Cópia de ``entries`` só com as entradas válidas
+        """
+        if self.generation != DatabaseManager.cache_generation:
+            return {}
+        now = time.time()
+        return {
+            pokemon_id: entry for pokemon_id, entry in self.entries.items()
+            if datetime.fromisoformat(entry[1]).timestamp() + CACHE_TTL > now
+        }
+
+
+class SessionStore:
+    """
+    Estados de conversa por sessão, com limite de sessões e expiração por inatividade.
+    
+    Cada sessão guarda só o contexto da última resposta, e os dados dos
+    Pokémon são os mesmos objetos devolvidos pela busca (sem cópia).
+    """
+    
+    def __init__(self, max_sessions: int = CHATBOT_MAX_SESSIONS, idle_ttl: float = CHATBOT_SESSION_TTL):
+        """
+        Cria o armazenamento vazio.
+        
+        Args:
+            max_sessions: Número máximo de sessões em memória
+            idle_ttl: Segundos sem mensagens até a sessão expirar
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, Tuple[ConversationState, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _evict(self, now: float):
+        """Remove sessões expiradas e as excedentes (chamado com o lock)."""
+        while self._sessions:
+            _, (_, last_seen) = next(iter(self._sessions.items()))
+            if now - last_seen < self.idle_ttl and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+    
+    def get(self, session_id: str) -> Optional[ConversationState]:
+        """
+        Busca o estado de uma sessão.
+        
+        Returns:
+            Estado ou None se a sessão não existir ou tiver expirado
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            item = self._sessions.get(session_id)
+            return item[0] if item else None
+    
+    def put(self, session_id: str, state: ConversationState):
+        """Guarda o estado de uma sessão (renova a expiração)."""
+        if len(state.entities) > MAX_REMEMBERED_POKEMON:
+            kept = state.entities[:MAX_REMEMBERED_POKEMON]
+            state = ConversationState(
+                state.intent, kept,
+                {pokemon_id: state.entries[pokemon_id] for pokemon_id, _ in kept if pokemon_id in state.entries},
+                state.generation
+            )
+        
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (state, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+    
+    def clear(self, session_id: str):
+        """Esquece o contexto de uma sessão."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+    
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,268 @@
+"""Reconhecimento de nomes de Pokémon nas mensagens por dicionário (Aho-Corasick)."""
+
+import re
+import difflib
+import unicodedata
+from collections import deque, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Apelidos que a geração automática (hífen -> espaço/junto) não cobre; valor = nome na PokéAPI
+EXTRA_ALIASES = {
+    'nidoran femea': 'nidoran-f',
+    'nidoran macho': 'nidoran-m',
+    'farfetch d': 'farfetchd',
+    'sirfetch d': 'sirfetchd',
+    'mr mime jr': 'mime-jr',
+}
+
+# Palavras comuns das perguntas que nunca devem ser corrigidas para um nome parecido
+COMMON_WORDS = {
+    'qual', 'quais', 'quem', 'sobre', 'fale', 'quero', 'saber', 'dados', 'tipo', 'tipos',
+    'stats', 'stat', 'estatisticas', 'atributos', 'poder', 'poderes', 'defesa', 'ataque',
+    'habilidade', 'habilidades', 'ability', 'skills', 'informacoes', 'informacao', 'pokemon',
+    'evolucao', 'evolucoes', 'evolui', 'cadeia', 'para', 'compare', 'comparar', 'entre',
+    'melhor', 'contra', 'mais', 'forte', 'fraco', 'fraquezas', 'pokedex', 'ola', 'obrigado',
+    'dele', 'dela', 'deles', 'delas', 'esse', 'essa', 'este', 'esta', 'outro', 'outra',
+}
+
+# Separadores aceitos entre dois nomes para indicar comparação
+VERSUS_WORDS = {'vs', 'versus', 'x'}
+
+FUZZY_CUTOFF = 0.8
+FUZZY_MIN_LENGTH = 4
+
+
+def normalize(text: str) -> str:
+    """
+    Normaliza texto para comparação: minúsculas, sem acentos, só letras/dígitos separados por um espaço.
+    
+    Args:
+        text: Texto original
+    
+    Returns:
+        Texto normalizado (ex.: "Mr. Mime!" -> "mr mime")
+    """
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'[a-z0-9]+', without_accents))
+
+
+class AhoCorasick:
+    """Automato de Aho-Corasick: encontra todas as ocorrências de vários padrões em uma passada."""
+    
+    def __init__(self):
+        """Cria o automato vazio (adicione padrões com add e chame build)."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+    
+    def add(self, pattern: str, value: Any):
+        """
+        Adiciona um padrão.
+        
+        Args:
+            pattern: Texto a procurar
+            value: Valor devolvido quando o padrão é encontrado
+        """
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value))
+    
+    def build(self):
+        """Calcula os links de falha (busca em largura)."""
+        # Estados de profundidade 1 falham para a raiz
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                if state:
+                    self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Percorre o texto uma vez.
+        
+        Yields:
+            Tuplas (início, fim, valor) de cada ocorrência
+        """
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                yield i + 1 - length, i + 1, value
+
+
+class PokemonNameMatcher:
+    """Encontra nomes de Pokémon (e apelidos) em mensagens sem consultar a PokéAPI."""
+    
+    def __init__(self, species: List[Dict[str, Any]]):
+        """
+        Monta o dicionário.
+        
+        Args:
+            species: Lista de {'id', 'name'} (ver PokeAPIClient.get_species_list)
+        """
+        self.names: Dict[str, Tuple[int, str]] = {}
+        # ID -> nome da espécie (para exibir Pokémon reconhecidos só pelo ID)
+        self._by_id: Dict[int, str] = {}
+        for item in species:
+            name = item['name'].lower()
+            entry = (int(item['id']), name)
+            self._by_id.setdefault(entry[0], name)
+            for alias in {name, name.replace('-', ' '), name.replace('-', '')}:
+                self.names.setdefault(normalize(alias), entry)
+        
+        by_name = {entry[1]: entry for entry in self.names.values()}
+        for alias, name in EXTRA_ALIASES.items():
+            if name in by_name:
+                self.names.setdefault(normalize(alias), by_name[name])
+        
+        self._automaton = AhoCorasick()
+        for alias, entry in self.names.items():
+            if alias:
+                self._automaton.add(alias, entry)
+        self._automaton.build()
+        
+        # Candidatos da busca aproximada agrupados por tamanho
+        self._by_length: Dict[int, List[str]] = defaultdict(list)
+        for alias in self.names:
+            if ' ' not in alias:
+                self._by_length[len(alias)].append(alias)
+    
+    @classmethod
+    def from_client(cls, api_client) -> 'PokemonNameMatcher':
+        """Monta o dicionário a partir da lista de espécies em cache (ou da PokéAPI na primeira vez)."""
+        return cls(api_client.get_species_list())
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def name_of(self, pokemon_id: int) -> Optional[str]:
+        """Nome da espécie pelo ID (None se não estiver na lista)."""
+        return self._by_id.get(pokemon_id)
+    
+    def _spans(self, text: str) -> List[Tuple[int, int, Tuple[int, str]]]:
+        """
+        Ocorrências no texto normalizado, sem sobreposição.
+        
+        Só conta ocorrências de palavras inteiras; quando se sobrepõem, vale a
+        mais longa ("mewtwo" em vez de "mew").
+        """
+        candidates = [
+            (start, end, entry)
+            for start, end, entry in self._automaton.iter_matches(text)
+            if (start == 0 or text[start - 1] == ' ') and (end == len(text) or text[end] == ' ')
+        ]
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        
+        spans = []
+        position = 0
+        for start, end, entry in candidates:
+            if start >= position:
+                spans.append((start, end, entry))
+                position = end
+        return spans
+    
+    def find_all(self, message: str) -> List[Tuple[int, str]]:
+        """
+        Encontra todos os Pokémon citados, na ordem em que aparecem.
+        
+        Args:
+            message: Mensagem do usuário
+        
+        Returns:
+            Lista de tuplas (id, nome) sem repetição
+        """
+        found = []
+        for _, _, entry in self._spans(normalize(message)):
+            if entry not in found:
+                found.append(entry)
+        return found
+    
+    def is_versus(self, message: str) -> bool:
+        """
+        Verifica se a mensagem tem a forma "<Pokémon> vs <Pokémon>".
+        
+        Aceita "vs", "versus" e "x" só entre dois nomes reconhecidos, para que
+        frases como "raio x do Pikachu" não virem comparação.
+        
+        Args:
+            message: Mensagem do usuário
+        
+        Returns:
+            True se dois nomes seguidos estiverem separados por vs/versus/x
+        """
+        text = normalize(message)
+        spans = self._spans(text)
+        return any(
+            text[first[1]:second[0]].strip() in VERSUS_WORDS
+            for first, second in zip(spans, spans[1:])
+        )
+    
+    def strip_names(self, message: str) -> str:
+        """
+        Remove da mensagem os nomes de Pokémon reconhecidos.
+        
+        Args:
+            message: Mensagem do usuário
+        
+        Returns:
+            Texto normalizado sem os nomes (ex.: "Tipo do Pikachu?" -> "tipo do")
+        """
+        text = normalize(message)
+        parts = []
+        position = 0
+        for start, end, _ in self._spans(text):
+            parts.append(text[position:start])
+            position = end
+        parts.append(text[position:])
+        return ' '.join(''.join(parts).split())
+    
+    def find(self, message: str) -> Optional[Tuple[int, str]]:
+        """Primeiro Pokémon citado na mensagem, ou None."""
+        found = self.find_all(message)
+        return found[0] if found else None
+    
+    def fuzzy_find(self, message: str, cutoff: float = FUZZY_CUTOFF) -> Optional[Tuple[int, str]]:
+        """
+        Procura um nome com erro de digitação ("charizad", "pikachuu").
+        
+        Args:
+            message: Mensagem do usuário
+            cutoff: Similaridade mínima (0 a 1)
+        
+        Returns:
+            Tupla (id, nome) do nome mais parecido, ou None
+        """
+        best = None
+        best_ratio = cutoff
+        
+        for word in normalize(message).split():
+            if len(word) < FUZZY_MIN_LENGTH or word in COMMON_WORDS:
+                continue
+            candidates = [
+                alias
+                for length in range(len(word) - 2, len(word) + 3)
+                for alias in self._by_length.get(length, [])
+            ]
+            for alias in difflib.get_close_matches(word, candidates, n=1, cutoff=best_ratio):
+                ratio = difflib.SequenceMatcher(None, word, alias).ratio()
+                if best is None or ratio > best_ratio:
+                    best, best_ratio = self.names[alias], ratio
+        
+        return best
@@ -0,0 +1,233 @@
+"""Classificador de intenção leve (TF-IDF de n-gramas de caracteres + regressão logística em NumPy)."""
+
+import os
+import re
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from src.chatbot.entity_recognizer import normalize
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+NLU_PATH = os.getenv('CHATBOT_NLU_PATH', str(ROOT_DIR / 'rasa' / 'data' / 'nlu.yml'))
+# Gerado a partir do nlu.yml (não versionado); relativo à raiz do projeto, não ao diretório atual
+INTENT_MODEL_PATH = os.getenv('CHATBOT_INTENT_MODEL', str(ROOT_DIR / 'models' / 'intent_classifier.npz'))
+
+# Mesmo intervalo do CountVectorsFeaturizer (char_wb) do config.yml do Rasa, sem unigramas
+MIN_NGRAM = 2
+MAX_NGRAM = 4
+
+# Anotação de entidade do Rasa: [Pikachu](pokemon_name)
+ENTITY_PATTERN = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+
+
+def load_nlu_examples(path: str = NLU_PATH, annotated: bool = False) -> List[Tuple[str, str]]:
+    """
+    Lê os exemplos de treino do nlu.yml do Rasa.
+    
+    Lê só o formato usado no projeto (``- intent:`` seguido de
+    ``examples: |`` e uma lista de ``- exemplo``), sem depender de PyYAML.
+    As entidades anotadas são removidas do texto: o classificador aprende a
+    forma da pergunta, e o nome do Pokémon fica com o reconhecedor de nomes.
+    
+    Args:
+        path: Caminho do nlu.yml
+        annotated: Mantém o texto original, com as anotações ``[nome](entidade)``
+    
+    Returns:
+        Lista de tuplas (texto, intenção)
+    """
+    examples = []
+    intent = None
+    
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith('- intent:'):
+                intent = stripped.split(':', 1)[1].strip()
+            elif stripped.startswith('- ') and intent and line.startswith('      '):
+                text = stripped[2:] if annotated else ENTITY_PATTERN.sub(' ', stripped[2:])
+                examples.append((text, intent))
+            elif stripped and not stripped.startswith(('examples:', '- ')) and not line.startswith(' '):
+                intent = None
+    
+    return examples
+
+
+def char_ngrams(text: str) -> Counter:
+    """
+    N-gramas de caracteres por palavra, com espaço nas bordas (como ``char_wb``).
+    
+    Args:
+        text: Texto original (é normalizado aqui)
+    
+    Returns:
+        Contagem de cada n-grama
+    """
+    counts = Counter()
+    for word in normalize(text).split():
+        padded = f' {word} '
+        for n in range(MIN_NGRAM, MAX_NGRAM + 1):
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+    return counts
+
+
+class IntentClassifier:
+    """
+    Regressão logística multinomial sobre TF-IDF de n-gramas de caracteres.
+    
+    Treina em frações de segundo a partir do nlu.yml, carrega de um .npz em
+    milissegundos e classifica uma mensagem em microssegundos (só os
+    n-gramas presentes na mensagem são somados).
+    """
+    
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, weights: np.ndarray,
+                 bias: np.ndarray, labels: List[str]):
+        """
+        Cria o classificador a partir dos parâmetros já treinados.
+        
+        Args:
+            vocabulary: N-grama -> coluna
+            idf: IDF de cada coluna
+            weights: Matriz (colunas, intenções)
+            bias: Vetor (intenções,)
+            labels: Nome de cada intenção
+        """
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.labels = labels
+    
+    @staticmethod
+    def _tfidf(counts: Counter, vocabulary: Dict[str, int], idf: np.ndarray) -> Tuple[List[int], np.ndarray]:
+        """Colunas e valores TF-IDF (tf sublinear, norma L2) de uma mensagem."""
+        columns = [vocabulary[gram] for gram in counts if gram in vocabulary]
+        values = np.array(
+            [(1.0 + math.log(counts[gram])) for gram in counts if gram in vocabulary], dtype=np.float32
+        ) * idf[columns]
+        norm = np.linalg.norm(values)
+        return columns, values / norm if norm else values
+    
+    @classmethod
+    def train(cls, examples: List[Tuple[str, str]], epochs: int = 300,
+              learning_rate: float = 1.0, l2: float = 1e-3) -> 'IntentClassifier':
+        """
+        Treina com descida de gradiente em lote completo.
+        
+        Args:
+            examples: Tuplas (texto, intenção)
+            epochs: Passadas de otimização
+            learning_rate: Passo do gradiente
+            l2: Regularização dos pesos
+        
+        Returns:
+            Classificador treinado
+        """
+        labels = sorted({intent for _, intent in examples})
+        label_index = {label: i for i, label in enumerate(labels)}
+        counts = [char_ngrams(text) for text, _ in examples]
+        
+        document_frequency = Counter(gram for c in counts for gram in c)
+        vocabulary = {gram: i for i, gram in enumerate(sorted(document_frequency))}
+        n_docs = len(examples)
+        idf = np.array([
+            math.log((1 + n_docs) / (1 + document_frequency[gram])) + 1.0 for gram in sorted(document_frequency)
+        ], dtype=np.float32)
+        
+        features = np.zeros((n_docs, len(vocabulary)), dtype=np.float32)
+        for row, c in enumerate(counts):
+            columns, values = cls._tfidf(c, vocabulary, idf)
+            features[row, columns] = values
+        
+        targets = np.zeros((n_docs, len(labels)), dtype=np.float32)
+        targets[np.arange(n_docs), [label_index[intent] for _, intent in examples]] = 1.0
+        
+        weights = np.zeros((len(vocabulary), len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        for _ in range(epochs):
+            logits = features @ weights + bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            error = (probs - targets) / n_docs
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        
+        return cls(vocabulary, idf, weights, bias, labels)
+    
+    @classmethod
+    def from_nlu(cls, path: str = NLU_PATH) -> 'IntentClassifier':
+        """Treina a partir do nlu.yml do Rasa."""
+        return cls.train(load_nlu_examples(path))
+    
+    def save(self, path: str):
+        """Salva os parâmetros em um único .npz."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        ngrams = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez(path, idf=self.idf, weights=self.weights, bias=self.bias,
+                 ngrams=np.array(json.dumps(ngrams)), labels=np.array(json.dumps(self.labels)))
+    
+    @classmethod
+    def load(cls, path: str) -> 'IntentClassifier':
+        """Carrega os parâmetros salvos por save."""
+        with np.load(path) as data:
+            ngrams = json.loads(str(data['ngrams']))
+            return cls({gram: i for i, gram in enumerate(ngrams)}, data['idf'], data['weights'],
+                       data['bias'], json.loads(str(data['labels'])))
+    
+    def predict(self, message: str) -> Tuple[Optional[str], float]:
+        """
+        Classifica uma mensagem.
+        
+        Args:
+            message: Mensagem do usuário (de preferência sem o nome do Pokémon)
+        
+        Returns:
+            Tupla (intenção, probabilidade); (None, 0.0) se nenhum n-grama for conhecido
+        """
+        columns, values = self._tfidf(char_ngrams(message), self.vocabulary, self.idf)
+        if not columns:
+            return None, 0.0
+        
+        logits = values @ self.weights[columns] + self.bias
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+
+def load_intent_classifier(nlu_path: str = NLU_PATH, model_path: str = INTENT_MODEL_PATH) -> IntentClassifier:
+    """
+    Carrega o classificador salvo ou treina (e salva) se o nlu.yml for mais novo.
+    
+    Args:
+        nlu_path: Exemplos de treino
+        model_path: Arquivo .npz dos parâmetros
+    
+    Returns:
+        Classificador pronto
+    """
+    model_file = Path(model_path)
+    if model_file.exists() and model_file.stat().st_mtime >= Path(nlu_path).stat().st_mtime:
+        try:
+            return IntentClassifier.load(model_path)
+        except Exception as e:
+            print(f"[AVISO] Classificador de intenção inválido, treinando de novo: {e}")
+    
+    classifier = IntentClassifier.from_nlu(nlu_path)
+    try:
+        classifier.save(model_path)
+    except OSError as e:
+        print(f"[AVISO] Não foi possível salvar o classificador de intenção: {e}")
+    return classifier
@@ -3,12 +3,21 @@
 Este módulo é mantido para uso futuro caso queira usar Rasa.
 O projeto atual usa SimpleChatbot (pattern matching) que não requer Rasa.
 Para usar Rasa, é necessário Python 3.8-3.11 (não compatível com Python 3.13).
+
+Quando o Rasa está lento ou fora do ar, as respostas vêm do SimpleChatbot,
+de modo que a latência do Rasa nunca vira a latência da página.
 """
 
 import requests
 import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Carrega .env - ignora se houver problema de encoding
 try:
@@ -18,16 +27,104 @@ except Exception:
 
 RASA_SERVER_URL = os.getenv('RASA_SERVER_URL', 'http://localhost:5005')
 RASA_WEBHOOK_URL = os.getenv('RASA_WEBHOOK_URL', 'http://localhost:5005/webhooks/rest/webhook')
+# Tempo máximo (s) de espera pelo Rasa antes de responder pelo SimpleChatbot
+RASA_TIMEOUT = float(os.getenv('RASA_TIMEOUT', 2.0))
+# Por quanto tempo (s) o resultado da verificação de status é reaproveitado
+RASA_HEALTH_TTL = float(os.getenv('RASA_HEALTH_TTL', 30.0))
+# Conexões mantidas abertas com o servidor (e requisições simultâneas)
+RASA_POOL_SIZE = int(os.getenv('RASA_POOL_SIZE', 8))
 
 
 class RasaIntegration:
     """Integração com servidor Rasa."""
     
-    def __init__(self, server_url: str = RASA_SERVER_URL, webhook_url: str = RASA_WEBHOOK_URL):
-        """Inicializa a integração com Rasa."""
+    def __init__(self, server_url: str = RASA_SERVER_URL, webhook_url: str = RASA_WEBHOOK_URL,
+                 timeout: float = RASA_TIMEOUT, health_ttl: float = RASA_HEALTH_TTL,
+                 pool_size: int = RASA_POOL_SIZE, retries: int = 2, fallback=None):
+        """
+        Inicializa a integração com Rasa.
+        
+        Args:
+            server_url: URL base do servidor Rasa
+            webhook_url: URL do canal REST
+            timeout: Tempo máximo de espera por resposta, em segundos
+            health_ttl: Validade da verificação de status, em segundos
+            pool_size: Conexões reaproveitadas e requisições simultâneas
+            retries: Novas tentativas em falhas de conexão (e 502/503/504 no parse)
+            fallback: Chatbot usado quando o Rasa não responde (padrão: SimpleChatbot)
+        """
         self.server_url = server_url
         self.webhook_url = webhook_url
+        self.timeout = timeout
+        self.health_ttl = health_ttl
         self.session = requests.Session()
+        
+        # Parse é idempotente: repete também em erro do servidor. Mensagens
+        # mudam o estado da conversa: repete só se a conexão nem foi aberta.
+        parse_retry = Retry(total=retries, connect=retries, read=0, backoff_factor=0.05,
+                            status_forcelist=(502, 503, 504), allowed_methods=None,
+                            raise_on_status=False)
+        message_retry = Retry(total=retries, connect=retries, read=0, status=0)
+        self.session.mount(self.server_url, HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=parse_retry
+        ))
+        self.session.mount(self.webhook_url, HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=message_retry
+        ))
+        # Verificação de status: uma tentativa só (o prefixo mais longo tem precedência)
+        self.session.mount(f"{self.server_url}/status", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='rasa')
+        # A verificação de status roda aqui, nunca na thread de quem pediu a resposta
+        self._health_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rasa-health')
+        
+        self._health_lock = threading.Lock()
+        self._healthy: Optional[bool] = None
+        self._health_checked_at = 0.0
+        self._health_refreshing = False
+        
+        self._fallback = fallback
+        self._fallback_lock = threading.Lock()
+    
+    @property
+    def fallback(self):
+        """Chatbot local usado quando o Rasa está lento ou fora do ar (criado no primeiro uso)."""
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    from src.chatbot.simple_chatbot import SimpleChatbot
+                    self._fallback = SimpleChatbot()
+        return self._fallback
+    
+    def _set_health(self, healthy: bool):
+        with self._health_lock:
+            self._healthy = healthy
+            self._health_checked_at = time.monotonic()
+    
+    def _refresh_health(self):
+        try:
+            self.check_server_status(force=True)
+        finally:
+            with self._health_lock:
+                self._health_refreshing = False
+    
+    def _is_usable(self) -> bool:
+        """
+        Estado do servidor sem esperar pela rede.
+        
+        Devolve o último resultado conhecido (desconhecido conta como online:
+        uma falha na própria chamada o corrige) e, se ele tiver expirado,
+        agenda uma nova verificação em segundo plano.
+        """
+        with self._health_lock:
+            healthy = self._healthy
+            stale = time.monotonic() - self._health_checked_at >= self.health_ttl
+            refresh = stale and not self._health_refreshing
+            if refresh:
+                self._health_refreshing = True
+        
+        if refresh:
+            self._health_executor.submit(self._refresh_health)
+        return healthy is not False
     
     def send_message(self, message: str, sender_id: str = "user") -> List[Dict[str, Any]]:
         """
@@ -36,7 +133,7 @@ class RasaIntegration:
         Args:
             message: Mensagem do usuário
             sender_id: ID do remetente
-            
+        
         Returns:
             Lista de respostas do Rasa
         """
@@ -49,54 +146,90 @@ class RasaIntegration:
             response = self.session.post(
                 self.webhook_url,
                 json=payload,
-                timeout=10
+                timeout=self.timeout
             )
             response.raise_for_status()
             
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Erro ao comunicar com Rasa: {e}")
+            # Evita esperar de novo até a próxima verificação de status
+            self._set_health(False)
             return []
     
     def get_response(self, message: str, sender_id: str = "user") -> str:
         """
         Obtém resposta textual do Rasa.
         
+        Se o servidor estiver fora do ar (último status conhecido), não
+        responder dentro de ``timeout`` ou não devolver texto, a resposta vem
+        do SimpleChatbot. A espera nunca passa de ``timeout``: o status é
+        verificado em segundo plano.
+        
         Args:
             message: Mensagem do usuário
             sender_id: ID do remetente
-            
+        
         Returns:
-            Resposta textual do Rasa ou mensagem de erro
+            Resposta textual do Rasa ou do chatbot local
         """
-        responses = self.send_message(message, sender_id)
+        if not self._is_usable():
+            return self.fallback.get_response(message)
         
-        if not responses:
-            return "Desculpe, não consegui processar sua mensagem. O servidor Rasa pode estar offline."
+        future = self._executor.submit(self.send_message, message, sender_id)
+        try:
+            responses = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A requisição termina em segundo plano; a página não espera, e as
+            # próximas mensagens vão direto ao chatbot local até a nova verificação
+            self._set_health(False)
+            responses = []
         
         # Concatena todas as respostas
         text_responses = [
-            resp.get('text', '') for resp in responses 
+            resp.get('text', '') for resp in responses
             if resp.get('text')
         ]
         
-        return '\n'.join(text_responses) if text_responses else "Sem resposta disponível."
+        if not text_responses:
+            return self.fallback.get_response(message)
+        return '\n'.join(text_responses)
+    
+    async def aget_response(self, message: str, sender_id: str = "user") -> str:
+        """Versão assíncrona de get_response (não bloqueia o laço de eventos)."""
+        loop = asyncio.get_running_loop()
+        # Fora do pool do Rasa: get_response espera por tarefas desse pool
+        return await loop.run_in_executor(None, self.get_response, message, sender_id)
     
-    def check_server_status(self) -> bool:
+    def check_server_status(self, force: bool = False) -> bool:
         """
         Verifica se o servidor Rasa está online.
         
+        O resultado é reaproveitado por ``health_ttl`` segundos; falhas nas
+        outras chamadas também o atualizam.
+        
+        Args:
+            force: Ignora o resultado em cache
+        
         Returns:
             True se o servidor está online, False caso contrário
         """
+        with self._health_lock:
+            fresh = time.monotonic() - self._health_checked_at < self.health_ttl
+            if self._healthy is not None and fresh and not force:
+                return self._healthy
+        
         try:
             response = self.session.get(
                 f"{self.server_url}/status",
-                timeout=5
+                timeout=min(self.timeout, 5)
             )
-            return response.status_code == 200
+            healthy = response.status_code == 200
         except requests.exceptions.RequestException:
-            return False
+            healthy = False
+        
+        self._set_health(healthy)
+        return healthy
     
     def parse_intent(self, message: str) -> Optional[Dict[str, Any]]:
         """
@@ -104,7 +237,7 @@ class RasaIntegration:
         
         Args:
             message: Mensagem do usuário
-            
+        
         Returns:
             Dicionário com intenção e entidades ou None
         """
@@ -116,12 +249,36 @@ class RasaIntegration:
             response = self.session.post(
                 f"{self.server_url}/model/parse",
                 json=payload,
-                timeout=10
+                timeout=self.timeout
             )
             response.raise_for_status()
             
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Erro ao fazer parse da intenção: {e}")
+            self._set_health(False)
             return None
-
+    
+    def parse_batch(self, messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Faz parse de várias mensagens em paralelo, pelas conexões do pool.
+        
+        Args:
+            messages: Mensagens do usuário
+        
+        Returns:
+            Resultados na mesma ordem (None onde o parse falhou)
+        """
+        if not self._is_usable():
+            return [None] * len(messages)
+        return list(self._executor.map(self.parse_intent, messages))
+    
+    async def aparse_intent(self, message: str) -> Optional[Dict[str, Any]]:
+        """Versão assíncrona de parse_intent."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.parse_intent, message)
+    
+    async def aparse_batch(self, messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Versão assíncrona de parse_batch."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.parse_batch, messages)
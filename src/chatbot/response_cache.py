@@ -0,0 +1,117 @@
+"""Cache em memória das respostas já formatadas do chatbot."""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple, Union
+from dotenv import load_dotenv
+from src.database.db_manager import DatabaseManager, CACHE_TTL
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+# Número máximo de respostas guardadas (as menos usadas saem primeiro)
+RESPONSE_CACHE_SIZE = int(os.getenv('CHATBOT_RESPONSE_CACHE_SIZE', 1024))
+
+PokemonKey = Union[int, Tuple[int, ...]]
+
+
+class ResponseCache:
+    """
+    LRU de respostas prontas por (intenção, ID do Pokémon).
+    
+    Cada resposta guarda o ``created_at`` da entrada do cache SQLite de onde
+    veio e deixa de valer quando essa entrada expira, quando uma versão mais
+    nova do mesmo Pokémon é vista ou quando o cache do banco é limpo. A
+    consulta não acessa o SQLite nem decodifica JSON.
+    """
+    
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, ttl: int = CACHE_TTL):
+        """
+        Cria o cache vazio.
+        
+        Args:
+            max_size: Número máximo de respostas
+            ttl: Validade das entradas do cache SQLite em segundos
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, PokemonKey], Tuple[str, Tuple[str, ...], float]]" = OrderedDict()
+        # created_at mais recente visto para cada Pokémon
+        self._timestamps: Dict[int, str] = {}
+        self._generation = DatabaseManager.cache_generation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _ids(pokemon: PokemonKey) -> Tuple[int, ...]:
+        return pokemon if isinstance(pokemon, tuple) else (pokemon,)
+    
+    def get(self, intent: str, pokemon: PokemonKey) -> Optional[str]:
+        """
+        Busca uma resposta pronta.
+        
+        Args:
+            intent: Intenção normalizada (ex.: 'tipo')
+            pokemon: ID do Pokémon ou tupla de IDs (comparações)
+        
+        Returns:
+            Resposta formatada ou None se não houver resposta válida
+        """
+        key = (intent, pokemon)
+        with self._lock:
+            if self._generation != DatabaseManager.cache_generation:
+                self._entries.clear()
+                self._timestamps.clear()
+                self._generation = DatabaseManager.cache_generation
+            
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, created_at, expires_at = entry
+                current = tuple(self._timestamps.get(pokemon_id) for pokemon_id in self._ids(pokemon))
+                if created_at == current and time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            
+            self.misses += 1
+            return None
+    
+    def put(self, intent: str, pokemon: PokemonKey, response: str, created_at: Union[str, Tuple[str, ...]]):
+        """
+        Guarda uma resposta formatada.
+        
+        Args:
+            intent: Intenção normalizada
+            pokemon: ID do Pokémon ou tupla de IDs
+            response: Resposta formatada
+            created_at: created_at da entrada do cache usada (uma por ID)
+        """
+        created_at = created_at if isinstance(created_at, tuple) else (created_at,)
+        expires_at = min(datetime.fromisoformat(value).timestamp() for value in created_at) + self.ttl
+        
+        with self._lock:
+            for pokemon_id, value in zip(self._ids(pokemon), created_at):
+                self._timestamps[pokemon_id] = value
+            
+            key = (intent, pokemon)
+            self._entries[key] = (response, created_at, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove todas as respostas."""
+        with self._lock:
+            self._entries.clear()
+            self._timestamps.clear()
+    
+    def __len__(self):
+        return len(self._entries)
@@ -1,68 +1,264 @@
 """Chatbot simples sem Rasa usando pattern matching."""
 
+import os
 import re
-from typing import Optional
+import time
+import asyncio
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+from dotenv import load_dotenv
 from src.api.pokeapi_client import PokeAPIClient
+from src.chatbot.entity_recognizer import PokemonNameMatcher
+from src.chatbot.comparison import (comparison_details, comparison_header, comparison_type_line,
+                                    format_comparison_response)
+from src.chatbot.response_cache import ResponseCache
+from src.chatbot.intent_classifier import IntentClassifier, load_intent_classifier
+from src.chatbot.conversation_state import ConversationState, SessionStore
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+# Tempo máximo (s) para responder uma mensagem em aget_response/stream_response
+CHATBOT_LATENCY_BUDGET = float(os.getenv('CHATBOT_LATENCY_BUDGET', 3.0))
+# Espera (s) antes de tentar de novo a lista de espécies quando ela veio vazia (sem rede)
+NAME_MATCHER_RETRY = float(os.getenv('CHATBOT_NAME_RETRY', 60))
+
+# Classificador de intenção treinado no nlu.yml, usado quando nenhum padrão casa
+USE_INTENT_CLASSIFIER = os.getenv('CHATBOT_INTENT_CLASSIFIER', '1') == '1'
+# Confiança mínima do classificador (mesmo limiar do FallbackClassifier do Rasa)
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv('CHATBOT_INTENT_THRESHOLD', 0.3))
+
+# Intenções do nlu.yml -> intenções do chatbot (None = busca geral)
+CLASSIFIER_INTENTS = {
+    'ask_type': 'tipo',
+    'ask_stats': 'stats',
+    'ask_ability': 'habilidade',
+    'ask_evolution': 'evolucao',
+    'search_pokemon': 'info',
+    'greet': 'saudacao',
+    'goodbye': 'despedida',
+    'bot_challenge': 'bot',
+    'affirm': None,
+    'deny': None,
+}
+
+# Respostas das intenções que não envolvem um Pokémon (textos do domain.yml do Rasa)
+SMALL_TALK_RESPONSES = {
+    'saudacao': "Olá! Sou seu assistente de Pokédex. Como posso ajudar?",
+    'despedida': "Até logo! Continue explorando os Pokémon!",
+    'bot': "Sim, sou um assistente de Pokédex! Posso ajudar com informações sobre Pokémon.",
+}
+
+TIMEOUT_MESSAGE = (
+    "A PokéAPI está demorando para responder. Os dados continuam sendo buscados; "
+    "pergunte de novo em instantes que a resposta sai do cache."
+)
+
+# Palavras que os padrões capturam no lugar do nome mas que não citam um Pokémon
+# ("o tipo dele", "stats do mesmo"): a pergunta continua sobre o anterior
+REFERENCE_WORDS = {
+    'ele', 'ela', 'eles', 'elas', 'dele', 'dela', 'deles', 'delas', 'mesmo', 'mesma',
+    'esse', 'essa', 'este', 'esta', 'o', 'a', 'os', 'as', 'qual', 'que', 'e'
+}
+
+# Padrões de reconhecimento (em ordem de prioridade); o grupo captura o nome do Pokémon
+INTENT_PATTERNS: Dict[str, List[str]] = {
+    'comparar': [
+        r'compar\w*\s+(\w+)',
+        r'diferen[çc]as?\s+entre\s+o?\s*(\w+)',
+        r'contra\s+o?\s*(\w+)'
+    ],
+    'tipo': [
+        r'tipo\s+do\s+(\w+)',
+        r'que\s+tipo\s+é\s+o?\s+(\w+)',
+        r'qual\s+tipo\s+do\s+(\w+)',
+        r'(\w+)\s+é\s+de?\s+que\s+tipo',
+        r'(\w+)\s+tipo',
+        r'tipos\s+d[eo]s?\s+(\w+)'
+    ],
+    'stats': [
+        r'stats?\s+do\s+(\w+)',
+        r'estat[íi]sticas?\s+do\s+(\w+)',
+        r'atributos?\s+do\s+(\w+)',
+        r'poder\s+do\s+(\w+)',
+        r'defesa\s+do\s+(\w+)',
+        r'ataque\s+do\s+(\w+)'
+    ],
+    'habilidade': [
+        r'habilidades?\s+do\s+(\w+)',
+        r'ability\s+do\s+(\w+)',
+        r'poderes?\s+do\s+(\w+)',
+        r'skills?\s+do\s+(\w+)'
+    ],
+    'info': [
+        r'fale\s+sobre\s+o?\s+(\w+)',
+        r'informa[çc][õo]es?\s+sobre\s+o?\s+(\w+)',
+        r'me\s+fale\s+sobre\s+o?\s+(\w+)',
+        r'quero\s+saber\s+sobre\s+o?\s+(\w+)',
+        r'dados?\s+do\s+(\w+)',
+        r'pok[ée]mon\s+(\w+)'
+    ],
+    'evolucao': [
+        r'evolu[çc][ãa]o\s+do\s+(\w+)',
+        r'quem\s+evolui\s+do\s+(\w+)',
+        r'para\s+quem\s+o\s+(\w+)\s+evolui',
+        r'evolu[çc][õo]es?\s+de\s+(\w+)',
+        r'cadeia\s+de\s+evolu[çc][ãa]o\s+do\s+(\w+)'
+    ]
+}
+
+
+class IntentMatcher:
+    """
+    Detecta intenção e nome do Pokémon com uma única expressão regular.
+    
+    Todos os padrões viram alternativas de um lookahead ``(?=p1|p2|...)``,
+    percorrido uma vez da esquerda para a direita com ``finditer``. Entre as
+    posições encontradas vence o padrão de maior prioridade (ordem do
+    dicionário), o que dá o mesmo resultado da busca padrão a padrão.
+    """
+    
+    def __init__(self, patterns: Dict[str, List[str]]):
+        """
+        Compila os padrões.
+        
+        Args:
+            patterns: Padrões por intenção, em ordem de prioridade, com um grupo de captura cada
+        """
+        alternatives = []
+        self._priority: Dict[str, int] = {}
+        
+        for intent, intent_patterns in patterns.items():
+            for i, pattern in enumerate(intent_patterns):
+                # O grupo do nome vira <intenção>__<n>: match.lastgroup identifica o padrão
+                group = f'{intent}__{i}'
+                self._priority[group] = len(self._priority)
+                named = pattern.replace('(', f'(?P<{group}>', 1)
+                # Padrão que começa pelo nome só pode casar em início de palavra;
+                # \b evita tentativas no meio das palavras sem mudar o resultado
+                if pattern.startswith(r'(\w+)'):
+                    named = r'\b' + named
+                alternatives.append(named)
+        
+        self.regex = re.compile('(?=' + '|'.join(alternatives) + ')')
+    
+    def match(self, message: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Busca a intenção e o nome do Pokémon.
+        
+        Args:
+            message: Mensagem em minúsculas
+        
+        Returns:
+            Tupla (intenção, nome) ou (None, None) se nenhum padrão casar
+        """
+        best = None
+        best_priority = len(self._priority)
+        
+        for match in self.regex.finditer(message):
+            priority = self._priority[match.lastgroup]
+            if priority < best_priority:
+                best, best_priority = match, priority
+                if priority == 0:
+                    break
+        
+        if best is None:
+            return None, None
+        
+        group = best.lastgroup
+        return group.split('__', 1)[0], best.group(group).strip()
+
+
+INTENT_MATCHER = IntentMatcher(INTENT_PATTERNS)
 
 
 class SimpleChatbot:
     """Chatbot simples para responder perguntas sobre Pokémon."""
     
-    def __init__(self):
-        """Inicializa o chatbot."""
+    def __init__(self, intent_classifier: Optional[IntentClassifier] = None):
+        """
+        Inicializa o chatbot.
+        
+        Args:
+            intent_classifier: Classificador usado quando nenhum padrão casa
+                (padrão: treinado no nlu.yml, se CHATBOT_INTENT_CLASSIFIER=1)
+        """
         self.api_client = PokeAPIClient()
         
-        # Padrões de reconhecimento
-        self.patterns = {
-            'tipo': [
-                r'tipo\s+do\s+(\w+)',
-                r'que\s+tipo\s+é\s+o?\s+(\w+)',
-                r'qual\s+tipo\s+do\s+(\w+)',
-                r'(\w+)\s+é\s+de?\s+que\s+tipo',
-                r'(\w+)\s+tipo'
-            ],
-            'stats': [
-                r'stats?\s+do\s+(\w+)',
-                r'estat[íi]sticas?\s+do\s+(\w+)',
-                r'atributos?\s+do\s+(\w+)',
-                r'poder\s+do\s+(\w+)',
-                r'defesa\s+do\s+(\w+)',
-                r'ataque\s+do\s+(\w+)'
-            ],
-            'habilidade': [
-                r'habilidades?\s+do\s+(\w+)',
-                r'ability\s+do\s+(\w+)',
-                r'poderes?\s+do\s+(\w+)',
-                r'skills?\s+do\s+(\w+)'
-            ],
-            'info': [
-                r'fale\s+sobre\s+o?\s+(\w+)',
-                r'informa[çc][õo]es?\s+sobre\s+o?\s+(\w+)',
-                r'me\s+fale\s+sobre\s+o?\s+(\w+)',
-                r'quero\s+saber\s+sobre\s+o?\s+(\w+)',
-                r'dados?\s+do\s+(\w+)',
-                r'pok[ée]mon\s+(\w+)'
-            ],
-            'evolucao': [
-                r'evolu[çc][ãa]o\s+do\s+(\w+)',
-                r'quem\s+evolui\s+do\s+(\w+)',
-                r'para\s+quem\s+o\s+(\w+)\s+evolui',
-                r'evolu[çc][õo]es?\s+de\s+(\w+)',
-                r'cadeia\s+de\s+evolu[çc][ãa]o\s+do\s+(\w+)'
-            ]
-        }
+        # Padrões de reconhecimento, compilados uma única vez
+        self.matcher = INTENT_MATCHER
+        
+        self.intent_classifier = intent_classifier
+        if intent_classifier is None and USE_INTENT_CLASSIFIER:
+            try:
+                self.intent_classifier = load_intent_classifier()
+            except Exception as e:
+                print(f"[AVISO] Classificador de intenção indisponível: {e}")
+        
+        # Dicionário de nomes, montado na primeira mensagem (ver name_matcher)
+        self._name_matcher: Optional[PokemonNameMatcher] = None
+        self._name_matcher_lock = threading.Lock()
+        # Momento (time.monotonic) da próxima tentativa se o dicionário estiver vazio
+        self._name_matcher_retry_at = 0.0
+        
+        # Respostas já formatadas por (intenção, ID do Pokémon)
+        self.response_cache = ResponseCache()
+        
+        # Contexto de cada conversa, para perguntas de continuação ("e as habilidades dele?")
+        self.sessions = SessionStore()
+        
+        # Threads para as buscas bloqueantes das versões assíncronas. Buscas que
+        # estouram o prazo continuam aqui; a interpretação (que só acessa a rede
+        # para montar o dicionário de nomes) tem thread própria e não espera por elas
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='chatbot')
+        self._parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chatbot-parse')
+    
+    def _name_matcher_ready(self) -> bool:
+        """Indica se o dicionário de nomes pode ser usado sem acessar a rede."""
+        matcher = self._name_matcher
+        return matcher is not None and (len(matcher) > 0 or time.monotonic() < self._name_matcher_retry_at)
     
-    def _extract_pokemon_name(self, message: str, intent: str) -> Optional[str]:
-        """Extrai o nome do Pokémon da mensagem."""
-        message_lower = message.lower()
+    @property
+    def name_matcher(self) -> PokemonNameMatcher:
+        """
+        Dicionário de nomes de Pokémon, montado a partir da lista de espécies.
         
-        for pattern in self.patterns.get(intent, []):
-            match = re.search(pattern, message_lower)
-            if match:
-                return match.group(1).strip()
+        Fica guardado para sempre quando tem nomes. Se a lista veio vazia (sem
+        rede e sem cache), o dicionário vazio é usado por NAME_MATCHER_RETRY
+        segundos e depois a lista é buscada de novo.
+        """
+        if not self._name_matcher_ready():
+            with self._name_matcher_lock:
+                if not self._name_matcher_ready():
+                    matcher = PokemonNameMatcher.from_client(self.api_client)
+                    if len(matcher) == 0:
+                        print(f"[AVISO] Lista de espécies indisponível; nova tentativa em {NAME_MATCHER_RETRY:.0f}s")
+                        self._name_matcher_retry_at = time.monotonic() + NAME_MATCHER_RETRY
+                    self._name_matcher = matcher
+        return self._name_matcher
+    
+    def _match(self, message: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Detecta intenção e nome do Pokémon em uma única busca.
         
-        # Tenta encontrar qualquer palavra que possa ser nome de Pokémon
-        words = message_lower.split()
+        Returns:
+            Tupla (intenção, nome) ou (None, None) se nenhum padrão casar
+        """
+        return self.matcher.match(message.lower())
+    
+    def _fallback_pokemon_name(self, message: str) -> Optional[str]:
+        """
+        Procura qualquer palavra que possa ser nome de Pokémon.
+        
+        Só é usado sem dicionário de nomes (sem rede e sem cache), quando a
+        palavra é buscada direto na PokéAPI.
+        """
+        words = message.lower().split()
         for word in words:
             # Remove pontuação
             word = re.sub(r'[^\w]', '', word)
@@ -71,113 +267,515 @@ class SimpleChatbot:
         
         return None
     
-    def _detect_intent(self, message: str) -> str:
-        """Detecta a intenção da mensagem."""
-        message_lower = message.lower()
-        
-        # Verifica cada tipo de intenção
-        for intent, patterns in self.patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    return intent
-        
-        # Se não encontrou, assume que é busca geral
-        return 'info'
-    
-    def _format_type_response(self, pokemon_data: dict) -> str:
-        """Formata resposta sobre tipo."""
-        types = [t['type']['name'].title() for t in pokemon_data.get('types', [])]
-        type_str = " e ".join(types) if len(types) == 1 else " / ".join(types)
-        name = pokemon_data.get('name', '').title()
-        return f"{name} é do tipo {type_str}."
-    
-    def _format_stats_response(self, pokemon_data: dict) -> str:
-        """Formata resposta sobre stats."""
-        stats = pokemon_data.get('stats', [])
-        stats_list = []
-        for stat in stats:
-            stat_name = stat['stat']['name'].replace('-', ' ').title()
-            stat_value = stat['base_stat']
-            stats_list.append(f"{stat_name}: {stat_value}")
-        
-        name = pokemon_data.get('name', '').title()
-        return f"As estatísticas de {name} são:\n" + "\n".join(stats_list)
-    
-    def _format_ability_response(self, pokemon_data: dict) -> str:
-        """Formata resposta sobre habilidades."""
-        abilities = [
-            a['ability']['name'].replace('-', ' ').title() 
-            for a in pokemon_data.get('abilities', [])
-        ]
-        ability_str = ", ".join(abilities)
-        name = pokemon_data.get('name', '').title()
-        return f"As habilidades de {name} são: {ability_str}."
-    
-    def _format_info_response(self, pokemon_data: dict) -> str:
-        """Formata resposta geral."""
-        pokemon_id = pokemon_data.get('id', 'N/A')
-        name = pokemon_data.get('name', '').title()
-        types = [t['type']['name'].title() for t in pokemon_data.get('types', [])]
-        types_str = " / ".join(types)
+    def _resolve_pokemon(self, message: str, captured: Optional[str]) -> Optional[Union[int, str]]:
+        """
+        Identifica o Pokémon citado antes de qualquer consulta à PokéAPI.
+        
+        Ordem: nome ou apelido do dicionário, ID numérico capturado pelo padrão
+        e, por fim, nome parecido (erro de digitação). Sem dicionário (sem
+        conexão e sem cache), usa a palavra capturada como antes.
+        
+        Args:
+            message: Mensagem do usuário
+            captured: Nome capturado pelo padrão de intenção (ou None)
+        
+        Returns:
+            ID da espécie, nome para buscar na API ou None se não houver Pokémon
+        """
+        names = self.name_matcher
+        if not len(names):
+            return captured or self._fallback_pokemon_name(message)
+        
+        found = names.find(message)
+        if found:
+            return found[0]
+        
+        if captured and captured.isdigit():
+            return captured
+        
+        found = names.fuzzy_find(message)
+        return found[0] if found else None
+    
+    def _display_name(self, pokemon_id: Optional[int], pokemon_data: Optional[dict] = None) -> str:
+        """Nome exibido: o da espécie na lista de nomes (ou o dos dados da PokéAPI)."""
+        names = self.name_matcher
+        name = names.name_of(pokemon_id) if len(names) and isinstance(pokemon_id, int) else None
+        if name is None and pokemon_data:
+            name = pokemon_data.get('name')
+        return (name or str(pokemon_id)).title()
+    
+    def _format_head(self, intent: str, name: str, pokemon_id: int) -> str:
+        """
+        Início da resposta, que só depende do nome e do ID do Pokémon.
+        
+        No streaming sai antes da busca na PokéAPI; a resposta completa é
+        sempre este início seguido de _format_body.
+        """
+        if intent == 'tipo':
+            return f"{name} é do tipo "
+        elif intent == 'stats':
+            return f"As estatísticas de {name} são:\n"
+        elif intent == 'habilidade':
+            return f"As habilidades de {name} são: "
+        elif intent == 'evolucao':
+            return f"Informações detalhadas sobre a evolução de {name} estão disponíveis na Pokédex completa. Use a busca para ver mais detalhes!"
+        else:  # info ou padrão
+            return f"**{name}** (#{pokemon_id:03d})\n\n"
+    
+    def _format_body(self, intent: str, pokemon_data: dict) -> str:
+        """Restante da resposta, a partir dos dados da PokéAPI."""
+        if intent == 'tipo':
+            types = [t['type']['name'].title() for t in pokemon_data.get('types', [])]
+            type_str = " e ".join(types) if len(types) == 1 else " / ".join(types)
+            return f"{type_str}."
+        elif intent == 'stats':
+            stats_list = []
+            for stat in pokemon_data.get('stats', []):
+                stat_name = stat['stat']['name'].replace('-', ' ').title()
+                stats_list.append(f"{stat_name}: {stat['base_stat']}")
+            return "\n".join(stats_list)
+        elif intent == 'habilidade':
+            abilities = [
+                a['ability']['name'].replace('-', ' ').title()
+                for a in pokemon_data.get('abilities', [])
+            ]
+            return f"{', '.join(abilities)}."
+        elif intent == 'evolucao':
+            return ""
+        
+        # info ou padrão
+        types_str = " / ".join(t['type']['name'].title() for t in pokemon_data.get('types', []))
         height = pokemon_data.get('height', 0) / 10
         weight = pokemon_data.get('weight', 0) / 10
-        
-        abilities = [
-            a['ability']['name'].replace('-', ' ').title() 
+        abilities_str = ", ".join(
+            a['ability']['name'].replace('-', ' ').title()
             for a in pokemon_data.get('abilities', [])[:3]
-        ]
-        abilities_str = ", ".join(abilities)
-        
-        return f"""**{name}** (#{pokemon_id:03d})
-
-**Tipo:** {types_str}
+        )
+        return f"""**Tipo:** {types_str}
 **Altura:** {height:.1f}m
 **Peso:** {weight:.1f}kg
 **Habilidades:** {abilities_str}
 
 Para mais informações, use a página de busca!"""
+
+    def _format_response(self, intent: str, pokemon_data: dict, name: Optional[str] = None) -> str:
+        """Formata a resposta de um Pokémon conforme a intenção."""
+        name = name or self._display_name(pokemon_data.get('id'), pokemon_data)
+        return self._format_head(intent, name, pokemon_data.get('id', 0)) + self._format_body(intent, pokemon_data)
     
-    def _format_evolution_response(self, pokemon_data: dict) -> str:
-        """Formata resposta sobre evolução."""
-        name = pokemon_data.get('name', '').title()
-        return f"Informações detalhadas sobre a evolução de {name} estão disponíveis na Pokédex completa. Use a busca para ver mais detalhes!"
+    def _iter_multi_response(self, intent: str, entities: List[Tuple[int, str]],
+                             entries: Dict[int, tuple], stream: bool = False) -> Iterator[str]:
+        """
+        Responde sobre vários Pokémon citados na mesma mensagem, em pedaços.
+        
+        Os que estão no cache são lidos em uma consulta e os que faltam são
+        buscados na PokéAPI em paralelo. Cada parte sai assim que o Pokémon
+        dela (e os citados antes) chegam; na comparação, o título e a linha de
+        tipos de cada um saem antes da tabela, que precisa de todos.
+        
+        Args:
+            intent: Intenção detectada ('comparar' gera a tabela de comparação)
+            entities: Tuplas (id, nome) na ordem em que foram citados
+            entries: Dados já conhecidos por ID (contexto da conversa); recebe
+                também os dados buscados aqui
+            stream: Envia o título da comparação antes das buscas
+        
+        Yields:
+            Pedaços da resposta (concatenados, a resposta completa)
+        """
+        if intent == 'comparar' and len(entities) < 2:
+            yield "Para comparar, cite pelo menos dois Pokémon. Exemplo: 'Compare Charizard e Blastoise'"
+            return
+        
+        pokemon_ids = tuple(pokemon_id for pokemon_id, _ in entities)
+        if intent == 'comparar':
+            cached = self.response_cache.get(intent, pokemon_ids)
+            if cached is not None:
+                yield cached
+                return
+            pending = pokemon_ids
+        else:
+            # Só busca os Pokémon sem resposta pronta
+            rendered = {pokemon_id: self.response_cache.get(intent, pokemon_id) for pokemon_id in pokemon_ids}
+            pending = tuple(pokemon_id for pokemon_id in pokemon_ids if rendered[pokemon_id] is None)
+        
+        to_fetch = [pokemon_id for pokemon_id in pending if pokemon_id not in entries]
+        arrivals = self.api_client.iter_pokemon_entries(to_fetch)
+        
+        def wait_for(pokemon_id: int) -> Optional[tuple]:
+            # Consome as chegadas (em qualquer ordem) até ter o Pokémon pedido
+            while pokemon_id not in entries:
+                arrived_id, entry = next(arrivals, (pokemon_id, None))
+                entries[arrived_id] = entry
+            return entries[pokemon_id]
+        
+        if intent == 'comparar':
+            if stream:
+                yield comparison_header([self._display_name(pokemon_id) for pokemon_id in pokemon_ids])
+            found = []
+            for pokemon_id in pokemon_ids:
+                entry = wait_for(pokemon_id)
+                if entry:
+                    name = self._display_name(pokemon_id, entry[0])
+                    found.append((name, entry))
+                    if stream:
+                        yield comparison_type_line(name, entry[0])
+            missing = [name for pokemon_id, name in entities if not entries[pokemon_id]]
+            
+            if len(found) < 2:
+                not_found = f"Não encontrei informações sobre '{', '.join(missing)}'. Tente com outro nome ou ID."
+                yield "\n\n" + not_found if stream else not_found
+                return
+            names = [name for name, _ in found]
+            pokemon_list = [entry[0] for _, entry in found]
+            if stream:
+                yield comparison_details(names, pokemon_list)
+            else:
+                yield format_comparison_response(pokemon_list, names)
+            if not missing:
+                self.response_cache.put(intent, pokemon_ids, format_comparison_response(pokemon_list, names),
+                                        tuple(entry[1] for _, entry in found))
+        else:
+            separator = ""
+            for pokemon_id in pokemon_ids:
+                if rendered[pokemon_id] is None:
+                    entry = wait_for(pokemon_id)
+                    if entry:
+                        rendered[pokemon_id] = self._format_response(intent, entry[0])
+                        self.response_cache.put(intent, pokemon_id, rendered[pokemon_id], entry[1])
+                if rendered[pokemon_id]:
+                    yield separator + rendered[pokemon_id]
+                    separator = "\n\n"
+            missing = [name for pokemon_id, name in entities if pokemon_id in pending and not entries[pokemon_id]]
+        
+        if missing:
+            yield f"\n\nNão encontrei informações sobre: {', '.join(name.title() for name in missing)}."
     
-    def get_response(self, message: str) -> str:
+    def _parse(self, message: str, state: Optional[ConversationState] = None
+               ) -> Tuple[str, List[Tuple[int, str]], Optional[Union[int, str]]]:
+        """
+        Interpreta a mensagem sem consultar a PokéAPI.
+        
+        Com o contexto da conversa, uma pergunta sem Pokémon usa os da
+        resposta anterior ("e as habilidades dele?") e um Pokémon sem
+        pergunta repete a intenção anterior ("e do Charizard?").
+        
+        Args:
+            message: Mensagem do usuário
+            state: Contexto da conversa (ou None)
+        
+        Returns:
+            Tupla (intenção, Pokémon citados como (id, nome), Pokémon único a
+            buscar por ID ou nome; None quando há vários ou nenhum)
+        """
+        # Detecta intenção e extrai nome do Pokémon na mesma busca
+        intent, pokemon_name = self._match(message)
+        names = self.name_matcher
+        entities = names.find_all(message) if len(names) else []
+        
+        # "Charizard vs Blastoise" / "Charizard x Blastoise": só com dois nomes reconhecidos
+        if len(entities) > 1 and names.is_versus(message):
+            intent = 'comparar'
+        
+        if intent is None:
+            intent = self._classify(message)
+            if intent in SMALL_TALK_RESPONSES and not entities:
+                return intent, [], None
+        # "E do Charizard?": repete a pergunta anterior. Comparação só se a própria
+        # mensagem pedir ("compare com...", "e contra o..."), senão "raio x do
+        # Pikachu" depois de uma comparação viraria outra comparação
+        if intent is None and state and state.intent and state.intent != 'comparar' and entities:
+            intent = state.intent
+        # Só uma pergunta reconhecida continua sobre o Pokémon anterior
+        follow_up = intent is not None and state is not None
+        if intent is None or intent in SMALL_TALK_RESPONSES:
+            # Se não encontrou, assume que é busca geral
+            intent = 'info'
+        
+        # "Compare com o Blastoise": o outro Pokémon vem da resposta anterior
+        if intent == 'comparar' and len(entities) == 1 and state:
+            previous = [entity for entity in state.entities if entity[0] != entities[0][0]]
+            entities = previous[:1] + entities
+        
+        # Vários Pokémon na mesma pergunta (ex.: "compare Charizard e Blastoise")
+        if intent == 'comparar' or len(entities) > 1:
+            return intent, entities, None
+        
+        # Reconhece o Pokémon pelo dicionário de nomes, sem acessar a rede
+        pokemon = self._resolve_pokemon(message, pokemon_name)
+        if isinstance(pokemon, str) and pokemon.isdigit():
+            pokemon = int(pokemon)
+        
+        # Pergunta sem Pokémon ("e as habilidades dele?"): continua sobre os da
+        # resposta anterior. Um nome citado e não reconhecido não herda o anterior:
+        # vai para a busca, que responde "não encontrei"
+        named = pokemon_name is not None and pokemon_name not in REFERENCE_WORDS
+        if pokemon is None and follow_up and named:
+            return intent, entities, pokemon_name
+        if pokemon is None and follow_up and state.entities:
+            if len(state.entities) > 1:
+                return intent, list(state.entities), None
+            return intent, list(state.entities), state.entities[0][0]
+        return intent, entities, pokemon
+    
+    def _classify(self, message: str) -> Optional[str]:
+        """
+        Intenção pelo classificador treinado no nlu.yml.
+        
+        Returns:
+            Intenção do chatbot ou None se não houver classificador ou a confiança for baixa
+        """
+        if self.intent_classifier is None:
+            return None
+        
+        # O classificador foi treinado sem os nomes dos Pokémon
+        names = self.name_matcher
+        text = names.strip_names(message) if len(names) else message
+        label, confidence = self.intent_classifier.predict(text)
+        if confidence < INTENT_CONFIDENCE_THRESHOLD:
+            return None
+        return CLASSIFIER_INTENTS.get(label)
+    
+    def _cached_response(self, intent: str, entities: List[Tuple[int, str]],
+                         pokemon: Optional[Union[int, str]]) -> Optional[str]:
+        """Resposta pronta do cache em memória, se todas as partes estiverem lá."""
+        if intent == 'comparar' or len(entities) > 1:
+            pokemon_ids = tuple(pokemon_id for pokemon_id, _ in entities)
+            if intent == 'comparar':
+                return self.response_cache.get(intent, pokemon_ids) if len(pokemon_ids) > 1 else None
+            parts = [self.response_cache.get(intent, pokemon_id) for pokemon_id in pokemon_ids]
+            return None if None in parts else "\n\n".join(parts)
+        
+        if isinstance(pokemon, int):
+            return self.response_cache.get(intent, pokemon)
+        return None
+    
+    def get_response(self, message: str, session_id: Optional[str] = None) -> str:
         """
         Obtém resposta para a mensagem do usuário.
         
         Args:
             message: Mensagem do usuário
-            
+            session_id: Identificador da conversa; com ele, perguntas de
+                continuação usam o Pokémon (e os dados) da resposta anterior
+        
         Returns:
             Resposta do chatbot
         """
-        # Detecta intenção
-        intent = self._detect_intent(message)
+        state = self.sessions.get(session_id) if session_id else None
+        return self._respond(*self._parse(message, state), session_id=session_id, state=state)
+    
+    def _remember(self, session_id: Optional[str], intent: str, entities: List[Tuple[int, str]],
+                  pokemon: Optional[Union[int, str]], entries: Dict[int, tuple],
+                  state: Optional[ConversationState] = None):
+        """Guarda o contexto da resposta dada (só os dados dos Pokémon citados)."""
+        if not session_id:
+            return
         
-        # Extrai nome do Pokémon
-        pokemon_name = self._extract_pokemon_name(message, intent)
+        if not entities and isinstance(pokemon, int):
+            # Pokémon reconhecido por ID ou por aproximação: o nome vem dos dados ou do contexto
+            if entries.get(pokemon):
+                name = entries[pokemon][0].get('name', str(pokemon))
+            else:
+                known = dict(state.entities) if state else {}
+                name = known.get(pokemon, str(pokemon))
+            entities = [(pokemon, name)]
+        if not entities:
+            return
         
-        if not pokemon_name:
-            return "Não consegui identificar o nome do Pokémon na sua pergunta. Tente perguntar como: 'Qual é o tipo do Pikachu?'"
+        self.sessions.put(session_id, ConversationState(
+            intent, list(entities),
+            {pokemon_id: entries[pokemon_id] for pokemon_id, _ in entities if entries.get(pokemon_id)}
+        ))
+    
+    def _respond(self, intent: str, entities: List[Tuple[int, str]],
+                 pokemon: Optional[Union[int, str]], session_id: Optional[str] = None,
+                 state: Optional[ConversationState] = None) -> str:
+        """Busca os dados (contexto, cache ou PokéAPI) e formata a resposta de uma mensagem já interpretada."""
+        return "".join(self._iter_response(intent, entities, pokemon, session_id, state))
+    
+    def _iter_response(self, intent: str, entities: List[Tuple[int, str]],
+                       pokemon: Optional[Union[int, str]], session_id: Optional[str] = None,
+                       state: Optional[ConversationState] = None, stream: bool = False) -> Iterator[str]:
+        """
+        Resposta de uma mensagem já interpretada, em pedaços.
+        
+        Cada pedaço sai assim que os dados dele estão disponíveis; com stream,
+        o início que só depende do nome sai antes de qualquer busca. O contexto
+        da conversa é guardado ao consumir o último pedaço.
+        
+        Yields:
+            Pedaços da resposta (concatenados, a mesma resposta de get_response)
+        """
+        if intent in SMALL_TALK_RESPONSES:
+            yield SMALL_TALK_RESPONSES[intent]
+            return
+        
+        # Dados já buscados nesta conversa: a continuação não acessa SQLite nem rede
+        entries = state.fresh_entries() if state else {}
+        
+        if intent == 'comparar' or len(entities) > 1:
+            yield from self._iter_multi_response(intent, entities, entries, stream)
+            self._remember(session_id, intent, entities, None, entries, state)
+            return
+        
+        if not pokemon:
+            yield "Não consegui identificar o nome do Pokémon na sua pergunta. Tente perguntar como: 'Qual é o tipo do Pikachu?'"
+            return
         
         # Busca dados do Pokémon
-        pokemon_data = self.api_client.get_pokemon_by_name(pokemon_name.lower())
+        entry = None
+        head = ""
+        if isinstance(pokemon, int):
+            # Pergunta repetida: resposta pronta, sem SQLite nem JSON
+            cached = self.response_cache.get(intent, pokemon)
+            if cached is not None:
+                self._remember(session_id, intent, entities, pokemon, entries, state)
+                yield cached
+                return
+            entry = entries.get(pokemon)
+            if entry is None:
+                if stream:
+                    # O nome e o ID já são conhecidos: o início sai antes da busca
+                    head = self._format_head(intent, self._display_name(pokemon), pokemon)
+                    yield head
+                entry = self.api_client.get_pokemon_entry(pokemon)
+            pokemon_data = entry[0] if entry else None
+        elif len(self.name_matcher):
+            # Nome fora da lista completa de espécies: a PokéAPI também não o conhece
+            pokemon_data = None
+        else:
+            pokemon_data = self.api_client.get_pokemon_by_name(pokemon.lower())
         
         if not pokemon_data:
-            return f"Não encontrei informações sobre '{pokemon_name}'. Tente com outro nome ou ID."
+            not_found = f"Não encontrei informações sobre '{pokemon}'. Tente com outro nome ou ID."
+            yield "\n\n" + not_found if head else not_found
+            return
         
         # Formata resposta baseada na intenção
-        if intent == 'tipo':
-            return self._format_type_response(pokemon_data)
-        elif intent == 'stats':
-            return self._format_stats_response(pokemon_data)
-        elif intent == 'habilidade':
-            return self._format_ability_response(pokemon_data)
-        elif intent == 'evolucao':
-            return self._format_evolution_response(pokemon_data)
-        else:  # info ou padrão
-            return self._format_info_response(pokemon_data)
+        response = self._format_response(intent, pokemon_data)
+        if entry:
+            self.response_cache.put(intent, pokemon, response, entry[1])
+        else:
+            # Busca por nome (sem dicionário): o ID vem dos dados
+            pokemon = pokemon_data.get('id')
+            entry = (pokemon_data, datetime.now().isoformat())
+        self._remember(session_id, intent, entities, pokemon, {pokemon: entry}, state)
+        yield response[len(head):] if response.startswith(head) else "\n\n" + response
+    
+    @staticmethod
+    def _drain(chunks: Iterator[str]):
+        """Consome o resto de uma resposta abandonada; a busca ainda alimenta os caches."""
+        for _ in chunks:
+            pass
+    
+    async def astream_response(self, message: str, budget: Optional[float] = None,
+                               session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Versão assíncrona e incremental de get_response.
+        
+        Com o dicionário de nomes já montado, a mensagem é interpretada e a
+        resposta em cache sai de imediato, sem passar por nenhuma thread: buscas
+        lentas em andamento nunca atrasam um acerto de cache. Caso contrário, os
+        pedaços saem à medida que as buscas terminam (o início de uma consulta
+        simples sai antes da busca; numa comparação ou pergunta sobre vários
+        Pokémon, cada parte sai quando os dados dela chegam). Se o prazo
+        estourar, envia um aviso no lugar do resto e a busca continua em
+        segundo plano, alimentando o cache.
+        
+        Args:
+            message: Mensagem do usuário
+            budget: Prazo em segundos (padrão: CHATBOT_LATENCY_BUDGET)
+            session_id: Identificador da conversa (ver get_response)
+        
+        Yields:
+            Pedaços da resposta em Markdown
+        """
+        loop = asyncio.get_running_loop()
+        state = self.sessions.get(session_id) if session_id else None
+        deadline = loop.time() + (CHATBOT_LATENCY_BUDGET if budget is None else budget)
+        
+        if self._name_matcher_ready():
+            # Só CPU (expressões, dicionário e classificador): microssegundos
+            intent, entities, pokemon = self._parse(message, state)
+        else:
+            try:
+                # A primeira mensagem pode precisar baixar a lista de espécies
+                intent, entities, pokemon = await asyncio.wait_for(
+                    loop.run_in_executor(self._parse_executor, self._parse, message, state),
+                    max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                yield TIMEOUT_MESSAGE
+                return
+        
+        cached = self._cached_response(intent, entities, pokemon)
+        if cached is not None:
+            self._remember(session_id, intent, entities, pokemon,
+                           state.fresh_entries() if state else {}, state)
+            yield cached
+            return
+        
+        # Cada pedaço é calculado em uma thread; o gerador só avança em uma por vez
+        chunks = self._iter_response(intent, entities, pokemon, session_id, state, stream=True)
+        started = False
+        while True:
+            step = self._executor.submit(next, chunks, None)
+            try:
+                chunk = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(step)),
+                    max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                # Termina a resposta em segundo plano depois do passo em andamento
+                step.add_done_callback(lambda _: self._executor.submit(self._drain, chunks))
+                yield "\n\n" + TIMEOUT_MESSAGE if started else TIMEOUT_MESSAGE
+                return
+            if chunk is None:
+                return
+            if chunk:
+                started = True
+                yield chunk
+    
+    async def aget_response(self, message: str, budget: Optional[float] = None,
+                            session_id: Optional[str] = None) -> str:
+        """
+        Versão assíncrona de get_response, com prazo máximo.
+        
+        Args:
+            message: Mensagem do usuário
+            budget: Prazo em segundos (padrão: CHATBOT_LATENCY_BUDGET)
+            session_id: Identificador da conversa (ver get_response)
+        
+        Returns:
+            Resposta completa (ou aviso de demora, se o prazo estourar)
+        """
+        return "".join([chunk async for chunk in self.astream_response(message, budget, session_id)])
+    
+    def stream_response(self, message: str, budget: Optional[float] = None,
+                        session_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Gerador síncrono sobre astream_response, para ``st.write_stream``.
+        
+        Args:
+            message: Mensagem do usuário
+            budget: Prazo em segundos (padrão: CHATBOT_LATENCY_BUDGET)
+            session_id: Identificador da conversa (ver get_response)
+        
+        Yields:
+            Pedaços da resposta em Markdown
+        """
+        loop = asyncio.new_event_loop()
+        chunks = self.astream_response(message, budget, session_id)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.close()
     
     def check_server_status(self) -> bool:
         """Sempre retorna True para chatbot simples."""
@@ -4,7 +4,7 @@ import sqlite3
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -18,10 +18,18 @@ except Exception:
 DB_PATH = os.getenv('DB_PATH', 'data/pokemon_db.sqlite')
 CACHE_TTL = int(os.getenv('POKEAPI_CACHE_TTL', 86400))  # 24 horas padrão
 
+# O hash perceptual de 64 bits é dividido em 4 faixas de 16 bits, cada uma com
+# índice: hashes a até 3 bits de distância têm ao menos uma faixa idêntica
+PHASH_BAND_SHIFTS = (48, 32, 16, 0)
+PHASH_BANDS = [f'((phash >> {shift}) & 65535)' for shift in PHASH_BAND_SHIFTS]
+
 
 class DatabaseManager:
     """Gerenciador de banco de dados SQLite."""
     
+    # Incrementado quando o cache é limpo; caches em memória derivados dele se invalidam
+    cache_generation = 0
+    
     def __init__(self, db_path: str = DB_PATH):
         """Inicializa o gerenciador de banco de dados."""
         self.db_path = db_path
@@ -55,6 +63,33 @@ class DatabaseManager:
                 )
             ''')
             
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS prediction_cache (
+                    content_hash TEXT NOT NULL,
+                    model_key TEXT NOT NULL,
+                    phash INTEGER NOT NULL,
+                    predictions_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (content_hash, model_key)
+                )
+            ''')
+            for band, expression in enumerate(PHASH_BANDS):
+                cursor.execute(f'''
+                    CREATE INDEX IF NOT EXISTS idx_prediction_band{band}
+                    ON prediction_cache (model_key, {expression})
+                ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_prediction_created_at ON prediction_cache (created_at)
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS species_list (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            
             conn.commit()
             conn.close()
         except sqlite3.OperationalError as e:
@@ -74,6 +109,19 @@ class DatabaseManager:
         Returns:
             Dados do Pokémon se encontrado e válido, None caso contrário
         """
+        entry = self.get_cached_entry(identifier)
+        return entry[0] if entry else None
+    
+    def get_cached_entry(self, identifier: str) -> Optional[Tuple[Dict[Any, Any], str]]:
+        """
+        Busca Pokémon no cache por ID ou nome, junto com a data em que foi salvo.
+        
+        Args:
+            identifier: ID numérico ou nome do Pokémon
+            
+        Returns:
+            Tupla (dados, created_at em ISO) se encontrado e válido, None caso contrário
+        """
         if not self._initialized:
             return None
         try:
@@ -110,7 +158,7 @@ class DatabaseManager:
             if datetime.now() - created_at > timedelta(seconds=CACHE_TTL):
                 return None
             
-            return json.loads(data_json)
+            return json.loads(data_json), created_at_str
         except Exception as e:
             print(f"[ERRO DB] Erro ao buscar cache: {e}")
             try:
@@ -119,15 +167,51 @@ class DatabaseManager:
                 pass
             return None
     
-    def save_cache(self, pokemon_data: Dict[Any, Any]):
+    def get_cached_entries(self, pokemon_ids: List[int]) -> Dict[int, Tuple[Dict[Any, Any], str]]:
+        """
+        Busca vários Pokémon no cache com uma única consulta.
+        
+        Args:
+            pokemon_ids: IDs numéricos dos Pokémon
+            
+        Returns:
+            Dicionário {id: (dados, created_at)} só com as entradas encontradas e válidas
+        """
+        if not self._initialized or not pokemon_ids:
+            return {}
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            placeholders = ', '.join('?' for _ in pokemon_ids)
+            cursor.execute(
+                f'SELECT id, data_json, created_at FROM pokemon_cache WHERE id IN ({placeholders})',
+                [int(pokemon_id) for pokemon_id in pokemon_ids]
+            )
+            rows = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao buscar cache: {e}")
+            return {}
+        
+        result = {}
+        for pokemon_id, data_json, created_at_str in rows:
+            # Ignora entradas expiradas
+            if datetime.now() - datetime.fromisoformat(created_at_str) <= timedelta(seconds=CACHE_TTL):
+                result[pokemon_id] = (json.loads(data_json), created_at_str)
+        return result
+    
+    def save_cache(self, pokemon_data: Dict[Any, Any]) -> Optional[str]:
         """
         Salva dados de Pokémon no cache.
         
         Args:
             pokemon_data: Dicionário com dados do Pokémon da PokéAPI
+            
+        Returns:
+            created_at da entrada salva (ISO) ou None se não foi salva
         """
         if not self._initialized:
-            return
+            return None
         try:
             conn = sqlite3.connect(self.db_path, timeout=2.0)
             cursor = conn.cursor()
@@ -144,8 +228,10 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            return created_at
         except Exception as e:
             print(f"[ERRO DB] Erro ao salvar cache: {e}")
+            return None
     
     def clear_old_cache(self, days: int = 7):
         """
@@ -165,6 +251,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            DatabaseManager.cache_generation += 1
         except Exception as e:
             print(f"[ERRO DB] Erro ao limpar cache antigo: {e}")
     
@@ -180,6 +267,7 @@ class DatabaseManager:
             
             conn.commit()
             conn.close()
+            DatabaseManager.cache_generation += 1
         except Exception as e:
             print(f"[ERRO DB] Erro ao limpar cache: {e}")
     
@@ -208,4 +296,223 @@ class DatabaseManager:
         except Exception as e:
             print(f"[ERRO DB] Erro ao obter estatísticas: {e}")
             return {'total': 0, 'valid': 0, 'expired': 0}
-
+    
+    def get_cached_prediction(self, content_hash: str, model_key: str) -> Optional[List[List[float]]]:
+        """
+        Busca predições salvas para uma imagem (hash exato do conteúdo).
+        
+        Args:
+            content_hash: Hash SHA-256 do conteúdo da imagem
+            model_key: Identificador da versão do modelo que gerou as predições
+            
+        Returns:
+            Lista de pares [pokemon_id, confiança] ou None
+        """
+        if not self._initialized:
+            return None
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT predictions_json FROM prediction_cache WHERE content_hash = ? AND model_key = ?',
+                (content_hash, model_key)
+            )
+            result = cursor.fetchone()
+            conn.close()
+            
+            return json.loads(result[0]) if result else None
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao buscar predição em cache: {e}")
+            return None
+    
+    def find_similar_prediction(self, phash: int, model_key: str,
+                                max_distance: int) -> Optional[List[List[float]]]:
+        """
+        Busca predições de uma imagem quase idêntica (hash perceptual).
+        
+        Args:
+            phash: Hash perceptual de 64 bits da imagem
+            model_key: Identificador da versão do modelo
+            max_distance: Distância de Hamming máxima aceita
+            
+        Só as linhas com alguma faixa de 16 bits igual à do hash são lidas
+        (pelos índices): a busca é exata até 3 bits de distância e aproximada
+        acima disso.
+        
+        Returns:
+            Predições da imagem mais próxima dentro do limite ou None
+        """
+        if not self._initialized:
+            return None
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            query = ' UNION '.join(
+                f'SELECT phash, predictions_json FROM prediction_cache WHERE model_key = ? AND {expression} = ?'
+                for expression in PHASH_BANDS
+            )
+            params = []
+            for shift in PHASH_BAND_SHIFTS:
+                params.extend([model_key, (phash >> shift) & 0xFFFF])
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao buscar predição similar: {e}")
+            return None
+        
+        best = None
+        best_distance = max_distance + 1
+        for stored_phash, predictions_json in rows:
+            # SQLite guarda INTEGER com sinal; a máscara restaura os 64 bits
+            distance = bin((stored_phash ^ phash) & 0xFFFFFFFFFFFFFFFF).count('1')
+            if distance < best_distance:
+                best, best_distance = predictions_json, distance
+        
+        return json.loads(best) if best is not None else None
+    
+    def save_prediction(self, content_hash: str, model_key: str, phash: int,
+                        predictions: List[List[float]]):
+        """
+        Salva predições de uma imagem no cache.
+        
+        Args:
+            content_hash: Hash SHA-256 do conteúdo da imagem
+            model_key: Identificador da versão do modelo
+            phash: Hash perceptual de 64 bits da imagem
+            predictions: Lista de pares [pokemon_id, confiança]
+        """
+        if not self._initialized:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            
+            # Converte para inteiro com sinal (limite do INTEGER do SQLite)
+            signed_phash = phash - (1 << 64) if phash >= (1 << 63) else phash
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO prediction_cache
+                    (content_hash, model_key, phash, predictions_json, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (content_hash, model_key, signed_phash, json.dumps(predictions),
+                  datetime.now().isoformat()))
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao salvar predição: {e}")
+    
+    def get_species_list(self, max_age: Optional[int] = CACHE_TTL) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca a lista de espécies salva.
+        
+        Args:
+            max_age: Idade máxima em segundos (None = aceita lista antiga)
+            
+        Returns:
+            Lista de {'id', 'name'} ou None se não houver lista válida
+        """
+        if not self._initialized:
+            return None
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name, created_at FROM species_list ORDER BY id')
+            rows = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao buscar lista de espécies: {e}")
+            return None
+        
+        if not rows:
+            return None
+        
+        if max_age is not None:
+            created_at = datetime.fromisoformat(min(row[2] for row in rows))
+            if datetime.now() - created_at > timedelta(seconds=max_age):
+                return None
+        
+        return [{'id': pokemon_id, 'name': name} for pokemon_id, name, _ in rows]
+    
+    def save_species_list(self, species: List[Dict[str, Any]]):
+        """
+        Substitui a lista de espécies salva.
+        
+        Args:
+            species: Lista de {'id', 'name'}
+        """
+        if not self._initialized:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            created_at = datetime.now().isoformat()
+            
+            cursor.execute('DELETE FROM species_list')
+            cursor.executemany(
+                'INSERT INTO species_list (id, name, created_at) VALUES (?, ?, ?)',
+                [(item['id'], item['name'].lower(), created_at) for item in species]
+            )
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao salvar lista de espécies: {e}")
+    
+    def get_cached_names(self) -> List[Dict[str, Any]]:
+        """Nomes e IDs de todos os Pokémon no cache (inclusive expirados)."""
+        if not self._initialized:
+            return []
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name FROM pokemon_cache ORDER BY id')
+            rows = cursor.fetchall()
+            conn.close()
+            return [{'id': pokemon_id, 'name': name} for pokemon_id, name in rows]
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao listar nomes em cache: {e}")
+            return []
+    
+    def clear_old_predictions(self, days: int = 30, max_rows: int = 10000):
+        """
+        Remove predições antigas e limita o tamanho da tabela.
+        
+        Args:
+            days: Número de dias para considerar como antiga
+            max_rows: Máximo de predições mantidas (as mais recentes)
+        """
+        if not self._initialized:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            
+            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+            cursor.execute('DELETE FROM prediction_cache WHERE created_at < ?', (cutoff_date,))
+            cursor.execute('''
+                DELETE FROM prediction_cache WHERE rowid IN (
+                    SELECT rowid FROM prediction_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (max_rows,))
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao limpar predições antigas: {e}")
+    
+    def clear_prediction_cache(self):
+        """Remove todas as predições salvas."""
+        if not self._initialized:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=2.0)
+            cursor = conn.cursor()
+            
+            cursor.execute('DELETE FROM prediction_cache')
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[ERRO DB] Erro ao limpar cache de predições: {e}")
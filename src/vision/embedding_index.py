@@ -0,0 +1,176 @@
+"""Índice de embeddings para reconhecimento de Pokémon por vizinho mais próximo."""
+
+import os
+from pathlib import Path
+from typing import List, Tuple, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+IMAGES_DIR = os.getenv('IMAGES_DIR', 'data/pokemon_images')
+EMBEDDINGS_FILE = 'embeddings.npy'
+LABELS_FILE = 'embedding_labels.npy'
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+class EmbeddingIndex:
+    """Galeria de embeddings normalizados com busca por similaridade de cosseno."""
+    
+    def __init__(self, embeddings: np.ndarray, labels: np.ndarray):
+        """
+        Inicializa o índice.
+        
+        Args:
+            embeddings: Matriz (N, D) float32 com linhas normalizadas (norma L2 = 1)
+            labels: Vetor (N,) com o ID do Pokémon de cada linha, ordenado
+        """
+        self.embeddings = embeddings
+        self.labels = labels
+        # Início de cada grupo de ID (linhas agrupadas por ID) para reduceat
+        if len(labels):
+            self._group_starts = np.concatenate(([0], np.flatnonzero(np.diff(labels)) + 1))
+        else:
+            self._group_starts = np.zeros(0, dtype=np.int64)
+        self._group_ids = labels[self._group_starts]
+    
+    def __len__(self) -> int:
+        return len(self.labels)
+    
+    @property
+    def num_species(self) -> int:
+        """Número de Pokémon distintos na galeria."""
+        return len(self._group_ids)
+    
+    @classmethod
+    def load(cls, index_dir: str) -> Optional['EmbeddingIndex']:
+        """
+        Carrega índice salvo como arrays mapeados em memória.
+        
+        Args:
+            index_dir: Diretório com embeddings.npy e embedding_labels.npy
+        
+        Returns:
+            Índice carregado ou None se não existir
+        """
+        embeddings_file = Path(index_dir) / EMBEDDINGS_FILE
+        labels_file = Path(index_dir) / LABELS_FILE
+        if not embeddings_file.exists() or not labels_file.exists():
+            return None
+        
+        embeddings = np.load(str(embeddings_file), mmap_mode='r')
+        labels = np.load(str(labels_file))
+        return cls(embeddings, labels)
+    
+    def save(self, index_dir: str):
+        """
+        Salva o índice no disco.
+        
+        Args:
+            index_dir: Diretório de destino
+        """
+        Path(index_dir).mkdir(parents=True, exist_ok=True)
+        np.save(str(Path(index_dir) / EMBEDDINGS_FILE), np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        np.save(str(Path(index_dir) / LABELS_FILE), self.labels)
+    
+    def search(self, query: np.ndarray, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Busca os Pokémon mais similares a um embedding.
+        
+        A similaridade de cada Pokémon é a maior similaridade entre a consulta
+        e suas imagens de referência.
+        
+        Args:
+            query: Vetor (D,) de características (não precisa estar normalizado)
+            k: Número de Pokémon a retornar
+        
+        Returns:
+            Lista de tuplas (pokemon_id, similaridade) ordenada por similaridade
+        """
+        if len(self.labels) == 0:
+            return []
+        
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        
+        scores = self.embeddings @ query
+        species_scores = np.maximum.reduceat(scores, self._group_starts)
+        
+        k = min(k, len(species_scores))
+        top = np.argpartition(-species_scores, k - 1)[:k]
+        top = top[np.argsort(-species_scores[top])]
+        
+        return [(int(self._group_ids[i]), float(species_scores[i])) for i in top]
+
+
+def list_reference_images(images_dir: str = IMAGES_DIR) -> List[Tuple[str, int]]:
+    """
+    Lista imagens de referência organizadas em subpastas por ID (1/, 2/, etc.).
+    
+    Args:
+        images_dir: Diretório raiz das imagens
+    
+    Returns:
+        Lista de tuplas (caminho, pokemon_id) ordenada por ID
+    """
+    samples = []
+    root = Path(images_dir)
+    if not root.exists():
+        return samples
+    
+    for pokemon_dir in root.iterdir():
+        if pokemon_dir.is_dir() and pokemon_dir.name.isdigit():
+            pokemon_id = int(pokemon_dir.name)
+            for img_file in sorted(pokemon_dir.iterdir()):
+                if img_file.suffix.lower() in IMAGE_EXTENSIONS:
+                    samples.append((str(img_file), pokemon_id))
+    
+    samples.sort(key=lambda sample: sample[1])
+    return samples
+
+
+def build_embedding_index(classifier, images_dir: str = IMAGES_DIR,
+                          batch_size: int = 32) -> EmbeddingIndex:
+    """
+    Calcula embeddings de todas as imagens de referência.
+    
+    Args:
+        classifier: PokemonClassifier com modelo carregado
+        images_dir: Diretório com subpastas por ID de Pokémon
+        batch_size: Número de imagens por forward pass
+    
+    Returns:
+        Índice com embeddings normalizados
+    """
+    from PIL import Image
+    
+    samples = list_reference_images(images_dir)
+    embeddings = []
+    labels = []
+    
+    for start in range(0, len(samples), batch_size):
+        batch = samples[start:start + batch_size]
+        images = []
+        for img_path, pokemon_id in batch:
+            try:
+                images.append(Image.open(img_path).convert('RGB'))
+                labels.append(pokemon_id)
+            except Exception as e:
+                print(f"[AVISO] Erro ao abrir {img_path}: {e}")
+        if images:
+            embeddings.append(classifier.extract_embeddings(images))
+    
+    if not embeddings:
+        return EmbeddingIndex(np.zeros((0, 1280), dtype=np.float32), np.zeros(0, dtype=np.int32))
+    
+    matrix = np.concatenate(embeddings).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.maximum(norms, 1e-12)
+    
+    return EmbeddingIndex(matrix, np.asarray(labels, dtype=np.int32))
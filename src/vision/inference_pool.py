@@ -0,0 +1,229 @@
+"""Pool de processos para inferência fora do processo do Streamlit."""
+
+import os
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+import torch
+import torch.multiprocessing as mp
+from dotenv import load_dotenv
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+# Número de processos de inferência (0 = inferência no próprio processo)
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 0))
+# Reinícios de processos que morreram antes de o pool ser marcado como indisponível
+MAX_WORKER_RESTARTS = int(os.getenv('INFERENCE_MAX_RESTARTS', 3))
+# Intervalo (s) entre verificações de processos mortos
+WORKER_CHECK_INTERVAL = 0.5
+
+
+def _worker_loop(model: torch.nn.Module, inputs: torch.Tensor, outputs: torch.Tensor,
+                 tasks, results, num_threads: int):
+    """
+    Laço do processo de inferência.
+    
+    Recebe apenas o índice do slot pela fila; a imagem já está no tensor
+    compartilhado ``inputs`` e os logits são escritos em ``outputs``.
+    """
+    torch.set_num_threads(num_threads)
+    model.eval()
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        
+        request_id, slot = task
+        try:
+            with torch.inference_mode():
+                outputs[slot].copy_(model(inputs[slot:slot + 1])[0])
+            results.put((request_id, slot, None))
+        except Exception as e:
+            results.put((request_id, slot, str(e)))
+
+
+class InferencePool:
+    """
+    Processos de inferência que compartilham uma única cópia dos pesos.
+    
+    Os parâmetros do modelo ficam em memória compartilhada e as imagens são
+    trocadas por slots de um tensor compartilhado, sem serialização (pickle).
+    
+    Cada processo tem sua própria fila, para que se saiba o que estava com ele
+    se morrer: as requisições dele falham, os slots voltam ao pool e o
+    processo é reiniciado (até MAX_WORKER_RESTARTS vezes; depois disso o
+    pool fica indisponível, ``healthy = False``).
+    """
+    
+    def __init__(self, model: torch.nn.Module, num_classes: int,
+                 num_workers: int = 2, num_slots: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, input_size: int = 224):
+        """
+        Inicia os processos de inferência.
+        
+        Args:
+            model: Modelo PyTorch em CPU (os pesos são movidos para memória compartilhada)
+            num_classes: Número de saídas do modelo
+            num_workers: Número de processos
+            num_slots: Requisições simultâneas em voo (padrão: 2 por processo)
+            threads_per_worker: Threads do PyTorch por processo (padrão: núcleos / processos)
+            input_size: Lado da imagem de entrada do modelo
+        """
+        self.num_workers = num_workers
+        self.num_slots = num_slots or 2 * num_workers
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        
+        model = model.cpu().eval()
+        model.share_memory()
+        
+        self.inputs = torch.empty((self.num_slots, 3, input_size, input_size)).share_memory_()
+        self.outputs = torch.empty((self.num_slots, num_classes)).share_memory_()
+        
+        self._model = model
+        self._threads = threads
+        self._context = mp.get_context('spawn')
+        self._results = self._context.Queue()
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+        
+        # request_id -> (future, slot, índice do processo)
+        self._pending: Dict[int, Tuple[Future, int, int]] = {}
+        self._pending_lock = threading.Lock()
+        self._next_id = 0
+        self._restarts = 0
+        self._closed = False
+        self.healthy = True
+        
+        self._tasks = [self._context.Queue() for _ in range(num_workers)]
+        self._workers = [self._start_worker(index) for index in range(num_workers)]
+        
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+        # O Streamlit não chama shutdown(): encerra os processos na saída do interpretador
+        atexit.register(self.shutdown)
+    
+    def _start_worker(self, index: int):
+        """Inicia o processo de inferência de índice ``index``."""
+        worker = self._context.Process(
+            target=_worker_loop,
+            args=(self._model, self.inputs, self.outputs, self._tasks[index], self._results, self._threads),
+            daemon=True
+        )
+        worker.start()
+        return worker
+    
+    def submit(self, batch: torch.Tensor) -> Future:
+        """
+        Envia uma imagem pré-processada para inferência.
+        
+        Bloqueia apenas se todos os slots estiverem ocupados.
+        
+        Args:
+            batch: Tensor (1, 3, input_size, input_size) normalizado
+        
+        Returns:
+            Future com o tensor de logits (num_classes,)
+        
+        Raises:
+            RuntimeError: Se o pool estiver indisponível (processos morrendo repetidamente)
+        """
+        if not self.healthy:
+            raise RuntimeError("Pool de inferência indisponível")
+        
+        slot = self._free_slots.get()
+        self.inputs[slot].copy_(batch[0])
+        
+        future: Future = Future()
+        with self._pending_lock:
+            request_id = self._next_id
+            self._next_id += 1
+            # Processo com menos requisições em andamento
+            load = [0] * self.num_workers
+            for _, _, index in self._pending.values():
+                load[index] += 1
+            worker_index = load.index(min(load))
+            self._pending[request_id] = (future, slot, worker_index)
+            self._tasks[worker_index].put((request_id, slot))
+        
+        return future
+    
+    def _collect_results(self):
+        """Resolve os futures conforme os processos terminam (thread em segundo plano)."""
+        while True:
+            try:
+                message = self._results.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if message is None:
+                break
+            
+            request_id, slot, error = message
+            with self._pending_lock:
+                item = self._pending.pop(request_id, None)
+            if item is None:
+                # Requisição já falhada por morte do processo: o slot já voltou
+                continue
+            
+            logits = self.outputs[slot].clone() if error is None else None
+            self._free_slots.put(slot)
+            future = item[0]
+            if error is None:
+                future.set_result(logits)
+            else:
+                future.set_exception(RuntimeError(f"Erro no processo de inferência: {error}"))
+    
+    def _check_workers(self):
+        """Falha as requisições de processos mortos, devolve os slots e reinicia os processos."""
+        if self._closed:
+            return
+        
+        for index, worker in enumerate(self._workers):
+            if worker.is_alive():
+                continue
+            
+            # Com o lock, submit() não envia nada para a fila antiga enquanto o processo é trocado
+            with self._pending_lock:
+                lost = [request_id for request_id, (_, _, owner) in self._pending.items() if owner == index]
+                items = [self._pending.pop(request_id) for request_id in lost]
+                restart = self._restarts < MAX_WORKER_RESTARTS
+                if restart:
+                    self._restarts += 1
+                    # Fila nova: a antiga pode ter tarefas que ninguém mais vai ler
+                    self._tasks[index] = self._context.Queue()
+                    self._workers[index] = self._start_worker(index)
+                elif self.healthy:
+                    self.healthy = False
+                    print(f"[ERRO] Processos de inferência morreram {self._restarts + 1} vezes; pool desativado")
+            
+            if restart:
+                print(f"[AVISO] Processo de inferência {index} morreu (código {worker.exitcode}); reiniciado")
+            for future, slot, _ in items:
+                self._free_slots.put(slot)
+                future.set_exception(RuntimeError(
+                    f"Processo de inferência encerrado inesperadamente (código {worker.exitcode})"
+                ))
+    
+    def shutdown(self):
+        """Encerra os processos de inferência."""
+        if self._closed:
+            return
+        self._closed = True
+        for index, worker in enumerate(self._workers):
+            if worker.is_alive():
+                self._tasks[index].put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._results.put(None)
+    
+    def is_alive(self) -> bool:
+        """Verifica se todos os processos estão ativos."""
+        return all(worker.is_alive() for worker in self._workers)
@@ -0,0 +1,144 @@
+"""Configuração de execução do PyTorch para inferência em CPU."""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+import torch
+from dotenv import load_dotenv
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+
+def _env_int(name: str) -> Optional[int]:
+    """Lê inteiro opcional do ambiente (vazio, 0 ou inválido = padrão do PyTorch)."""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        print(f"[AVISO] {name}={value!r} não é um inteiro; usando o padrão do PyTorch")
+        return None
+    return number if number > 0 else None
+
+
+def _env_count(name: str, default: int) -> int:
+    """Lê contagem do ambiente (vazio ou inválido = default; 0 desativa)."""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        print(f"[AVISO] {name}={value!r} não é um inteiro; usando {default}")
+        return default
+    return max(number, 0)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Lê booleano do ambiente."""
+    return os.getenv(name, str(default)).lower() == 'true'
+
+
+@dataclass
+class InferenceConfig:
+    """Parâmetros de execução da inferência."""
+    intra_op_threads: Optional[int] = None  # None = padrão do PyTorch (todos os núcleos)
+    inter_op_threads: Optional[int] = None
+    channels_last: bool = False
+    inference_mode: bool = True
+    warmup_runs: int = 1
+    
+    @classmethod
+    def from_env(cls) -> 'InferenceConfig':
+        """
+        Cria configuração a partir das variáveis de ambiente.
+        
+        Com vários processos do Streamlit no mesmo servidor, defina
+        INFERENCE_THREADS como (núcleos / processos) para evitar disputa de CPU.
+        
+        Returns:
+            Configuração lida do ambiente
+        """
+        return cls(
+            intra_op_threads=_env_int('INFERENCE_THREADS'),
+            inter_op_threads=_env_int('INFERENCE_INTEROP_THREADS'),
+            channels_last=_env_bool('INFERENCE_CHANNELS_LAST', False),
+            inference_mode=_env_bool('INFERENCE_MODE', True),
+            warmup_runs=_env_count('INFERENCE_WARMUP_RUNS', 1)
+        )
+
+
+class InferenceRuntime:
+    """Aplica a configuração de inferência ao processo, ao modelo e às entradas."""
+    
+    def __init__(self, config: Optional[InferenceConfig] = None):
+        """
+        Inicializa o runtime.
+        
+        Args:
+            config: Configuração (padrão: lida do ambiente)
+        """
+        self.config = config or InferenceConfig.from_env()
+    
+    def configure_threads(self):
+        """Define o número de threads do PyTorch para este processo."""
+        if self.config.intra_op_threads:
+            torch.set_num_threads(self.config.intra_op_threads)
+        
+        if self.config.inter_op_threads:
+            try:
+                torch.set_num_interop_threads(self.config.inter_op_threads)
+            except RuntimeError:
+                # Só pode ser definido antes do primeiro trabalho paralelo do processo
+                if torch.get_num_interop_threads() != self.config.inter_op_threads:
+                    print("[AVISO] Threads inter-op já inicializadas; mantendo "
+                          f"{torch.get_num_interop_threads()}")
+    
+    def prepare_model(self, model: torch.nn.Module) -> torch.nn.Module:
+        """
+        Ajusta o formato de memória do modelo.
+        
+        Args:
+            model: Modelo PyTorch
+        
+        Returns:
+            O mesmo modelo, em channels_last se configurado
+        """
+        if self.config.channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        return model
+    
+    def prepare_input(self, tensor: torch.Tensor) -> torch.Tensor:
+        """Converte a entrada para o formato de memória do modelo."""
+        if self.config.channels_last:
+            return tensor.contiguous(memory_format=torch.channels_last)
+        return tensor
+    
+    def context(self):
+        """Contexto sem gradientes (inference_mode ou no_grad)."""
+        return torch.inference_mode() if self.config.inference_mode else torch.no_grad()
+    
+    def warmup(self, model: torch.nn.Module, device: torch.device, batch_size: int = 1,
+               input_size: int = 224):
+        """
+        Executa passes de aquecimento para que a primeira predição não pague
+        alocação de memória e seleção de kernels.
+        
+        Args:
+            model: Modelo PyTorch em modo eval
+            device: Dispositivo do modelo
+            batch_size: Tamanho do lote de aquecimento
+            input_size: Lado da imagem de entrada do modelo
+        """
+        if self.config.warmup_runs <= 0:
+            return
+        
+        dummy = self.prepare_input(torch.zeros((batch_size, 3, input_size, input_size), device=device))
+        with self.context():
+            for _ in range(self.config.warmup_runs):
+                model(dummy)
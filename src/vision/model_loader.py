@@ -1,10 +1,11 @@
 """Carregador de modelo MobileNetV2 para classificação de Pokémon usando PyTorch."""
 
 import os
+import json
 import torch
 import torch.nn as nn
 from torchvision import models, transforms
-from typing import Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -15,17 +16,33 @@ except Exception:
     pass
 
 MODEL_PATH = os.getenv('MODEL_PATH', 'models/mobilenet_pokemon')
+# Arquitetura do checkpoint (largura, tamanho de entrada, classes e mapa de rótulos),
+# salva ao lado do model.pth
+MODEL_CONFIG_FILE = 'model_config.json'
 
 
 class PokemonClassifierModel(nn.Module):
     """Modelo de classificação de Pokémon baseado em MobileNetV2."""
     
-    def __init__(self, num_classes: int = 151):
-        """Inicializa o modelo."""
+    def __init__(self, num_classes: int = 151, width_mult: float = 1.0,
+                 input_size: int = 224, pretrained: bool = True):
+        """
+        Inicializa o modelo.
+        
+        Args:
+            num_classes: Número de classes
+            width_mult: Multiplicador de largura do MobileNetV2 (ex.: 0.5 para um modelo menor)
+            input_size: Lado da imagem de entrada esperada
+            pretrained: Usa os pesos do ImageNet (disponíveis só para width_mult=1.0)
+        """
         super(PokemonClassifierModel, self).__init__()
+        self.num_classes = num_classes
+        self.width_mult = width_mult
+        self.input_size = input_size
         
         # Carrega MobileNetV2 pré-treinado
-        base_model = models.mobilenet_v2(weights='IMAGENET1K_V1')
+        weights = 'IMAGENET1K_V1' if pretrained and width_mult == 1.0 else None
+        base_model = models.mobilenet_v2(weights=weights, width_mult=width_mult)
         
         # Congela parâmetros base para transfer learning
         for param in base_model.features.parameters():
@@ -42,18 +59,44 @@ class PokemonClassifierModel(nn.Module):
     def forward(self, x):
         """Forward pass."""
         return self.model(x)
+    
+    def extract_features(self, x):
+        """
+        Extrai o vetor de características (pooling global) antes do classificador.
+        
+        Args:
+            x: Tensor de entrada (N, 3, 224, 224)
+        
+        Returns:
+            Tensor (N, 1280) com as características do MobileNetV2
+        """
+        features = self.model.features(x)
+        features = nn.functional.adaptive_avg_pool2d(features, (1, 1))
+        return torch.flatten(features, 1)
 
 
 class ModelLoader:
     """Carregador de modelo MobileNetV2 usando PyTorch."""
     
-    def __init__(self, model_path: str = MODEL_PATH):
-        """Inicializa o carregador de modelo."""
+    def __init__(self, model_path: str = MODEL_PATH, num_classes: int = 151):
+        """
+        Inicializa o carregador de modelo.
+        
+        Args:
+            model_path: Diretório do modelo
+            num_classes: Número de classes quando o checkpoint não tem model_config.json
+                (padrão: 151, Pokémon da primeira geração)
+        """
         self.model_path = model_path
         self.model: Optional[torch.nn.Module] = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.input_shape = (224, 224, 3)
-        self.num_classes = 151  # Pokémon da primeira geração
+        self.num_classes = num_classes
+        self.width_mult = 1.0
+        self.input_size = 224
+        # Índice da classe -> número da Pokédex (checkpoints antigos: índice + 1)
+        self.class_ids: List[int] = list(range(1, num_classes + 1))
+        self.class_names: Dict[int, str] = {}
     
     def load_model(self) -> torch.nn.Module:
         """
@@ -69,8 +112,10 @@ class ModelLoader:
         model_file = Path(self.model_path) / 'model.pth'
         
         if model_file.exists():
-            # Carrega modelo existente
-            self.model = PokemonClassifierModel(self.num_classes)
+            self._load_config()
+            # Carrega modelo existente (os pesos do ImageNet seriam sobrescritos)
+            self.model = PokemonClassifierModel(self.num_classes, self.width_mult,
+                                                self.input_size, pretrained=False)
             self.model.load_state_dict(torch.load(str(model_file), map_location=self.device))
             self.model.to(self.device)
             self.model.eval()
@@ -80,6 +125,26 @@ class ModelLoader:
         
         return self.model
     
+    def _load_config(self):
+        """Lê a arquitetura do checkpoint; sem o arquivo, assume o MobileNetV2 padrão."""
+        config_file = Path(self.model_path) / MODEL_CONFIG_FILE
+        if not config_file.exists():
+            return
+        
+        with open(config_file, encoding='utf-8') as f:
+            config = json.load(f)
+        self.width_mult = config.get('width_mult', self.width_mult)
+        self.input_size = config.get('input_size', self.input_size)
+        self.input_shape = (self.input_size, self.input_size, 3)
+        self.num_classes = config.get('num_classes', self.num_classes)
+        self.class_ids = config.get('class_ids') or list(range(1, self.num_classes + 1))
+        # JSON só tem chaves texto
+        self.class_names = {int(pokemon_id): name for pokemon_id, name in config.get('class_names', {}).items()}
+    
+    def get_pokemon_name(self, pokemon_id: int) -> Optional[str]:
+        """Nome do Pokémon pelo mapa de rótulos do checkpoint (None se não estiver no mapa)."""
+        return self.class_names.get(pokemon_id)
+    
     def _create_base_model(self) -> torch.nn.Module:
         """
         Cria modelo base MobileNetV2 para transfer learning.
@@ -99,16 +164,40 @@ class ModelLoader:
         except Exception as e:
             raise RuntimeError(f"Erro ao criar modelo base: {e}")
     
-    def save_model(self, model: torch.nn.Module):
+    def save_model(self, model: torch.nn.Module, class_ids: Optional[List[int]] = None,
+                   class_names: Optional[Dict[int, str]] = None):
         """
         Salva o modelo no disco.
         
         Args:
             model: Modelo PyTorch a ser salvo
+            class_ids: Número da Pokédex de cada índice de classe (padrão: índice + 1)
+            class_names: Nomes por número da Pokédex, para exibir sem consultar a PokéAPI
         """
         Path(self.model_path).mkdir(parents=True, exist_ok=True)
         model_file = Path(self.model_path) / 'model.pth'
         torch.save(model.state_dict(), str(model_file))
+        
+        self.num_classes = getattr(model, 'num_classes', self.num_classes)
+        if class_ids is not None:
+            if len(class_ids) != self.num_classes:
+                raise ValueError(f"Mapa de rótulos com {len(class_ids)} classes para um modelo "
+                                 f"com {self.num_classes}")
+            self.class_ids = list(class_ids)
+        elif len(self.class_ids) != self.num_classes:
+            self.class_ids = list(range(1, self.num_classes + 1))
+        if class_names is not None:
+            self.class_names = dict(class_names)
+        
+        config = {
+            'width_mult': getattr(model, 'width_mult', 1.0),
+            'input_size': getattr(model, 'input_size', 224),
+            'num_classes': self.num_classes,
+            'class_ids': self.class_ids,
+            'class_names': {str(pokemon_id): name for pokemon_id, name in self.class_names.items()}
+        }
+        with open(Path(self.model_path) / MODEL_CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
         self.model = model
     
     def get_model(self) -> Optional[torch.nn.Module]:
@@ -116,4 +205,3 @@ class ModelLoader:
         if self.model is None:
             self.load_model()
         return self.model
-
@@ -1,14 +1,21 @@
 """Classificador de imagens de Pokémon usando MobileNetV2 com PyTorch."""
 
 import numpy as np
+from concurrent.futures import Future
 from PIL import Image
 import torch
 from torchvision import transforms
 from typing import List, Tuple, Optional
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 from src.vision.model_loader import ModelLoader
+from src.vision.prediction_cache import PredictionCache
+from src.vision.embedding_index import EmbeddingIndex, build_embedding_index
+from src.vision.preprocessing import BatchPreprocessor, load_image
+from src.vision.inference_runtime import InferenceRuntime
+from src.vision.inference_pool import InferencePool, INFERENCE_WORKERS
 
 # Carrega .env - ignora se houver problema de encoding
 try:
@@ -17,30 +24,79 @@ except Exception:
     pass
 
 NUM_PREDICTIONS = int(os.getenv('NUM_PREDICTIONS', 5))
+PREDICTION_CACHE_ENABLED = os.getenv('PREDICTION_CACHE_ENABLED', 'true').lower() == 'true'
+# 'softmax' usa a camada de classificação; 'embedding' busca o vizinho mais próximo na galeria
+RECOGNITION_MODE = os.getenv('RECOGNITION_MODE', 'softmax')
+# Pré-processamento em lote com buffer pré-alocado (false = pipeline PIL/torchvision original)
+FUSED_PREPROCESSING = os.getenv('FUSED_PREPROCESSING', 'true').lower() == 'true'
 
 
 class PokemonClassifier:
     """Classificador de imagens de Pokémon."""
     
-    def __init__(self, model_path: str = None):
-        """Inicializa o classificador."""
+    def __init__(self, model_path: str = None, use_cache: bool = PREDICTION_CACHE_ENABLED,
+                 mode: str = RECOGNITION_MODE, runtime: Optional[InferenceRuntime] = None,
+                 num_workers: int = INFERENCE_WORKERS, load_index: bool = True):
+        """
+        Inicializa o classificador.
+        
+        Args:
+            model_path: Diretório do modelo (padrão: MODEL_PATH)
+            use_cache: Reutiliza predições de imagens já classificadas
+            mode: 'softmax' (classes fixas) ou 'embedding' (galeria de referência)
+            runtime: Configuração de threads/inferência (padrão: lida do ambiente)
+            num_workers: Processos de inferência para predict_async (0 = no próprio processo)
+            load_index: Carrega o índice salvo no modo 'embedding' (False para montar um novo com build_index)
+        """
+        # Threads precisam ser definidas antes do primeiro trabalho do PyTorch
+        self.runtime = runtime or InferenceRuntime()
+        self.runtime.configure_threads()
+        
         self.model_loader = ModelLoader(model_path) if model_path else ModelLoader()
         self.model = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.input_shape = (224, 224)
         self.num_predictions = NUM_PREDICTIONS
+        self.prediction_cache: Optional[PredictionCache] = None
+        self.mode = mode
+        self.embedding_index: Optional[EmbeddingIndex] = None
+        self.pool: Optional[InferencePool] = None
+        
+        self._load_model()
+        
+        # Modelos destilados podem esperar entrada menor (ex.: 160x160)
+        input_size = self.model_loader.input_size
+        resize_size = round(input_size * 256 / 224)
+        self.input_shape = (input_size, input_size)
         
         # Transformações de pré-processamento melhoradas
         # Usa resize adaptativo para manter proporção
         self.transform = transforms.Compose([
-            transforms.Resize((256, 256), antialias=True),
-            transforms.CenterCrop(224),
+            transforms.Resize((resize_size, resize_size), antialias=True),
+            transforms.CenterCrop(input_size),
             transforms.ToTensor(),
             transforms.Normalize(mean=[0.485, 0.456, 0.406], 
                                std=[0.229, 0.224, 0.225])
         ])
+        self.fused_preprocessing = FUSED_PREPROCESSING
+        self.preprocessor = BatchPreprocessor(crop_size=input_size)
         
-        self._load_model()
+        if self.model is not None:
+            self.model = self.runtime.prepare_model(self.model)
+            self.runtime.warmup(self.model, self.device, input_size=input_size)
+        
+        if self.mode == 'embedding' and load_index:
+            self.embedding_index = EmbeddingIndex.load(self.model_loader.model_path)
+            if self.embedding_index is None:
+                print("[AVISO] Índice de embeddings não encontrado. Execute build_index() primeiro.")
+        
+        if use_cache and self.model is not None:
+            self._init_cache()
+        
+        # Processos de inferência só fazem sentido para o modo softmax em CPU
+        if num_workers > 0 and self.model is not None and self.mode == 'softmax' and self.device.type == 'cpu':
+            self.pool = InferencePool(self.model, self.model_loader.num_classes, num_workers,
+                                      input_size=input_size)
     
     def _load_model(self):
         """Carrega o modelo."""
@@ -50,13 +106,74 @@ class PokemonClassifier:
             print(f"Erro ao carregar modelo: {e}")
             self.model = None
     
+    def _init_cache(self):
+        """Cria o cache de predições para o modelo treinado carregado."""
+        model_file = Path(self.model_loader.model_path) / 'model.pth'
+        # O modelo base tem a camada final aleatória: predições não são reutilizáveis
+        if not model_file.exists():
+            return
+        
+        stat = model_file.stat()
+        model_key = f"{model_file.resolve()}:{stat.st_size}:{int(stat.st_mtime)}:{self.mode}"
+        if self.mode == 'embedding':
+            index_file = Path(self.model_loader.model_path) / 'embeddings.npy'
+            if index_file.exists():
+                model_key += f":{int(index_file.stat().st_mtime)}"
+        
+        try:
+            from src.database.db_manager import DatabaseManager
+            db_manager = DatabaseManager()
+        except Exception as e:
+            print(f"[AVISO] Cache de predições sem persistência: {e}")
+            db_manager = None
+        
+        self.prediction_cache = PredictionCache(model_key, db_manager=db_manager)
+    
     def preprocess_image(self, image: Image.Image) -> torch.Tensor:
         """
         Pré-processa imagem para o modelo PyTorch com melhorias.
         
         Args:
             image: Imagem PIL
-            
+        
+        Returns:
+            Tensor PyTorch pré-processado
+        """
+        if not self.fused_preprocessing:
+            return self.preprocess_image_pil(image)
+        
+        # Copia para fora do buffer compartilhado do pré-processador
+        return self.preprocessor([image]).to(self.device, copy=True)
+    
+    def preprocess_batch(self, images: List[Image.Image]) -> torch.Tensor:
+        """
+        Pré-processa várias imagens em um único tensor.
+        
+        Com o pré-processamento em lote, o tensor é uma visão do buffer
+        reutilizável da thread e vale até a próxima chamada.
+        
+        Args:
+            images: Lista de imagens PIL
+        
+        Returns:
+            Tensor (N, 3, H, W) no dispositivo do modelo (H = W = input_shape)
+        """
+        if not self.fused_preprocessing:
+            batch = torch.cat([self.preprocess_image_pil(image) for image in images])
+        else:
+            batch = self.preprocessor(images).to(self.device)
+        
+        return self.runtime.prepare_input(batch)
+    
+    def preprocess_image_pil(self, image: Image.Image) -> torch.Tensor:
+        """
+        Pré-processamento original com transformações PIL/torchvision separadas.
+        
+        Mantido como referência para comparação e benchmark.
+        
+        Args:
+            image: Imagem PIL
+        
         Returns:
             Tensor PyTorch pré-processado
         """
@@ -77,6 +194,82 @@ class PokemonClassifier:
         
         return tensor.to(self.device)
     
+    def extract_embeddings(self, images: List[Image.Image]) -> np.ndarray:
+        """
+        Calcula o vetor de características de cada imagem.
+        
+        Args:
+            images: Lista de imagens PIL
+        
+        Returns:
+            Matriz (N, 1280) com as características do MobileNetV2
+        """
+        if self.model is None:
+            raise ValueError("Modelo não carregado")
+        
+        batch = self.preprocess_batch(images)
+        with self.runtime.context():
+            features = self.model.extract_features(batch)
+        return features.cpu().numpy()
+    
+    def build_index(self, images_dir: str = 'data/pokemon_images') -> EmbeddingIndex:
+        """
+        Monta e salva o índice de embeddings a partir das imagens de referência.
+        
+        Novos Pokémon passam a ser reconhecidos adicionando imagens em
+        ``images_dir/<id>/`` e reconstruindo o índice, sem retreinar o modelo.
+        
+        Args:
+            images_dir: Diretório com subpastas por ID de Pokémon
+        
+        Returns:
+            Índice construído
+        """
+        index = build_embedding_index(self, images_dir)
+        index.save(self.model_loader.model_path)
+        self.embedding_index = EmbeddingIndex.load(self.model_loader.model_path)
+        if self.prediction_cache is not None:
+            self._init_cache()
+        return self.embedding_index
+    
+    def _lookup_cache(self, image: Image.Image, min_confidence: float):
+        """
+        Procura a imagem no cache de predições.
+        
+        Returns:
+            Tupla (predições filtradas ou None, hash do conteúdo, hash perceptual)
+        """
+        if self.prediction_cache is None:
+            return None, None, None
+        
+        cached, key, phash = self.prediction_cache.lookup(image)
+        if cached is None:
+            return None, key, phash
+        return self._filter_predictions(cached[:self.num_predictions], min_confidence), key, phash
+    
+    def _rank_logits(self, logits: torch.Tensor) -> List[Tuple[int, float]]:
+        """Converte logits (num_classes,) nas top-N predições."""
+        probabilities = torch.nn.functional.softmax(logits, dim=0)
+        
+        # Obtém top-N predições
+        top_probs, top_indices = torch.topk(probabilities, min(self.num_predictions, probabilities.shape[0]))
+        
+        # Índice da classe -> número da Pokédex pelo mapa de rótulos do checkpoint
+        class_ids = self.model_loader.class_ids
+        return [
+            (class_ids[int(idx)], float(prob))
+            for idx, prob in zip(top_indices.tolist(), top_probs.tolist())
+        ]
+    
+    def _filter_predictions(self, predictions: List[Tuple[int, float]],
+                            min_confidence: float) -> List[Tuple[int, float]]:
+        """Remove predições abaixo da confiança mínima."""
+        return [
+            (pokemon_id, confidence)
+            for pokemon_id, confidence in predictions
+            if confidence >= min_confidence
+        ]
+    
     def predict(self, image: Image.Image, min_confidence: float = 0.01) -> List[Tuple[int, float]]:
         """
         Classifica imagem e retorna top-N predições.
@@ -84,31 +277,100 @@ class PokemonClassifier:
         Args:
             image: Imagem PIL para classificar
             min_confidence: Confiança mínima para incluir predição (padrão: 0.01 = 1%)
-            
+        
         Returns:
             Lista de tuplas (pokemon_id, confidence) ordenada por confiança
         """
         if self.model is None:
             raise ValueError("Modelo não carregado")
         
+        # Caminho ou arquivo JPEG é decodificado direto em resolução reduzida; imagem PIL só vira RGB
+        if self.fused_preprocessing:
+            image = load_image(image)
+        
+        # Imagem já classificada: devolve o resultado salvo sem rodar o modelo
+        cached, key, phash = self._lookup_cache(image, min_confidence)
+        if cached is not None:
+            return cached
+        
         # Pré-processa imagem
-        processed = self.preprocess_image(image)
+        processed = self.preprocess_batch([image])
         
-        # Faz predição
-        with torch.no_grad():
-            outputs = self.model(processed)
-            probabilities = torch.nn.functional.softmax(outputs[0], dim=0)
+        if self.mode == 'embedding':
+            if self.embedding_index is None:
+                raise ValueError("Índice de embeddings não carregado")
+            
+            with self.runtime.context():
+                features = self.model.extract_features(processed)[0].cpu().numpy()
+            
+            # Similaridade de cosseno negativa não indica correspondência
+            all_predictions = [
+                (pokemon_id, max(similarity, 0.0))
+                for pokemon_id, similarity in self.embedding_index.search(features, self.num_predictions)
+            ]
+        else:
+            # Faz predição
+            with self.runtime.context():
+                outputs = self.model(processed)
+            
+            all_predictions = self._rank_logits(outputs[0])
         
-        # Obtém top-N predições
-        top_probs, top_indices = torch.topk(probabilities, self.num_predictions)
+        # Salva sem filtro de confiança para servir qualquer min_confidence depois
+        if self.prediction_cache is not None:
+            self.prediction_cache.store(key, phash, all_predictions)
         
-        top_predictions = [
-            (int(idx.item() + 1), float(top_probs[i].item()))  # ID começa em 1
-            for i, idx in enumerate(top_indices)
-            if float(top_probs[i].item()) >= min_confidence
-        ]
+        return self._filter_predictions(all_predictions, min_confidence)
+    
+    def predict_async(self, image: Image.Image, min_confidence: float = 0.01) -> Future:
+        """
+        Classifica imagem em um processo de inferência sem bloquear a thread atual.
+        
+        Sem pool de processos (INFERENCE_WORKERS=0) ou com o pool indisponível,
+        classifica no próprio processo e retorna um Future já resolvido.
+        
+        Args:
+            image: Imagem PIL para classificar
+            min_confidence: Confiança mínima para incluir predição
+        
+        Returns:
+            Future com a lista de tuplas (pokemon_id, confidence)
+        """
+        result: Future = Future()
+        
+        def _predict_here() -> Future:
+            try:
+                result.set_result(self.predict(image, min_confidence))
+            except Exception as e:
+                result.set_exception(e)
+            return result
         
-        return top_predictions
+        if self.pool is None or not self.pool.healthy:
+            return _predict_here()
+        
+        if self.fused_preprocessing:
+            image = load_image(image)
+        
+        cached, key, phash = self._lookup_cache(image, min_confidence)
+        if cached is not None:
+            result.set_result(cached)
+            return result
+        
+        def _on_logits(logits_future: Future):
+            try:
+                all_predictions = self._rank_logits(logits_future.result())
+                if self.prediction_cache is not None:
+                    self.prediction_cache.store(key, phash, all_predictions)
+                result.set_result(self._filter_predictions(all_predictions, min_confidence))
+            except Exception as e:
+                result.set_exception(e)
+        
+        try:
+            logits_future = self.pool.submit(self.preprocess_batch([image]))
+        except RuntimeError:
+            # O pool ficou indisponível entre a verificação acima e o envio
+            return _predict_here()
+        logits_future.add_done_callback(_on_logits)
+        return result
     
     def predict_single(self, image: Image.Image) -> Optional[Tuple[int, float]]:
         """
@@ -116,13 +378,22 @@ class PokemonClassifier:
         
         Args:
             image: Imagem PIL para classificar
-            
+        
         Returns:
             Tupla (pokemon_id, confidence) ou None
         """
         predictions = self.predict(image)
         return predictions[0] if predictions else None
     
+    def get_pokemon_name(self, pokemon_id: int) -> Optional[str]:
+        """
+        Nome do Pokémon salvo com o modelo, sem consultar a PokéAPI.
+        
+        Returns:
+            Nome ou None se o checkpoint não tiver o nome
+        """
+        return self.model_loader.get_pokemon_name(pokemon_id)
+    
     def is_model_ready(self) -> bool:
         """Verifica se o modelo está pronto para uso."""
         return self.model is not None
@@ -0,0 +1,191 @@
+"""Cache de predições do classificador indexado por hash da imagem."""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Optional
+from PIL import Image
+from dotenv import load_dotenv
+
+from src.database.db_manager import DatabaseManager
+
+# Carrega .env - ignora se houver problema de encoding
+try:
+    load_dotenv()
+except Exception:
+    pass
+
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 256))
+# Distância de Hamming máxima para considerar imagens quase idênticas (0 = só hash exato)
+PREDICTION_CACHE_MAX_DISTANCE = int(os.getenv('PREDICTION_CACHE_MAX_DISTANCE', 0))
+# Validade (dias) e número máximo de predições no SQLite
+PREDICTION_CACHE_DAYS = int(os.getenv('PREDICTION_CACHE_DAYS', 30))
+PREDICTION_CACHE_MAX_ROWS = int(os.getenv('PREDICTION_CACHE_MAX_ROWS', 10000))
+# A limpeza do SQLite roda ao criar o cache e a cada N predições salvas
+PREDICTION_CACHE_EVICT_EVERY = 256
+# Linhas de pixels copiadas por vez no hash do conteúdo (limita a memória extra)
+CONTENT_HASH_ROWS = 256
+
+
+def content_hash(image: Image.Image) -> str:
+    """
+    Calcula hash exato do conteúdo da imagem (todos os pixels decodificados).
+    
+    Percorre a imagem em faixas de CONTENT_HASH_ROWS linhas, então a memória
+    extra não cresce com o tamanho da foto. Só imagens idênticas pixel a pixel
+    (e com o mesmo modo e tamanho) compartilham o hash; quase duplicatas ficam
+    com o hash perceptual (difference_hash).
+    
+    Args:
+        image: Imagem PIL
+    
+    Returns:
+        Hash SHA-256 em hexadecimal
+    """
+    digest = hashlib.sha256()
+    width, height = image.size
+    digest.update(f"{image.mode}:{width}x{height}:".encode())
+    for top in range(0, height, CONTENT_HASH_ROWS):
+        digest.update(image.crop((0, top, width, min(top + CONTENT_HASH_ROWS, height))).tobytes())
+    return digest.hexdigest()
+
+
+def difference_hash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Calcula o hash perceptual por diferença (dHash) da imagem.
+    
+    Imagens visualmente iguais (recompressão, redimensionamento leve)
+    geram hashes com poucos bits diferentes.
+    
+    Args:
+        image: Imagem PIL
+        hash_size: Lado da grade de comparação (8 gera 64 bits)
+    
+    Returns:
+        Hash perceptual como inteiro sem sinal
+    """
+    # Reduz antes de converter para tons de cinza (evita copiar a imagem inteira)
+    small = image.resize((hash_size + 1, hash_size), Image.BILINEAR, reducing_gap=2.0).convert('L')
+    pixels = small.tobytes()
+    width = hash_size + 1
+    
+    value = 0
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Número de bits diferentes entre dois hashes."""
+    return bin(a ^ b).count('1')
+
+
+class PredictionCache:
+    """Cache LRU em memória com persistência em SQLite para predições."""
+    
+    def __init__(self, model_key: str, max_size: int = PREDICTION_CACHE_SIZE,
+                 max_distance: int = PREDICTION_CACHE_MAX_DISTANCE,
+                 db_manager: Optional[DatabaseManager] = None):
+        """
+        Inicializa o cache.
+        
+        Args:
+            model_key: Identificador da versão do modelo (invalida o cache ao trocar o modelo)
+            max_size: Número máximo de entradas em memória
+            max_distance: Distância de Hamming máxima para busca aproximada (0 desativa)
+            db_manager: Gerenciador de banco para persistência (opcional)
+        """
+        self.model_key = model_key
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self.db_manager = db_manager
+        self._entries: "OrderedDict[str, Tuple[int, List[Tuple[int, float]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores = 0
+        
+        if self.db_manager:
+            self.db_manager.clear_old_predictions(PREDICTION_CACHE_DAYS, PREDICTION_CACHE_MAX_ROWS)
+    
+    def lookup(self, image: Image.Image) -> Tuple[Optional[List[Tuple[int, float]]], str, int]:
+        """
+        Procura predições para a imagem.
+        
+        Args:
+            image: Imagem PIL
+        
+        Returns:
+            Tupla (predições ou None, hash do conteúdo, hash perceptual).
+            Os hashes podem ser repassados para store() em caso de miss.
+        """
+        key = content_hash(image)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[1], key, entry[0]
+        
+        # O hash perceptual só é necessário quando o hash exato falha
+        phash = difference_hash(image)
+        
+        with self._lock:
+            if self.max_distance > 0:
+                # Vale a entrada mais próxima, não a primeira dentro do limite
+                best_key, best_distance = None, self.max_distance + 1
+                for other_key, (other_phash, _) in self._entries.items():
+                    distance = hamming_distance(phash, other_phash)
+                    if distance < best_distance:
+                        best_key, best_distance = other_key, distance
+                        if distance == 0:
+                            break
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    return self._entries[best_key][1], key, phash
+        
+        if self.db_manager:
+            stored = self.db_manager.get_cached_prediction(key, self.model_key)
+            if stored is None and self.max_distance > 0:
+                stored = self.db_manager.find_similar_prediction(phash, self.model_key, self.max_distance)
+            if stored is not None:
+                predictions = [(int(pokemon_id), float(confidence)) for pokemon_id, confidence in stored]
+                self._remember(key, phash, predictions)
+                return predictions, key, phash
+        
+        return None, key, phash
+    
+    def store(self, key: str, phash: int, predictions: List[Tuple[int, float]]):
+        """
+        Salva predições no cache em memória e no banco.
+        
+        Args:
+            key: Hash do conteúdo retornado por lookup()
+            phash: Hash perceptual retornado por lookup()
+            predictions: Lista de tuplas (pokemon_id, confiança)
+        """
+        self._remember(key, phash, predictions)
+        if self.db_manager:
+            self.db_manager.save_prediction(
+                key, self.model_key, phash,
+                [[pokemon_id, confidence] for pokemon_id, confidence in predictions]
+            )
+            with self._lock:
+                self._stores += 1
+                evict = self._stores % PREDICTION_CACHE_EVICT_EVERY == 0
+            if evict:
+                self.db_manager.clear_old_predictions(PREDICTION_CACHE_DAYS, PREDICTION_CACHE_MAX_ROWS)
+    
+    def clear(self):
+        """Limpa o cache em memória."""
+        with self._lock:
+            self._entries.clear()
+    
+    def _remember(self, key: str, phash: int, predictions: List[Tuple[int, float]]):
+        """Insere entrada no LRU, descartando a menos usada se necessário."""
+        with self._lock:
+            self._entries[key] = (phash, predictions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)